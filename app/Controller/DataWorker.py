@@ -0,0 +1,337 @@
+import threading
+
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QImage
+
+from Model.ConnectionManager import ConnectionManager
+from Model.DataProvider import DataProvider
+from Model.OrdenesModel import OrdenesModel
+from Model.PalletReconciler import PalletReconciler, CAMPOS_VISUALES
+from Model.PalletClusters import PalletClusters
+from Model.PalletFilter import PalletFilter
+from Model.PalletHeatmap import PalletHeatmap
+from Model.SlotLocator import SlotLocator
+
+
+class DataWorker(QObject):
+    """Lecturas de la base de datos fuera del hilo de la interfaz.
+
+    Vive en su propio QThread: sondea el registro de cambios de pallets, calcula
+    las diferencias y los agregados del mapa, mantiene el índice de huecos libres
+    y entrega a la interfaz resultados listos para aplicar mediante señales
+    (conexiones en cola). También importa las órdenes que otros procesos siguen
+    escribiendo en ordenes.db. Las señales I/O las vigila aparte un IOWatcher.
+
+    Para que un consumidor lento no acumule trabajo, solo hay un parche de pallets
+    en vuelo: hasta que la interfaz llama a `confirmar_parche()` no se vuelve a
+    sondear, y los cambios intermedios llegan juntos en el siguiente parche. De las
+    peticiones de zona visible solo se atiende la más reciente.
+
+    Con un filtro activo, cada parche incluye además los pallets que entran o
+    salen del filtro, reevaluado solo sobre las filas que han cambiado. Con el
+    mapa de calor activo, los cambios se acumulan en sus celdas y se envía la
+    imagen actualizada.
+    """
+
+    # Por debajo de este nivel de zoom el mapa muestra agregados por celda
+    ZOOM_CLUSTERS = -2
+    # Máximo de pallets individuales en la zona cargada (vista más margen) antes de pasar a agregados
+    MAX_PALLETS_VISIBLES = 30000
+    INTERVALO_MS = 500
+    # Cada cuánto se compacta el registro de cambios (cada escritura en pallets, también
+    # de procesos externos, añade una entrada; se conservan las últimas CHANGES_RETENTION)
+    INTERVALO_COMPACTACION_MS = 60_000
+    # Cada cuánto se buscan órdenes nuevas que otros procesos escriben en ordenes.db
+    INTERVALO_IMPORTACION_MS = 2000
+    # Lado en metros de las celdas del mapa de calor
+    CELDA_CALOR = 1.0
+
+    # Resultados hacia la interfaz
+    parche_listo = pyqtSignal(object, object)            # PalletPatch, agregados actualizados (o None)
+    region_lista = pyqtSignal(object, object, object)    # región, pallets (o None), agregados (o None)
+    filtro_listo = pyqtSignal(object)                    # IDs que cumplen el filtro (frozenset) o None
+    calor_listo = pyqtSignal(object, float)              # imagen del mapa de calor (QImage) o None, tamaño de celda
+    huecos_encontrados = pyqtSignal(str, object, object)  # pallet, su posición (X, Y) o None, huecos más cercanos
+    ordenes_importadas = pyqtSignal(object)              # órdenes nuevas importadas de ordenes.db (lista de dict)
+
+    # Peticiones internas: se emiten desde la interfaz y se ejecutan en el hilo del worker
+    _pedir_carga = pyqtSignal(float, float)
+    _pedir_region = pyqtSignal(object, int, float)
+    _pedir_sondeo = pyqtSignal()
+    _pedir_filtro = pyqtSignal(object)
+    _pedir_calor = pyqtSignal(bool)
+    _pedir_huecos = pyqtSignal(str, int)
+    _pedir_detencion = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.model = None
+        self.ordenes = None
+        # Además de los campos visuales, se vigila Prioridad para reordenar la cola de órdenes
+        self.pallets = PalletReconciler(CAMPOS_VISUALES + ("Prioridad",))
+        self.clusters = None
+        self.revision = 0
+        self.timer = None
+        self.timer_compactacion = None
+        self.timer_importacion = None
+        self.filtro = None
+        self.coincidentes = set()  # IDs que cumplen el filtro activo
+        self.calor = None
+        self.huecos = SlotLocator()  # Huecos libres (pallets con Ocupado = 0)
+        self._calor_activo = False
+        self._extension = None  # Ancho y alto del mapa cargado (m)
+
+        self._parche_en_vuelo = threading.Event()
+        self._region_pendiente = None
+        self._nivel_actual = None  # (zoom, tamaño de celda) si la interfaz muestra agregados
+
+        self._pedir_carga.connect(self._cargar)
+        self._pedir_region.connect(self._encolar_region)
+        self._pedir_sondeo.connect(self._sondear_pallets)
+        self._pedir_filtro.connect(self._aplicar_filtro)
+        self._pedir_calor.connect(self._activar_calor)
+        self._pedir_huecos.connect(self._buscar_huecos)
+        self._pedir_detencion.connect(self._detener)
+
+        self.hilo = QThread()
+        self.moveToThread(self.hilo)
+        self.hilo.started.connect(self._iniciar)
+
+    # ----------------- API para la interfaz (cualquier hilo) -----------------
+    def start(self):
+        self.hilo.start()
+
+    def stop(self):
+        """Detener el sondeo, cerrar las conexiones del hilo y esperar a que termine"""
+        if self.hilo.isRunning():
+            self._pedir_detencion.emit()
+            self.hilo.wait()
+
+    def cargar_mapa(self, ancho: float, alto: float):
+        """Cargar todos los pallets y empezar a sondear cambios (mapa de ancho x alto metros)"""
+        self._pedir_carga.emit(ancho, alto)
+
+    def solicitar_region(self, region: tuple, nivel_zoom: int, tam_celda: float):
+        """Pedir los pallets (o agregados) de la zona x0, y0, x1, y1 en metros"""
+        self._pedir_region.emit(region, nivel_zoom, tam_celda)
+
+    def refrescar(self):
+        """Sondear los cambios de pallets inmediatamente (p. ej. tras una escritura local)"""
+        self._pedir_sondeo.emit()
+
+    def aplicar_filtro(self, filtro: PalletFilter = None):
+        """Resaltar los pallets que cumplen `filtro` (None lo quita); el resultado llega por `filtro_listo`"""
+        self._pedir_filtro.emit(filtro)
+
+    def set_mapa_calor(self, activo: bool):
+        """Activar o desactivar el mapa de calor; las imágenes llegan por `calor_listo`"""
+        self._pedir_calor.emit(activo)
+
+    def buscar_huecos(self, pallet_id: str, k: int = 3):
+        """Buscar los k huecos libres más cercanos a un pallet; el resultado llega por `huecos_encontrados`"""
+        self._pedir_huecos.emit(pallet_id, k)
+
+    def confirmar_parche(self):
+        """La interfaz ha aplicado el último parche; se puede enviar el siguiente"""
+        self._parche_en_vuelo.clear()
+
+    # ----------------- Hilo del worker -----------------
+    @pyqtSlot()
+    def _iniciar(self):
+        self.model = DataProvider()
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._sondear_pallets)
+        self.timer.start(self.INTERVALO_MS)
+        self.timer_compactacion = QTimer()
+        self.timer_compactacion.timeout.connect(self._compactar)
+        self.timer_compactacion.start(self.INTERVALO_COMPACTACION_MS)
+        self.ordenes = OrdenesModel(self.model.db_path)
+        self.timer_importacion = QTimer()
+        self.timer_importacion.timeout.connect(self._importar_ordenes)
+        self.timer_importacion.start(self.INTERVALO_IMPORTACION_MS)
+
+    @pyqtSlot()
+    def _detener(self):
+        if self.timer:
+            self.timer.stop()
+        if self.timer_compactacion:
+            self.timer_compactacion.stop()
+        if self.timer_importacion:
+            self.timer_importacion.stop()
+        ConnectionManager.close_thread_connections()
+        self.hilo.quit()
+
+    @pyqtSlot(float, float)
+    def _cargar(self, ancho: float, alto: float):
+        try:
+            # Leer la revisión antes que los datos: un cambio intermedio se volverá a aplicar, nunca se pierde
+            self.model.compact_changes()
+            self.revision = self.model.get_revision()
+            self.pallets.load_columns(*self.model.get_pallet_columns())
+        except Exception as e:
+            print(f"Error al cargar pallets: {e}")
+            return
+        store = self.pallets.store
+        self.clusters = PalletClusters(lambda: (store.column("X"), store.column("Y"), store.column("Ocupado")),
+                                       ancho, alto)
+        self._extension = (ancho, alto)
+        self.huecos.load(store.ids, store.column("X"), store.column("Y"), store.column("Ocupado"))
+        self._parche_en_vuelo.clear()
+        if self.filtro is not None:
+            self._aplicar_filtro(self.filtro)
+        if self._calor_activo:
+            self._activar_calor(True)
+
+    @pyqtSlot()
+    def _compactar(self):
+        """Limitar el registro de cambios a la ventana de retención durante toda la sesión"""
+        try:
+            self.model.compact_changes()
+        except Exception as e:
+            print(f"Error al compactar el registro de cambios: {e}")
+
+    @pyqtSlot()
+    def _importar_ordenes(self):
+        """Pasar a la cola las órdenes que otros procesos siguen escribiendo en ordenes.db"""
+        # Hasta cargar el mapa la interfaz no muestra órdenes: las leerá todas al cargarlo
+        if self.clusters is None:
+            return
+        try:
+            creadas = self.ordenes.import_legacy_orders()
+        except Exception as e:
+            print(f"Error al importar órdenes: {e}")
+            return
+        if creadas:
+            self.ordenes_importadas.emit(creadas)
+
+    @pyqtSlot()
+    def _sondear_pallets(self):
+        if self.clusters is None or self._parche_en_vuelo.is_set():
+            return
+
+        try:
+            cambios = self.model.get_changes_since(self.revision)
+            if cambios is None:
+                # El registro se compactó por detrás de nuestra revisión: reconciliar la tabla completa
+                revision = self.model.get_revision()
+                patch = self.pallets.reconcile_columns(*self.model.get_pallet_columns())
+                tocados = None
+            else:
+                revision, pallets_modificados, ids_eliminados = cambios
+                if revision == self.revision:
+                    return
+                tocados = [p["ID"] for p in pallets_modificados]
+                # Valores previos para restarlos de las celdas del mapa de calor
+                anteriores = (PalletHeatmap.columnas(self.pallets.store, tocados + list(ids_eliminados))
+                              if self.calor is not None else None)
+                patch = self.pallets.apply_changes(pallets_modificados, ids_eliminados)
+        except Exception as e:
+            print(f"Error al obtener pallets: {e}")
+            return
+
+        self.revision = revision
+        self.huecos.aplicar_parche(patch)
+        if self.filtro is not None:
+            self._refiltrar(patch, tocados)
+        if self.calor is not None:
+            if tocados is None:
+                self.calor.construir(*PalletHeatmap.columnas(self.pallets.store))
+                self._emitir_calor()
+            elif self.calor.actualizar(anteriores, PalletHeatmap.columnas(self.pallets.store, tocados)):
+                self._emitir_calor()
+        if patch.is_empty():
+            return
+        self.clusters.aplicar_parche(patch)
+        agregados = self._agregados(*self._nivel_actual) if self._nivel_actual else None
+        self._parche_en_vuelo.set()
+        self.parche_listo.emit(patch, agregados)
+
+    @pyqtSlot(object)
+    def _aplicar_filtro(self, filtro):
+        self.filtro = filtro
+        self.coincidentes = filtro.coincidentes(self.pallets.store) if filtro is not None else set()
+        self.filtro_listo.emit(frozenset(self.coincidentes) if filtro is not None else None)
+
+    def _refiltrar(self, patch, tocados=None):
+        """Anotar en el parche los pallets que entran o salen del filtro.
+
+        Solo se evalúan las filas de `tocados` (todas si es None); cualquier campo
+        puede afectar al filtro, no solo los visuales que recoge el parche.
+        """
+        store = self.pallets.store
+        salen = [pid for pid in patch.removed if pid in self.coincidentes]
+        if tocados is None:
+            coincidentes = self.filtro.coincidentes(store)
+            entran = list(coincidentes - self.coincidentes)
+            salen = list(self.coincidentes - coincidentes)
+            self.coincidentes = coincidentes
+        else:
+            tocados = [pid for pid in tocados if pid in store]
+            cumplen = self.filtro.evaluar(store, store.rows_of(tocados)).tolist()
+            entran = [pid for pid, si in zip(tocados, cumplen) if si and pid not in self.coincidentes]
+            salen += [pid for pid, si in zip(tocados, cumplen) if not si and pid in self.coincidentes]
+            self.coincidentes.difference_update(salen)
+            self.coincidentes.update(entran)
+        patch.matched = entran
+        patch.unmatched = salen
+
+    @pyqtSlot(bool)
+    def _activar_calor(self, activo: bool):
+        self._calor_activo = activo
+        self.calor = None
+        if activo and self._extension is not None:
+            self.calor = PalletHeatmap(*self._extension, tam_celda=self.CELDA_CALOR)
+            self.calor.construir(*PalletHeatmap.columnas(self.pallets.store))
+        self._emitir_calor()
+
+    def _emitir_calor(self):
+        if self.calor is None:
+            self.calor_listo.emit(None, 0.0)
+            return
+        alto, ancho, _ = self.calor.rgba.shape
+        # Copia: la interfaz la usa mientras este hilo sigue modificando el buffer
+        imagen = QImage(self.calor.rgba.data, ancho, alto, 4 * ancho, QImage.Format_RGBA8888).copy()
+        self.calor_listo.emit(imagen, self.calor.tam_celda)
+
+    @pyqtSlot(str, int)
+    def _buscar_huecos(self, pallet_id: str, k: int):
+        pallet = self.pallets.get(pallet_id)
+        if pallet is None:
+            self.huecos_encontrados.emit(pallet_id, None, [])
+            return
+        origen = (pallet["X"], pallet["Y"])
+        self.huecos_encontrados.emit(pallet_id, origen, self.huecos.nearest(*origen, k, excluir=(pallet_id,)))
+
+    @pyqtSlot(object, int, float)
+    def _encolar_region(self, region, nivel_zoom, tam_celda):
+        # Solo se atiende la última petición recibida antes de procesar
+        if self._region_pendiente is None:
+            QTimer.singleShot(0, self._procesar_region)
+        self._region_pendiente = (region, nivel_zoom, tam_celda)
+
+    def _procesar_region(self):
+        region, nivel_zoom, tam_celda = self._region_pendiente
+        self._region_pendiente = None
+        if self.clusters is None:
+            return
+
+        # Nivel de detalle: agregados si el mapa está alejado o la zona tiene demasiados pallets
+        nivel = self.clusters.nivel(nivel_zoom, tam_celda)
+        if nivel_zoom < self.ZOOM_CLUSTERS or nivel.contar_en_rect(*region) > self.MAX_PALLETS_VISIBLES:
+            self._nivel_actual = (nivel_zoom, tam_celda)
+            self.region_lista.emit(region, None, self._agregados(nivel_zoom, tam_celda))
+            return
+
+        self._nivel_actual = None
+        try:
+            pallets = self.model.get_pallets_in_rect(*region)
+        except Exception as e:
+            print(f"Error al obtener pallets de la zona visible: {e}")
+            return
+        self.region_lista.emit(region, pallets, None)
+
+    def _agregados(self, nivel_zoom: int, tam_celda: float):
+        """Copia de las celdas de un nivel (la caché sigue modificándose en este hilo)"""
+        nivel = self.clusters.nivel(nivel_zoom, tam_celda)
+        centros_x, centros_y, totales, proporciones = nivel.celdas()
+        return centros_x, centros_y, totales, proporciones, nivel.tam_celda
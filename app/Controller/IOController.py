@@ -1,37 +1,50 @@
-from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtCore import QObject
+from Controller.IOWatcher import IOWatcher
 from Model.IOProvider import IOProvider
+from Model.IOSource import IOSource, SharedMemoryIOSource
 from View.IOWidget import IOWidget
 
 class IOController(QObject):
+    # Memoria compartida en la que publica la pasarela del PLC (si no existe, se lee IO.db)
+    RUTA_MEMORIA = SharedMemoryIOSource.RUTA
+    
     def __init__(self):
         super().__init__()
-        self.model = IOProvider()
+        self.model = None
         self.view = IOWidget()
         
         # Inicialmente no monitoreamos
-        self.timer = None
+        self.watcher = None
         self.is_monitoring = False
         
         # Inicializar la vista con todos los puntos en 0 (rojos)
         self.view.update_io_states(0, 0)
     
+    def open_source(self) -> IOSource:
+        """Memoria compartida si la pasarela del PLC la ha creado; si no, IO.db"""
+        try:
+            return SharedMemoryIOSource(self.RUTA_MEMORIA)
+        except (OSError, ValueError):
+            return IOProvider()
+    
     def start_monitoring(self):
-        """Comenzar a monitorear los cambios en la base de datos IO"""
-        if not self.is_monitoring:
-            # Configurar temporizador para actualización automática
-            self.timer = QTimer()
-            self.timer.timeout.connect(self.update_io_display)
-            self.timer.start(500)  # Actualizar cada 500ms
-            self.is_monitoring = True
-        
-        # Actualizar inmediatamente con los valores actuales de la BD
-        self.update_io_display()
+        """Comenzar a vigilar las señales I/O en un hilo aparte (se elige el origen en cada inicio)"""
+        if self.is_monitoring:
+            return
+        if self.model is not None:
+            self.model.close()
+        self.model = self.open_source()
+        self.watcher = IOWatcher(self.model)
+        self.watcher.io_leido.connect(self.on_io_leido)
+        self.is_monitoring = True
+        # La primera lectura envía el valor actual
+        self.watcher.start()
     
     def stop_monitoring(self):
         """Detener el monitoreo de I/O"""
-        if self.timer and self.is_monitoring:
-            self.timer.stop()
-            self.timer = None
+        if self.watcher is not None and self.is_monitoring:
+            self.watcher.stop()
+            self.watcher = None
             self.is_monitoring = False
     
     def reset_display(self):
@@ -41,6 +54,9 @@ class IOController(QObject):
     def update_io_display(self):
         """Actualizar la visualización de entradas/salidas"""
         try:
+            # El origen se abre una vez y se conserva (start_monitoring lo vuelve a elegir)
+            if self.model is None:
+                self.model = self.open_source()
             input_value, output_value = self.model.get_io_data()
             self.view.update_io_states(input_value, output_value)
         except Exception as e:
@@ -48,6 +64,11 @@ class IOController(QObject):
             # Si hay error, mostrar todos en 0
             self.view.update_io_states(0, 0)
     
+    def on_io_leido(self, input_value: int, output_value: int):
+        # Una lectura ya en cola puede llegar tras detener el monitoreo
+        if self.is_monitoring:
+            self.view.update_io_states(input_value, output_value)
+    
     def get_widget(self):
         """Obtener el widget para insertar en la interfaz principal"""
-        return self.view
\ No newline at end of file
+        return self.view
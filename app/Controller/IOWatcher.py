@@ -0,0 +1,75 @@
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from Model.ConnectionManager import ConnectionManager
+from Model.IOSource import IOSource
+
+
+class IOWatcher(QThread):
+    """Hilo que vigila un IOSource y avisa a la interfaz en cuanto cambian las señales.
+
+    Lee el origen cada `INTERVALO` del propio origen (~1 ms en memoria compartida,
+    500 ms con IO.db) y compara solo la secuencia; tras `ESPERA_REPOSO` sin cambios
+    pasa a leer cada `INTERVALO_REPOSO`. Cada cambio llega por `io_leido`
+    (conexión en cola hacia el hilo de la interfaz). Si la secuencia avanza más de
+    uno entre dos lecturas, los cambios intermedios se cuentan en `perdidas`.
+
+    Si una lectura falla (p. ej. la pasarela murió a mitad de una escritura), se
+    avisa una vez y, hasta que el origen vuelve a estar disponible, solo se comprueba
+    cada `INTERVALO_ERROR`, sin reintentar la lectura.
+    """
+
+    io_leido = pyqtSignal(int, int)  # Input, Output
+
+    def __init__(self, fuente: IOSource):
+        super().__init__()
+        self.fuente = fuente
+        self.perdidas = 0
+        self._detener = threading.Event()
+
+    def stop(self):
+        """Detener la vigilancia y esperar a que el hilo termine"""
+        self._detener.set()
+        self.wait()
+
+    def run(self):
+        fuente = self.fuente
+        secuencia = None
+        ultimo_cambio = time.monotonic()
+        en_error = False
+        try:
+            while True:
+                if en_error and not fuente.disponible():
+                    intervalo = fuente.INTERVALO_ERROR
+                else:
+                    try:
+                        nueva, input_value, output_value = fuente.read()
+                    except Exception as e:
+                        if not en_error:
+                            print(f"Error actualizando I/O: {e}")
+                            en_error = True
+                        # Mostrar todo en 0 una vez; al recuperarse se envía el valor actual
+                        if secuencia is not None:
+                            self.io_leido.emit(0, 0)
+                        secuencia = None
+                        intervalo = fuente.INTERVALO_ERROR
+                    else:
+                        if en_error:
+                            print("I/O recuperado")
+                            en_error = False
+                        ahora = time.monotonic()
+                        if nueva != secuencia:
+                            if secuencia is not None and nueva > secuencia + 1:
+                                self.perdidas += nueva - secuencia - 1
+                            secuencia = nueva
+                            ultimo_cambio = ahora
+                            self.io_leido.emit(input_value, output_value)
+                        reposo = ahora - ultimo_cambio >= fuente.ESPERA_REPOSO
+                        intervalo = fuente.INTERVALO_REPOSO if reposo else fuente.INTERVALO
+                if self._detener.wait(intervalo):
+                    break
+        finally:
+            # Conexiones SQLite abiertas por este hilo (respaldo IO.db)
+            ConnectionManager.close_thread_connections()
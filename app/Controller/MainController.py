@@ -1,12 +1,18 @@
 import sys
 from PyQt5.QtWidgets import QApplication, QMessageBox, QSizePolicy
-from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtCore import QObject
 
+from Model.ConnectionManager import ConnectionManager
 from Model.DataProvider import DataProvider
+from Model.PalletFilter import PalletFilter
 from View.MainWindow import MainWindow
 from Controller.OrdenesController import OrdenesController
+from Controller.DataWorker import DataWorker
 
 class MainController(QObject):
+    # Huecos libres que se sugieren en el mapa al crear una orden
+    HUECOS_SUGERIDOS = 3
+    
     def __init__(self):
         super().__init__()
         self.app = QApplication(sys.argv)
@@ -16,6 +22,10 @@ class MainController(QObject):
         self.model = DataProvider()
         self.ordenes_controller = OrdenesController(self.model)
         
+        # Sondeo de pallets en un hilo aparte: la interfaz solo aplica los resultados
+        # (las señales I/O las vigila el IOController en su propio hilo)
+        self.worker = DataWorker()
+        
         # Limpiar la vista de órdenes al inicio para que se vea vacía
         # (aunque la BD pueda tener datos, no se muestran hasta cargar mapa)
         self.ordenes_controller.view.clear_orders()
@@ -25,14 +35,15 @@ class MainController(QObject):
         
         self.current_pallet_id = None
         self.current_image_path = None
-        self.pallets_data = []  # Copia en memoria de los datos de los pallets
-        
-        # Temporizador para actualizar los pallets cada 500 ms
-        self.pallet_timer = QTimer()
-        self.pallet_timer.timeout.connect(self.update_pallets_display)
         
+        self.worker.start()
         self.view.show()
-        sys.exit(self.app.exec_())
+        codigo = self.app.exec_()
+        # La ventana puede cerrarse sin pasar por on_salir: detener también el hilo de I/O
+        if hasattr(self.view, 'io_controller'):
+            self.view.io_controller.stop_monitoring()
+        self.worker.stop()
+        sys.exit(codigo)
     
     def cargar_estilos(self):
         try:
@@ -58,13 +69,49 @@ class MainController(QObject):
         self.view.propiedades_actualizadas.connect(self.on_propiedades_actualizadas)
         self.view.imagen_cargada.connect(self.on_imagen_cargada)
         self.view.add_to_orders_clicked.connect(self.on_add_to_orders_clicked)
+        self.view.region_solicitada.connect(self.on_region_solicitada)
+        self.view.filtro_cambiado.connect(self.on_filtro_cambiado)
+        self.view.mapa_calor_cambiado.connect(self.worker.set_mapa_calor)
+        self.worker.region_lista.connect(self.on_region_lista)
+        self.worker.parche_listo.connect(self.on_parche_listo)
+        self.worker.filtro_listo.connect(self.view.mostrar_filtro)
+        self.worker.calor_listo.connect(self.view.mostrar_mapa_calor)
+        self.worker.huecos_encontrados.connect(self.view.mostrar_sugerencia)
+        self.worker.ordenes_importadas.connect(self.ordenes_controller.add_stored_orders)
+        self.ordenes_controller.orden_creada.connect(self.on_orden_creada)
     
     def cargar_pallets(self):
         if not self.current_image_path:
             return
-        self.pallets_data = self.model.get_all_pallets()
-        for pallet in self.pallets_data:
-            self.view.dibujar_pallet(pallet)
+        self.worker.cargar_mapa(*self.view.extension_mapa())
+        # Solo se crean los elementos de la zona visible; el resto se carga al desplazar o hacer zoom
+        self.view.comprobar_region_visible()
+    
+    def on_region_solicitada(self, x0: float, y0: float, x1: float, y1: float):
+        self.worker.solicitar_region((x0, y0, x1, y1), self.view.graphics_view.nivel_zoom,
+                                     self.view.tamano_celda_cluster())
+    
+    def on_region_lista(self, region: tuple, pallets, agregados):
+        """Mostrar la zona calculada por el worker: pallets individuales o agregados por celda"""
+        if not self.current_image_path:
+            return
+        if pallets is None:
+            self.view.mostrar_clusters(*agregados)
+            return
+        self.view.ocultar_clusters()
+        self.view.sincronizar_region(region, pallets)
+    
+    def on_filtro_cambiado(self, expresion: str):
+        """Validar la expresión aquí (para avisar al usuario) y evaluarla en el worker"""
+        if not expresion.strip():
+            self.worker.aplicar_filtro(None)
+            return
+        try:
+            filtro = PalletFilter(expresion)
+        except ValueError as e:
+            QMessageBox.warning(self.view, "Filtro no válido", str(e))
+            return
+        self.worker.aplicar_filtro(filtro)
     
     def on_imagen_cargada(self, image_path: str):
         self.view.limpiar_escena()
@@ -75,12 +122,11 @@ class MainController(QObject):
             self.view.mostrar_panel_ordenes()
             self.cargar_pallets()
             self.ordenes_controller.load_orders()  # Carga las órdenes existentes
-            # Iniciar el temporizador de actualización de pallets
-            self.pallet_timer.start(500)
             QMessageBox.information(self.view, "Éxito", "Mapa cargado correctamente")
     
     def on_pallet_seleccionado(self, pallet_id: str):
         self.current_pallet_id = pallet_id
+        self.view.ocultar_sugerencia()
         pallet_data = self.model.get_pallet_by_id(pallet_id)
         if pallet_data:
             if pallet_data.get("Ocupado") == 1:
@@ -91,11 +137,18 @@ class MainController(QObject):
                 self.view.limpiar_propiedades_pallet()
                 self.ordenes_controller.set_current_pallet(None)
     
+    def on_orden_creada(self, pallet_id: str):
+        """Sugerir en el mapa dónde colocar el pallet de la nueva orden"""
+        self.worker.buscar_huecos(pallet_id, self.HUECOS_SUGERIDOS)
+    
     def on_add_to_orders_clicked(self):
         if not self.current_image_path:
             QMessageBox.warning(self.view, "Mapa no cargado", "Por favor, cargue un mapa primero antes de añadir órdenes.")
             return
-        if self.current_pallet_id:
+        seleccionados = self.view.pallets_seleccionados()
+        if len(seleccionados) > 1:
+            self.ordenes_controller.add_orders(seleccionados)
+        elif self.current_pallet_id:
             self.ordenes_controller.add_order()
         else:
             QMessageBox.warning(self.view, "Sin pallet seleccionado", "Por favor, seleccione un pallet primero.")
@@ -106,95 +159,69 @@ class MainController(QObject):
                 QMessageBox.warning(self.view, "Error", "Las coordenadas X e Y no se pueden editar directamente")
                 return
             
-            # Guardar el valor anterior de ocupado (si existe) para comparar
-            pallet_anterior = self.model.get_pallet_by_id(self.current_pallet_id)
-            ocupado_anterior = pallet_anterior.get("Ocupado") if pallet_anterior else None
-            
-            # Actualizar en base de datos
-            self.model.update_pallet(self.current_pallet_id, **propiedades)
-            
-            # Obtener el nuevo estado
-            pallet_data = self.model.get_pallet_by_id(self.current_pallet_id)
+            # La modificación del pallet y la limpieza de sus órdenes se confirman juntas
+            try:
+                with self.model.unit_of_work():
+                    # Guardar el valor anterior de ocupado (si existe) para comparar
+                    pallet_anterior = self.model.get_pallet_by_id(self.current_pallet_id)
+                    ocupado_anterior = pallet_anterior.get("Ocupado") if pallet_anterior else None
+                    
+                    self.model.update_pallet(self.current_pallet_id, **propiedades)
+                    pallet_data = self.model.get_pallet_by_id(self.current_pallet_id)
+                    
+                    # Si se cambió de ocupado=1 a ocupado=0, su orden (si tenía) se ha cumplido:
+                    # sale de la lista de órdenes y pasa al historial como completada
+                    desocupado = (pallet_data is not None and "Ocupado" in propiedades
+                                  and ocupado_anterior == 1 and propiedades["Ocupado"] == 0)
+                    if desocupado:
+                        self.ordenes_controller.ordenes_model.complete_orders_by_pallets([self.current_pallet_id])
+            except Exception as e:
+                QMessageBox.critical(self.view, "Error", f"No se pudieron actualizar las propiedades: {e}")
+                return
             
-            # Actualizar la copia en memoria
-            for i, pallet in enumerate(self.pallets_data):
-                if pallet["ID"] == self.current_pallet_id:
-                    self.pallets_data[i].update(propiedades)
-                    break
+            # Redibujar sin esperar al siguiente sondeo
+            self.worker.refrescar()
             
-            # Si se actualizó el campo Ocupado, redibujar
-            if "Ocupado" in propiedades and pallet_data:
-                self.view.actualizar_pallet_visual(self.current_pallet_id, pallet_data)
-                
-                # Si se cambió de ocupado=1 a ocupado=0, eliminar de la lista de órdenes si estaba
-                nuevo_ocupado = propiedades["Ocupado"]
-                if ocupado_anterior == 1 and nuevo_ocupado == 0:
-                    self.ordenes_controller.delete_order_by_pallet(self.current_pallet_id)
-                    # Si el pallet actual se desocupó, limpiar propiedades
-                    if self.current_pallet_id == pallet_data["ID"]:
-                        self.view.limpiar_propiedades_pallet()
-                        self.ordenes_controller.set_current_pallet(None)
+            if desocupado:
+                self.ordenes_controller.forget_pallets([self.current_pallet_id])
+                # Si el pallet actual se desocupó, limpiar propiedades
+                self.view.limpiar_propiedades_pallet()
+                self.ordenes_controller.set_current_pallet(None)
             
             QMessageBox.information(self.view, "Éxito", "Propiedades actualizadas correctamente")
     
-    def update_pallets_display(self):
-        """Actualiza la visualización de los pallets si hubo cambios en la base de datos."""
-        if not self.current_image_path:
-            return
-        
+    def on_parche_listo(self, patch, agregados):
+        """Aplicar a la vista los cambios calculados por el worker."""
         try:
-            current_pallets = self.model.get_all_pallets()
-        except Exception as e:
-            print(f"Error al obtener pallets: {e}")
-            return
-        
-        # Crear un diccionario de los pallets actuales para acceso rápido
-        current_dict = {p["ID"]: p for p in current_pallets}
-        
-        # Verificar pallets que han cambiado o se han eliminado
-        pallets_a_actualizar = []
-        
-        # Primero, verificar cambios en los pallets existentes
-        for pallet in self.pallets_data:
-            pallet_id = pallet["ID"]
-            current = current_dict.get(pallet_id)
-            if current is None:
-                # El pallet fue eliminado de la base de datos
-                pallets_a_actualizar.append((pallet_id, None))
-            else:
-                # Comparar campos relevantes: Ocupado y Calidad (y cualquier otro que afecte la vista)
-                if (pallet.get("Ocupado") != current.get("Ocupado") or
-                    pallet.get("Calidad") != current.get("Calidad")):
-                    pallets_a_actualizar.append((pallet_id, current))
-                # Actualizar la copia en memoria para futuras comparaciones
-                pallet.update(current)
-        
-        # Verificar nuevos pallets (que no estaban en memoria)
-        for pallet_id, current in current_dict.items():
-            if not any(p["ID"] == pallet_id for p in self.pallets_data):
-                # Es un nuevo pallet
-                self.pallets_data.append(current)
-                pallets_a_actualizar.append((pallet_id, current))
-        
-        # Aplicar las actualizaciones visuales
-        for pallet_id, data in pallets_a_actualizar:
-            if data is None:
-                # Eliminar pallet de la vista
-                if pallet_id in self.view.pallet_items:
-                    for item in self.view.pallet_items[pallet_id]:
-                        self.view.scene.removeItem(item)
-                    del self.view.pallet_items[pallet_id]
-            else:
-                # Actualizar o dibujar nuevo pallet
-                self.view.actualizar_pallet_visual(pallet_id, data)
+            if not self.current_image_path:
+                return
+            if agregados is not None and self.view.modo_clusters:
+                self.view.mostrar_clusters(*agregados)
+            for pallet_id in patch.removed:
+                self.view.eliminar_pallet(pallet_id)
+            for pallet in patch.added:
+                self.view.actualizar_pallet_visual(pallet["ID"], pallet)
+            for pallet_id, (pallet, campos) in patch.changed.items():
+                self.view.actualizar_pallet_visual(pallet_id, pallet, campos)
+            if patch.matched or patch.unmatched:
+                self.view.actualizar_filtro(patch.matched, patch.unmatched)
+            # Las órdenes de pallets eliminados se borran en cascada; las demás se reordenan
+            self.ordenes_controller.forget_pallets(patch.removed)
+            prioridades = {pallet_id: pallet["Prioridad"] for pallet_id, (pallet, campos) in patch.changed.items()
+                           if "Prioridad" in campos}
+            if prioridades:
+                self.ordenes_controller.update_priorities(prioridades)
+        finally:
+            self.worker.confirmar_parche()
     
     def on_salir(self):
         # Detener temporizadores
-        self.pallet_timer.stop()
         if hasattr(self.view, 'io_controller'):
             self.view.io_controller.stop_monitoring()
         
         reply = QMessageBox.question(self.view, 'Salir', '¿Está seguro de salir de la aplicación?',
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
+            self.worker.stop()
+            ConnectionManager.close_all()
             self.app.quit()
\ No newline at end of file
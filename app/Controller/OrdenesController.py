@@ -1,23 +1,35 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 from PyQt5.QtWidgets import QMessageBox
 from Model.OrdenesModel import OrdenesModel
+from Model.OrderScheduler import OrderScheduler
 from View.OrdenesWidget import OrdenesWidget
+from View.OrdenesTableModel import OrdenesTableModel
 
 class OrdenesController(QObject):
+    # ID del pallet de cada orden nueva
+    orden_creada = pyqtSignal(str)
+    
     def __init__(self, model):
         super().__init__()
         self.model = model  # DataProvider
-        self.ordenes_model = OrdenesModel()
+        self.ordenes_model = OrdenesModel(model.db_path)  # Mismo fichero que los pallets
         self.view = OrdenesWidget()
         self.current_pallet = None
+        # Cola de prioridad de las órdenes pendientes; la clave de cada orden se guarda en la columna Secuencia
+        self.scheduler = OrderScheduler()
+        # Filas de la tabla: se cargan por páginas y se actualizan una a una; el turno lo da la cola
+        self.table_model = OrdenesTableModel(self.ordenes_model, self.scheduler.turno)
+        self.view.set_model(self.table_model)
         
         # Conectar señales de la vista
         self.view.add_order_requested.connect(self.add_order)
         self.view.delete_order_requested.connect(self.delete_order)
         self.view.move_up_requested.connect(self.move_up)
         self.view.move_down_requested.connect(self.move_down)
+        self.view.optimize_requested.connect(self.optimize_destinations)
         
         # Cargar órdenes iniciales
+        self.load_schedule()
         self.load_orders()
     
     def get_widget(self):
@@ -26,16 +38,22 @@ class OrdenesController(QObject):
     def set_current_pallet(self, pallet_id):
         self.current_pallet = pallet_id
     
+    def load_schedule(self):
+        """Reconstruir la cola de prioridad desde la base de datos y guardar sus claves."""
+        self.scheduler.load(self.ordenes_model.get_scheduling_data())
+        self.save_sequence()
+    
+    def save_sequence(self):
+        """Guardar la clave de las órdenes cuyo turno ha cambiado y refrescar la columna de turnos."""
+        try:
+            self.ordenes_model.save_sequence(self.scheduler.claves_modificadas())
+        except Exception as e:
+            print(f"Error al guardar la secuencia de órdenes: {e}")
+        self.table_model.update_sequence()
+    
     def load_orders(self):
-        """Cargar todas las órdenes desde la base de datos y mostrarlas en la tabla."""
-        self.view.clear_orders()
-        orders = self.ordenes_model.get_all_orders()
-        for order in orders:
-            self.view.add_order_item(
-                order_id=order['ID'],
-                origen=order['Origen'],
-                destino=order['Destino']
-            )
+        """Recargar la tabla desde la base de datos (solo la primera página; el resto al desplazarse)."""
+        self.table_model.reload()
     
     def add_order(self):
         if not self.current_pallet:
@@ -70,40 +88,116 @@ class OrdenesController(QObject):
         
         origen = pallet_data.get("Posicion")  # Asumiendo que 'Posicion' es el origen
         # Insertar orden en la base de datos
-        self.ordenes_model.insert_order(origen, self.current_pallet)
-        self.load_orders()  # Refrescar vista
+        order_id = self.ordenes_model.insert_order(origen, self.current_pallet)
+        orden = self.ordenes_model.get_order_by_pallet(self.current_pallet)
+        self.scheduler.add(order_id, orden['Destino'], pallet_data.get("Prioridad"), self.current_pallet)
+        self.table_model.add_order(orden)
+        self.save_sequence()
+        self.orden_creada.emit(self.current_pallet)
+    
+    def add_orders(self, pallet_ids) -> int:
+        """Añadir varios pallets a la vez (selección múltiple en el mapa) y retornar cuántas órdenes se crearon.
+        
+        La validación y los INSERT se hacen en una sola transacción; la tabla recibe
+        solo las filas nuevas. No se sugieren huecos (eso es para órdenes individuales).
+        """
+        try:
+            creadas, rechazados = self.ordenes_model.insert_orders_for_pallets(pallet_ids)
+        except Exception as e:
+            QMessageBox.critical(self.view, "Error", f"No se pudieron añadir las órdenes: {e}")
+            return 0
+        
+        self.add_stored_orders(creadas)
+        
+        if rechazados:
+            motivos = {}
+            for motivo in rechazados.values():
+                motivos[motivo] = motivos.get(motivo, 0) + 1
+            detalle = "\n".join(f"- {motivo}: {cantidad}" for motivo, cantidad in motivos.items())
+            QMessageBox.warning(
+                self.view,
+                "Pallets no añadidos",
+                f"Se añadieron {len(creadas)} de {len(creadas) + len(rechazados)} pallets.\n"
+                f"Pallets no añadidos porque el pallet...\n{detalle}"
+            )
+        return len(creadas)
+    
+    def add_stored_orders(self, ordenes):
+        """Añadir a la cola y a la tabla órdenes ya guardadas (con la Prioridad de su pallet)."""
+        for orden in ordenes:
+            self.scheduler.add(orden['ID'], orden['Destino'], orden['Prioridad'], orden['Pallet_ID'])
+            self.table_model.add_order(orden)
+        if ordenes:
+            self.save_sequence()
     
     def delete_order(self, order_id: int):
         """Eliminar una orden por ID."""
         self.ordenes_model.delete_order(order_id)
-        self.load_orders()
+        self.scheduler.remove(order_id)
+        self.table_model.remove_order(order_id)
+        self.save_sequence()
     
-    def delete_order_by_pallet(self, pallet_id: str):
-        """Eliminar todas las órdenes asociadas a un pallet específico."""
-        orders = self.ordenes_model.get_all_orders()
-        for order in orders:
-            if order.get('Pallet_ID') == pallet_id:
-                self.ordenes_model.delete_order(order['ID'])
-        self.load_orders()
+    def forget_pallets(self, pallet_ids) -> bool:
+        """Quitar de la cola las órdenes de pallets ya eliminadas en la base de datos
+        (p. ej. en cascada al borrar el pallet); retorna si había alguna."""
+        quitadas = False
+        for pallet_id in pallet_ids:
+            for order_id in self.scheduler.remove_pallet(pallet_id):
+                self.table_model.remove_order(order_id)
+                quitadas = True
+        if quitadas:
+            self.save_sequence()
+        return quitadas
+    
+    def update_priorities(self, prioridades: dict):
+        """Reordenar la cola tras cambiar la Prioridad de algunos pallets (ID -> prioridad)."""
+        cambiadas = False
+        for pallet_id, prioridad in prioridades.items():
+            cambiadas |= self.scheduler.set_prioridad(pallet_id, prioridad)
+        if cambiadas:
+            self.save_sequence()
+    
+    def _swap(self, row: int, other_row: int):
+        """Intercambiar los destinos de las órdenes de dos filas en la base de datos, la cola y la tabla."""
+        orden = self.table_model.order(row)
+        otra = self.table_model.order(other_row)
+        self.ordenes_model.swap_destinations(orden['ID'], otra['ID'])
+        orden['Destino'], otra['Destino'] = otra['Destino'], orden['Destino']
+        turno_cambiado = False
+        for o in (orden, otra):
+            turno_cambiado |= self.scheduler.set_destino(o['ID'], o['Destino'])
+            self.table_model.update_order(o)
+        if turno_cambiado:
+            self.save_sequence()
     
     def move_up(self, order_id: int):
         """Mover una orden hacia arriba (intercambiar destinos con la anterior)."""
-        orders = self.ordenes_model.get_all_orders()
-        ids = [o['ID'] for o in orders]
-        if order_id in ids:
-            idx = ids.index(order_id)
-            if idx > 0:
-                prev_id = ids[idx - 1]
-                self.ordenes_model.swap_destinations(order_id, prev_id)
-                self.load_orders()
+        row = self.table_model.row_of(order_id)
+        if row is not None and row > 0:
+            self._swap(row, row - 1)
     
     def move_down(self, order_id: int):
         """Mover una orden hacia abajo (intercambiar destinos con la siguiente)."""
-        orders = self.ordenes_model.get_all_orders()
-        ids = [o['ID'] for o in orders]
-        if order_id in ids:
-            idx = ids.index(order_id)
-            if idx < len(ids) - 1:
-                next_id = ids[idx + 1]
-                self.ordenes_model.swap_destinations(order_id, next_id)
-                self.load_orders()
\ No newline at end of file
+        row = self.table_model.row_of(order_id)
+        if row is None:
+            return
+        if row == self.table_model.rowCount() - 1 and self.table_model.canFetchMore():
+            self.table_model.fetchMore()
+        if row < self.table_model.rowCount() - 1:
+            self._swap(row, row + 1)
+    
+    def optimize_destinations(self):
+        """Reasignar los destinos de la cola según la distancia de cada pallet a los destinos."""
+        try:
+            antes, despues = self.ordenes_model.optimize_destinations()
+        except Exception as e:
+            QMessageBox.critical(self.view, "Error", f"No se pudieron optimizar los destinos: {e}")
+            return
+        self.load_schedule()
+        self.load_orders()
+        ahorro = (1 - despues / antes) * 100 if antes else 0.0
+        QMessageBox.information(
+            self.view,
+            "Destinos optimizados",
+            f"Distancia total: {antes:.1f} m → {despues:.1f} m ({ahorro:.0f}% menos)."
+        )
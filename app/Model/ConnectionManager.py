@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+
+class ConnectionManager:
+    """Gestor de conexiones SQLite compartido por todos los proveedores de datos.
+
+    Mantiene una única conexión de larga duración por base de datos y por hilo
+    (sqlite3 no permite compartir conexiones entre hilos), configurada en modo
+    WAL para que los lectores de la interfaz y los escritores externos
+    (pasarela del PLC, WMS) no se bloqueen entre sí.
+    """
+
+    # Sentencias preparadas que sqlite3 guarda por conexión
+    CACHED_STATEMENTS = 256
+
+    # Tiempo máximo de espera (ms) cuando otro proceso tiene el bloqueo de escritura
+    BUSY_TIMEOUT_MS = 5000
+
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",     # Seguro en WAL: solo se pierde la última transacción ante un corte de luz
+        "PRAGMA cache_size = -16000",      # ~16 MB de caché de páginas
+        "PRAGMA mmap_size = 268435456",    # 256 MB de lectura mapeada en memoria
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA foreign_keys = ON",        # SQLite no comprueba las claves foráneas salvo que se active
+        f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    )
+
+    _local = threading.local()
+    _lock = threading.Lock()
+    _all_connections: List[sqlite3.Connection] = []
+    _keys: Dict[tuple, str] = {}
+
+    @classmethod
+    def _connections(cls) -> Dict[str, sqlite3.Connection]:
+        """Conexiones abiertas por el hilo actual, indexadas por ruta de la base de datos."""
+        if not hasattr(cls._local, "connections"):
+            cls._local.connections = {}
+        return cls._local.connections
+
+    @classmethod
+    def _key(cls, db_path: str) -> str:
+        # Path.resolve() consulta el sistema de ficheros: se memoriza por directorio de trabajo
+        clave = (os.getcwd(), db_path)
+        key = cls._keys.get(clave)
+        if key is None:
+            key = cls._keys[clave] = str(Path(db_path).resolve())
+        return key
+
+    @classmethod
+    def get_connection(cls, db_path: str) -> sqlite3.Connection:
+        """Obtener la conexión del hilo actual para la base de datos indicada (creándola si no existe)."""
+        connections = cls._connections()
+        key = cls._key(db_path)
+        conn = connections.get(key)
+        if conn is None:
+            conn = sqlite3.connect(
+                db_path,
+                timeout=cls.BUSY_TIMEOUT_MS / 1000,
+                isolation_level=None,  # Transacciones explícitas mediante transaction()
+                cached_statements=cls.CACHED_STATEMENTS,
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in cls.PRAGMAS:
+                conn.execute(pragma)
+            connections[key] = conn
+            with cls._lock:
+                cls._all_connections.append(conn)
+        return conn
+
+    @classmethod
+    @contextmanager
+    def transaction(cls, db_path: str, immediate: bool = True):
+        """Ejecutar un bloque dentro de una transacción (commit al salir, rollback si hay error).
+
+        Las transacciones anidadas se integran en la transacción exterior.
+        """
+        conn = cls.get_connection(db_path)
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    @classmethod
+    def close_thread_connections(cls):
+        """Cerrar las conexiones abiertas por el hilo actual."""
+        connections = cls._connections()
+        for conn in connections.values():
+            with cls._lock:
+                if conn in cls._all_connections:
+                    cls._all_connections.remove(conn)
+            conn.close()
+        connections.clear()
+
+    @classmethod
+    def close_all(cls):
+        """Cerrar todas las conexiones (al salir de la aplicación)."""
+        with cls._lock:
+            connections = list(cls._all_connections)
+            cls._all_connections.clear()
+        for conn in connections:
+            try:
+                try:
+                    # Actualizar las estadísticas del planificador si los datos han cambiado mucho
+                    conn.execute("PRAGMA optimize")
+                except sqlite3.OperationalError:
+                    pass  # Base de datos bloqueada por otro proceso: se hará en otro cierre
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Conexión creada en otro hilo: se cierra al terminar dicho hilo
+                pass
+        cls._connections().clear()
@@ -1,20 +1,75 @@
+import math
 import sqlite3
 import uuid
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Sequence, Union
+
+import numpy as np
+
+from Model.ConnectionManager import ConnectionManager
+from Model.PalletCache import PalletCache
+from Model.PalletStore import COLUMNAS, convertir
 
 class DataProvider:
+    COLUMNS = ("ID", "Largo", "Ancho", "Posicion", "Alto", "Calidad",
+               "Peso", "Prioridad", "X", "Y", "Ocupado")
+    
+    # Filas por transacción en las inserciones masivas
+    INSERT_BATCH_SIZE = 10000
+    
+    # Índices secundarios: nombre -> columnas. Solo los que usa una consulta real (ver
+    # benchmarks/bench_find_pallets.py); cada índice más encarece toda escritura en pallets
+    ATTRIBUTE_INDEXES = {
+        # Pallets ocupados/libres por prioridad, ya ordenados para order_by="-Prioridad"
+        "pallets_ocupado": ("Ocupado", "Prioridad"),
+        # Búsqueda por posición (igualdad, IN o rango)
+        "pallets_posicion": ("Posicion",),
+    }
+    # Índices de versiones anteriores que ya no usa ninguna consulta
+    OBSOLETE_INDEXES = ("pallets_calidad", "pallets_prioridad")
+    
+    # Pallets que get_pallet_by_id mantiene en memoria
+    CACHE_SIZE = 1024
+    
+    # Sufijos de find_pallets (Campo__op=valor) -> operador SQL
+    OPERATORS = {"eq": "=", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">=", "in": "IN"}
+    
+    # Entradas del registro de cambios que se conservan al compactarlo
+    CHANGES_RETENTION = 50000
+    
+    # Tolerancia (m) al comparar el R*Tree (float32) con las coordenadas de la tabla
+    SPATIAL_TOLERANCE = 0.01
+    
     def __init__(self, db_path: str = "DB/pallets.db"):
         self.db_path = db_path
+        self.spatial_index = False  # True si el R*Tree está disponible
+        self.cache = PalletCache(self.CACHE_SIZE)
+        self._cache_marca = None  # (conexión, data_version, total_changes) de la última sincronización
         self._create_database()
     
+    def _connection(self):
+        """Conexión persistente del hilo actual a pallets.db"""
+        return ConnectionManager.get_connection(self.db_path)
+    
+    def _transaction(self):
+        """Transacción sobre pallets.db (se integra en una transacción exterior si existe)"""
+        return ConnectionManager.transaction(self.db_path)
+    
+    def unit_of_work(self):
+        """Agrupar varias operaciones (pallets, órdenes...) en una transacción atómica.
+        
+        Todas las tablas comparten fichero, así que las llamadas a los modelos dentro
+        del bloque se integran en ella y se confirman juntas con un único commit.
+        """
+        return self._transaction()
+    
     def _create_database(self):
         """Crear la base de datos y la tabla si no existen"""
         Path("DB").mkdir(exist_ok=True)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with self._transaction() as conn:
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS pallets (
                     ID TEXT PRIMARY KEY,
                     Largo REAL NOT NULL,
@@ -29,7 +84,114 @@ class DataProvider:
                     Ocupado BOOLEAN NOT NULL
                 )
             """)
-            conn.commit()
+            self._create_change_feed(conn)
+            self._create_spatial_index(conn)
+            self._create_attribute_indexes(conn)
+    
+    def _create_change_feed(self, conn):
+        """Crear el registro de cambios de pallets y los triggers que lo alimentan.
+        
+        Cada inserción, modificación o borrado en `pallets` (hecho por la aplicación
+        o por procesos externos) añade una entrada con una revisión creciente.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pallets_changes (
+                Rev INTEGER PRIMARY KEY AUTOINCREMENT,
+                Pallet_ID TEXT NOT NULL,
+                Deleted BOOLEAN NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS pallets_changes_insert AFTER INSERT ON pallets
+            BEGIN
+                INSERT INTO pallets_changes (Pallet_ID) VALUES (NEW.ID);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS pallets_changes_update AFTER UPDATE ON pallets
+            WHEN (OLD.ID, OLD.Largo, OLD.Ancho, OLD.Posicion, OLD.Alto, OLD.Calidad,
+                  OLD.Peso, OLD.Prioridad, OLD.X, OLD.Y, OLD.Ocupado)
+              IS NOT (NEW.ID, NEW.Largo, NEW.Ancho, NEW.Posicion, NEW.Alto, NEW.Calidad,
+                      NEW.Peso, NEW.Prioridad, NEW.X, NEW.Y, NEW.Ocupado)
+            BEGIN
+                INSERT INTO pallets_changes (Pallet_ID, Deleted)
+                    SELECT OLD.ID, 1 WHERE OLD.ID <> NEW.ID;
+                INSERT INTO pallets_changes (Pallet_ID) VALUES (NEW.ID);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS pallets_changes_delete AFTER DELETE ON pallets
+            BEGIN
+                INSERT INTO pallets_changes (Pallet_ID, Deleted) VALUES (OLD.ID, 1);
+            END
+        """)
+    
+    def _create_spatial_index(self, conn):
+        """Crear el índice espacial R*Tree sobre las coordenadas X/Y de los pallets.
+        
+        Las entradas usan el rowid de `pallets` como ID y se mantienen sincronizadas
+        mediante triggers. Si SQLite no incluye el módulo R*Tree, las consultas
+        espaciales recurren a un filtro por rango sobre la tabla.
+        """
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS pallets_rtree USING rtree(
+                    id, min_x, max_x, min_y, max_y
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"Índice espacial R*Tree no disponible: {e}")
+            return
+        
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS pallets_rtree_insert AFTER INSERT ON pallets
+            BEGIN
+                INSERT INTO pallets_rtree VALUES (NEW.rowid, NEW.X, NEW.X, NEW.Y, NEW.Y);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS pallets_rtree_update AFTER UPDATE OF X, Y ON pallets
+            BEGIN
+                UPDATE pallets_rtree SET min_x = NEW.X, max_x = NEW.X, min_y = NEW.Y, max_y = NEW.Y
+                WHERE id = NEW.rowid;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS pallets_rtree_delete AFTER DELETE ON pallets
+            BEGIN
+                DELETE FROM pallets_rtree WHERE id = OLD.rowid;
+            END
+        """)
+        
+        # Reconstruir si el índice no refleja la tabla (creado ahora, o rowids renumerados por un VACUUM)
+        total = conn.execute("SELECT COUNT(*) FROM pallets").fetchone()[0]
+        total_indice = conn.execute("SELECT COUNT(*) FROM pallets_rtree").fetchone()[0]
+        coincidentes = conn.execute("""
+            SELECT COUNT(*) FROM pallets_rtree AS r JOIN pallets AS p ON p.rowid = r.id
+            WHERE ABS(r.min_x - p.X) <= :tol AND ABS(r.min_y - p.Y) <= :tol
+        """, {"tol": self.SPATIAL_TOLERANCE}).fetchone()[0]
+        if not (total == total_indice == coincidentes):
+            conn.execute("DELETE FROM pallets_rtree")
+            conn.execute("INSERT INTO pallets_rtree SELECT rowid, X, X, Y, Y FROM pallets")
+        
+        self.spatial_index = True
+    
+    def _create_attribute_indexes(self, conn):
+        """Crear los índices de atributos que usa find_pallets"""
+        for nombre in self.OBSOLETE_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {nombre}")
+        for nombre, columnas in self.ATTRIBUTE_INDEXES.items():
+            # Un índice anterior con el mismo nombre pero otras columnas se vuelve a crear
+            actuales = tuple(row[2] for row in conn.execute(f"PRAGMA index_info({nombre})"))
+            if actuales and actuales != columnas:
+                conn.execute(f"DROP INDEX {nombre}")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON pallets ({', '.join(columnas)})")
+        
+        # Sin estadísticas el planificador supone que cualquier igualdad es selectiva
+        # (p. ej. Ocupado = 1). Luego las mantiene al día el PRAGMA optimize al cerrar
+        sin_estadisticas = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        if sin_estadisticas and conn.execute("SELECT 1 FROM pallets LIMIT 1").fetchone():
+            conn.execute("ANALYZE pallets")
     
     @staticmethod
     def generate_hex_id(length: int = 8) -> str:
@@ -38,21 +200,230 @@ class DataProvider:
     
     def get_all_pallets(self) -> List[Dict[str, Any]]:
         """Obtener todos los pallets de la base de datos"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM pallets")
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+        rows = self._connection().execute("SELECT * FROM pallets").fetchall()
+        return [dict(row) for row in rows]
+    
+    def _build_find_query(self, predicates: Dict[str, Any],
+                          order_by: Union[str, Sequence[str], None],
+                          limit: Optional[int]) -> Tuple[str, List[Any]]:
+        """Traducir los argumentos de find_pallets a SQL, validando columnas y operadores"""
+        condiciones = []
+        params: List[Any] = []
+        for clave, valor in predicates.items():
+            columna, _, operador = clave.partition("__")
+            operador = operador or "eq"
+            if columna not in self.COLUMNS:
+                raise ValueError(f"Columna desconocida: {columna}")
+            if operador not in self.OPERATORS:
+                raise ValueError(f"Operador desconocido: {operador}")
+            if operador == "in":
+                valores = list(valor)
+                if not valores:
+                    condiciones.append("0")  # IN () nunca se cumple
+                    continue
+                condiciones.append(f"{columna} IN ({', '.join('?' for _ in valores)})")
+                params.extend(valores)
+            else:
+                condiciones.append(f"{columna} {self.OPERATORS[operador]} ?")
+                params.append(valor)
+        
+        sql = "SELECT * FROM pallets"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        
+        if order_by:
+            orden = []
+            for campo in ([order_by] if isinstance(order_by, str) else order_by):
+                columna = campo.lstrip("-")
+                if columna not in self.COLUMNS:
+                    raise ValueError(f"Columna de orden desconocida: {columna}")
+                orden.append(f"{columna} DESC" if campo.startswith("-") else columna)
+            sql += " ORDER BY " + ", ".join(orden)
+        
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return sql, params
+    
+    def find_pallets(self, order_by: Union[str, Sequence[str], None] = None,
+                     limit: Optional[int] = None, **predicates: Any) -> List[Dict[str, Any]]:
+        """Buscar pallets por atributos usando los índices secundarios.
+        
+        Cada predicado es `Campo=valor` o `Campo__op=valor` con op en eq, ne, lt, le,
+        gt, ge o in (todos se combinan con AND). `order_by` acepta una columna o una
+        lista de columnas, con prefijo "-" para orden descendente. Ejemplo:
+        
+            find_pallets(Ocupado=1, Calidad__ne=0, Prioridad__ge=4, order_by="-Prioridad", limit=50)
+        """
+        sql, params = self._build_find_query(predicates, order_by, limit)
+        rows = self._connection().execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+    
+    def explain_find_pallets(self, order_by: Union[str, Sequence[str], None] = None,
+                             limit: Optional[int] = None, **predicates: Any) -> List[str]:
+        """Plan de ejecución (EXPLAIN QUERY PLAN) de la consulta equivalente de find_pallets"""
+        sql, params = self._build_find_query(predicates, order_by, limit)
+        rows = self._connection().execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return [row["detail"] for row in rows]
+    
+    def get_pallet_columns(self) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Obtener todos los pallets como (IDs, columnas NumPy tipadas) para un PalletStore.
+        
+        Lee tuplas en lugar de dicts: con muchos pallets es varias veces más rápido
+        y no crea un objeto por fila.
+        """
+        cursor = self._connection().cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(f"SELECT {', '.join(self.COLUMNS)} FROM pallets").fetchall()
+        valores = list(zip(*rows)) if rows else [()] * len(self.COLUMNS)
+        columnas = {nombre: convertir(valores[i], COLUMNAS[nombre])
+                    for i, nombre in enumerate(self.COLUMNS) if nombre != "ID"}
+        return list(valores[0]), columnas
+    
+    def get_revision(self) -> int:
+        """Obtener la última revisión del registro de cambios (0 si nunca hubo cambios)"""
+        # sqlite_sequence conserva el máximo aunque el registro se haya compactado
+        row = self._connection().execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'pallets_changes'"
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def get_changes_since(self, revision: int) -> Optional[Tuple[int, List[Dict[str, Any]], List[str]]]:
+        """Obtener los pallets modificados y los IDs eliminados después de una revisión.
+        
+        Retorna (nueva_revision, pallets_modificados, ids_eliminados), o None si el
+        registro se ha compactado por detrás de `revision` y hace falta recargar todo.
+        """
+        conn = self._connection()
+        # Lectura consistente: revisión y cambios desde la misma instantánea
+        with ConnectionManager.transaction(self.db_path, immediate=False):
+            max_rev = self.get_revision()
+            if max_rev <= revision:
+                return max_rev, [], []
+            min_rev = conn.execute("SELECT MIN(Rev) FROM pallets_changes").fetchone()[0]
+            if revision < (min_rev or max_rev + 1) - 1:
+                return None
+            
+            rows = conn.execute("""
+                SELECT c.Pallet_ID AS Changed_ID, p.*
+                FROM (SELECT DISTINCT Pallet_ID FROM pallets_changes WHERE Rev > ?) AS c
+                LEFT JOIN pallets AS p ON p.ID = c.Pallet_ID
+            """, (revision,)).fetchall()
+        
+        changed = []
+        deleted = []
+        for row in rows:
+            if row["ID"] is None:
+                deleted.append(row["Changed_ID"])
+            else:
+                pallet = dict(row)
+                del pallet["Changed_ID"]
+                changed.append(pallet)
+        return max_rev, changed, deleted
+    
+    def compact_changes(self, keep: int = None):
+        """Eliminar las entradas antiguas del registro de cambios, conservando las últimas `keep`"""
+        keep = self.CHANGES_RETENTION if keep is None else keep
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM pallets_changes WHERE Rev <= ?",
+                (self.get_revision() - keep,)
+            )
+    
+    def get_pallets_in_rect(self, x0: float, y0: float, x1: float, y1: float) -> List[Dict[str, Any]]:
+        """Obtener los pallets cuyas coordenadas (en metros) caen dentro del rectángulo"""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        params = {"x0": x0, "y0": y0, "x1": x1, "y1": y1}
+        
+        if self.spatial_index:
+            # El R*Tree guarda float32 redondeados hacia fuera: se refina con las coordenadas exactas
+            rows = self._connection().execute("""
+                SELECT p.* FROM pallets_rtree AS r JOIN pallets AS p ON p.rowid = r.id
+                WHERE r.max_x >= :x0 AND r.min_x <= :x1 AND r.max_y >= :y0 AND r.min_y <= :y1
+                  AND p.X BETWEEN :x0 AND :x1 AND p.Y BETWEEN :y0 AND :y1
+            """, params).fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT * FROM pallets WHERE X BETWEEN :x0 AND :x1 AND Y BETWEEN :y0 AND :y1", params
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_nearest_pallets(self, x: float, y: float, k: int = 1,
+                            max_distance: float = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """Obtener los `k` pallets más cercanos a un punto como lista de (distancia, pallet).
+        
+        Busca en ventanas cuadradas crecientes hasta que la k-ésima distancia
+        encontrada queda dentro de la ventana (o se supera `max_distance`).
+        """
+        if k <= 0:
+            return []
+        radio = 1.0
+        limite = max_distance if max_distance is not None else 2.0 ** 20
+        while True:
+            candidatos = self.get_pallets_in_rect(x - radio, y - radio, x + radio, y + radio)
+            distancias = sorted(
+                ((math.hypot(p["X"] - x, p["Y"] - y), p) for p in candidatos),
+                key=lambda item: item[0]
+            )
+            if max_distance is not None:
+                distancias = [d for d in distancias if d[0] <= max_distance]
+            if (len(distancias) >= k and distancias[k - 1][0] <= radio) or radio >= limite:
+                return distancias[:k]
+            radio *= 2
     
     def get_pallet_by_id(self, pallet_id: str) -> Optional[Dict[str, Any]]:
-        """Obtener un pallet por su ID (string)"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM pallets WHERE ID = ?", (pallet_id,))
-            row = cursor.fetchone()
+        """Obtener un pallet por su ID (string), a través de la caché LRU"""
+        conn = self._connection()
+        if conn.in_transaction:
+            # Dentro de una transacción se pueden leer datos aún no confirmados: no se cachean
+            row = conn.execute("SELECT * FROM pallets WHERE ID = ?", (pallet_id,)).fetchone()
             return dict(row) if row else None
+        
+        self._sync_cache()
+        pallet = self.cache.get(pallet_id)
+        if pallet is None:
+            row = conn.execute("SELECT * FROM pallets WHERE ID = ?", (pallet_id,)).fetchone()
+            if row is None:
+                return None
+            pallet = dict(row)
+            self.cache.put(pallet_id, pallet)
+        return dict(pallet)  # Copia: el llamador puede modificarla
+    
+    def _sync_cache(self):
+        """Descartar de la caché los pallets modificados desde su revisión (por cualquier proceso)"""
+        conn = self._connection()
+        # data_version cambia con los commits de otras conexiones y total_changes con los de esta:
+        # si ninguno se ha movido, la base de datos no ha cambiado y no hace falta consultar la revisión
+        marca = (id(conn), conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+        if marca == self._cache_marca:
+            return
+        
+        revision = self.get_revision()
+        anterior = self.cache.revision
+        self._cache_marca = marca
+        if revision == anterior:
+            return
+        
+        if anterior is None:
+            self.cache.clear()
+        else:
+            min_rev = conn.execute("SELECT MIN(Rev) FROM pallets_changes").fetchone()[0]
+            ids = [row[0] for row in conn.execute(
+                "SELECT DISTINCT Pallet_ID FROM pallets_changes WHERE Rev > ? LIMIT ?",
+                (anterior, self.cache.capacidad + 1)
+            )]
+            # Registro compactado por detrás de la caché, o más cambios que entradas: vaciarla
+            if anterior < (min_rev or revision + 1) - 1 or len(ids) > self.cache.capacidad:
+                self.cache.clear()
+            else:
+                self.cache.invalidate(ids)
+        # La revisión se leyó antes que los datos: como mucho se descarta de más, nunca de menos
+        self.cache.revision = revision
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Aciertos, fallos y ocupación de la caché de get_pallet_by_id"""
+        return self.cache.stats()
     
     def update_pallet(self, pallet_id: str, **kwargs):
         """Actualizar las propiedades de un pallet"""
@@ -63,10 +434,9 @@ class DataProvider:
         values = list(kwargs.values())
         values.append(pallet_id)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"UPDATE pallets SET {set_clause} WHERE ID = ?", values)
-            conn.commit()
+        with self._transaction() as conn:
+            conn.execute(f"UPDATE pallets SET {set_clause} WHERE ID = ?", values)
+        self.cache.invalidate([pallet_id, kwargs.get("ID")])
     
     def insert_pallet(self, **kwargs) -> str:
         """Insertar un nuevo pallet y retornar su ID (generado automáticamente si no se provee)"""
@@ -78,15 +448,34 @@ class DataProvider:
         placeholders = ", ".join(["?" for _ in kwargs])
         values = list(kwargs.values())
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"INSERT INTO pallets ({keys}) VALUES ({placeholders})", values)
-            conn.commit()
+        with self._transaction() as conn:
+            conn.execute(f"INSERT INTO pallets ({keys}) VALUES ({placeholders})", values)
             return kwargs['ID']
     
+    def insert_pallets_many(self, pallets: Iterable[Dict[str, Any]], batch_size: int = None) -> int:
+        """Insertar pallets en bloque y retornar cuántos se insertaron.
+        
+        Consume el iterable por lotes de `batch_size` filas, cada uno en su propia
+        transacción con `executemany`, así que admite generadores de millones de filas
+        sin tenerlos en memoria. Los pallets sin ID reciben uno generado.
+        """
+        batch_size = batch_size or self.INSERT_BATCH_SIZE
+        columnas = self.COLUMNS[1:]
+        sql = (f"INSERT INTO pallets ({', '.join(self.COLUMNS)}) "
+               f"VALUES ({', '.join('?' for _ in self.COLUMNS)})")
+        
+        filas = ((p.get("ID") or self.generate_hex_id(),) + tuple(p[c] for c in columnas) for p in pallets)
+        total = 0
+        while True:
+            lote = list(islice(filas, batch_size))
+            if not lote:
+                return total
+            with self._transaction() as conn:
+                conn.executemany(sql, lote)
+            total += len(lote)
+    
     def delete_pallet(self, pallet_id: str):
         """Eliminar un pallet por su ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM pallets WHERE ID = ?", (pallet_id,))
-            conn.commit()
\ No newline at end of file
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM pallets WHERE ID = ?", (pallet_id,))
+        self.cache.invalidate([pallet_id])
@@ -0,0 +1,108 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def hungaro(costes: Sequence[Sequence[float]]) -> List[int]:
+    """Asignación de coste mínimo (algoritmo húngaro) de n filas a m >= n columnas.
+
+    Devuelve la columna asignada a cada fila. Las matrices de este módulo son
+    pequeñas (una ronda de destinos), así que se trabaja con listas de Python:
+    para 11x11 es más rápido que operar con arrays de NumPy.
+    """
+    n = len(costes)
+    m = len(costes[0]) if n else 0
+    if n > m:
+        raise ValueError("Hay más filas que columnas")
+    infinito = float("inf")
+    # Potenciales de filas/columnas, fila asignada a cada columna (índices desde 1; 0 = ninguna)
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    camino = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minimos = [infinito] * (m + 1)
+        usadas = [False] * (m + 1)
+        while True:
+            usadas[j0] = True
+            i0 = p[j0]
+            fila = costes[i0 - 1]
+            delta = infinito
+            j1 = 0
+            for j in range(1, m + 1):
+                if not usadas[j]:
+                    reducido = fila[j - 1] - u[i0] - v[j]
+                    if reducido < minimos[j]:
+                        minimos[j] = reducido
+                        camino[j] = j0
+                    if minimos[j] < delta:
+                        delta = minimos[j]
+                        j1 = j
+            for j in range(m + 1):
+                if usadas[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minimos[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # Aumentar a lo largo del camino encontrado
+        while j0:
+            j1 = camino[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    asignacion = [0] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            asignacion[p[j] - 1] = j - 1
+    return asignacion
+
+
+class DestinationOptimizer:
+    """Asigna destinos a una cola de órdenes minimizando la distancia recorrida.
+
+    Se conserva el reparto cíclico: la cola (en orden) se divide en rondas de
+    tantas órdenes como destinos y en cada ronda cada destino recibe una sola
+    orden. Dentro de cada ronda la asignación es óptima (algoritmo húngaro sobre
+    la matriz de distancias pallet -> destino, calculada de una vez con NumPy).
+    """
+
+    def __init__(self, destinos: Dict[int, Tuple[float, float]]):
+        self.ids = sorted(destinos)
+        self.x = np.array([destinos[d][0] for d in self.ids], dtype=np.float64)
+        self.y = np.array([destinos[d][1] for d in self.ids], dtype=np.float64)
+
+    def costes(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Matriz de distancias (órdenes x destinos); las órdenes sin posición (NaN) cuestan 0"""
+        x = np.asarray(x, dtype=np.float64)[:, None]
+        y = np.asarray(y, dtype=np.float64)[:, None]
+        return np.nan_to_num(np.hypot(x - self.x, y - self.y), nan=0.0)
+
+    def distancia(self, x: np.ndarray, y: np.ndarray, destinos: Sequence[int]) -> float:
+        """Distancia total de una asignación de destinos"""
+        columnas = np.searchsorted(self.ids, destinos)
+        costes = self.costes(x, y)
+        return float(costes[np.arange(len(costes)), columnas].sum())
+
+    def asignar(self, x: np.ndarray, y: np.ndarray, ultima: Optional[Sequence[int]] = None) -> List[int]:
+        """Destino óptimo de cada orden de la cola (coordenadas de sus pallets, en orden).
+
+        `ultima` limita la ronda final incompleta a esos destinos (uno por orden), para
+        que las órdenes que lleguen después completen la ronda con los que faltan.
+        """
+        costes = self.costes(x, y)
+        ronda = len(self.ids)
+        destinos = []
+        for inicio in range(0, len(costes), ronda):
+            bloque = costes[inicio:inicio + ronda]
+            ids = self.ids
+            if ultima is not None and len(bloque) < ronda:
+                ids = list(ultima)
+                bloque = bloque[:, np.searchsorted(self.ids, ids)]
+            columnas = hungaro(bloque.tolist())
+            destinos.extend(ids[c] for c in columnas)
+        return destinos
@@ -1,18 +1,35 @@
-import sqlite3
 from pathlib import Path
 
-class IOProvider:
+from Model.ConnectionManager import ConnectionManager
+from Model.IOSource import IOSource
+
+class IOProvider(IOSource):
+    """Señales I/O en IO.db: respaldo cuando la pasarela del PLC no publica en memoria compartida.
+    
+    SQLite no lleva secuencia de cambios: se cuenta en cada lectura que encuentra
+    valores distintos de la anterior (los cambios entre dos lecturas no se ven).
+    """
+    
     def __init__(self, db_path: str = "DB/IO.db"):
         self.db_path = db_path
+        self._secuencia = 0
+        self._ultimo = None
         self._create_database()
     
+    def _connection(self):
+        """Conexión persistente del hilo actual a IO.db"""
+        return ConnectionManager.get_connection(self.db_path)
+    
+    def _transaction(self):
+        """Transacción sobre IO.db"""
+        return ConnectionManager.transaction(self.db_path)
+    
     def _create_database(self):
         """Crear la base de datos IO si no existe"""
         Path("DB").mkdir(exist_ok=True)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with self._transaction() as conn:
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS io_data (
                     Input INTEGER DEFAULT 0,
                     Output INTEGER DEFAULT 0
@@ -20,19 +37,21 @@ class IOProvider:
             """)
             
             # Verificar si hay datos, si no los hay, insertar (0, 0)
-            cursor.execute("SELECT COUNT(*) FROM io_data")
-            count = cursor.fetchone()[0]
+            count = conn.execute("SELECT COUNT(*) FROM io_data").fetchone()[0]
             if count == 0:
-                cursor.execute("INSERT INTO io_data (Input, Output) VALUES (0, 0)")
-            conn.commit()
+                conn.execute("INSERT INTO io_data (Input, Output) VALUES (0, 0)")
     
     def get_io_data(self):
         """Obtener los valores de Input y Output"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT Input, Output FROM io_data LIMIT 1")
-            result = cursor.fetchone()
-            return result if result else (0, 0)
+        result = self._connection().execute("SELECT Input, Output FROM io_data LIMIT 1").fetchone()
+        return tuple(result) if result else (0, 0)
+    
+    def read(self):
+        valores = self.get_io_data()
+        if valores != self._ultimo:
+            self._ultimo = valores
+            self._secuencia += 1
+        return (self._secuencia, *valores)
     
     def update_io_data(self, input_value: int = None, output_value: int = None):
         """Actualizar los valores de Input y/o Output"""
@@ -50,14 +69,10 @@ class IOProvider:
         if not updates:
             return
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"UPDATE io_data SET {', '.join(updates)}", values)
-            conn.commit()
+        with self._transaction() as conn:
+            conn.execute(f"UPDATE io_data SET {', '.join(updates)}", values)
     
     def reset_io_data(self):
         """Resetear los valores de IO a 0"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE io_data SET Input = 0, Output = 0")
-            conn.commit()
\ No newline at end of file
+        with self._transaction() as conn:
+            conn.execute("UPDATE io_data SET Input = 0, Output = 0")
@@ -0,0 +1,157 @@
+import mmap
+import struct
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Tuple
+
+
+class IOSource(ABC):
+    """Origen de las señales I/O: las palabras Input y Output de la pasarela del PLC.
+
+    Cada lectura lleva una secuencia que crece con cada cambio, de modo que quien
+    vigila el origen sabe si ha cambiado sin comparar valores y, si la secuencia
+    avanza más de uno, cuántos cambios no llegó a ver.
+    """
+
+    # Segundos entre lecturas de quien vigila el origen
+    INTERVALO = 0.5
+    # Tras ESPERA_REPOSO segundos sin cambios se lee cada INTERVALO_REPOSO
+    ESPERA_REPOSO = 0.0
+    INTERVALO_REPOSO = 0.5
+    # Tras un error, segundos entre comprobaciones de si el origen se ha recuperado
+    INTERVALO_ERROR = 0.5
+
+    @abstractmethod
+    def read(self) -> Tuple[int, int, int]:
+        """(secuencia, Input, Output) actuales"""
+
+    def disponible(self) -> bool:
+        """Si una lectura puede completarse ya; sirve para esperar sin coste a que el origen se recupere"""
+        return True
+
+    def get_io_data(self) -> Tuple[int, int]:
+        """Obtener los valores de Input y Output"""
+        return self.read()[1:]
+
+    @abstractmethod
+    def update_io_data(self, input_value: int = None, output_value: int = None):
+        """Actualizar los valores de Input y/o Output"""
+
+    def reset_io_data(self):
+        """Resetear los valores de IO a 0"""
+        self.update_io_data(0, 0)
+
+    def close(self):
+        """Liberar los recursos del origen"""
+
+
+class SharedMemoryIOSource(IOSource):
+    """Señales I/O en memoria compartida: un fichero de 32 bytes en /dev/shm mapeado con mmap.
+
+    La pasarela del PLC (un único escritor) publica las palabras con un seqlock:
+    incrementa la secuencia (impar = escritura en curso), escribe Input, Output y la
+    marca de tiempo y vuelve a incrementarla (par). El lector repite la lectura si la
+    secuencia es impar o ha cambiado mientras leía. Una lectura cuesta unos
+    microsegundos y no toca el disco, así que el origen se puede vigilar cada
+    milisegundo; los cambios más rápidos que eso se detectan por la secuencia.
+    """
+
+    RUTA = "/dev/shm/sistema_gestion_io"
+    MAGIA = b"SGIO"
+    VERSION = 1
+    INTERVALO = 0.001
+    # Los cambios llegan en ráfagas: en reposo basta con leer a 50 Hz
+    ESPERA_REPOSO = 0.1
+    INTERVALO_REPOSO = 0.02
+    INTERVALO_ERROR = 0.25
+    # Segundos de reintentos de una lectura antes de dar por muerto a un escritor que dejó la secuencia impar
+    ESPERA_MAXIMA = 0.5
+
+    # Magia, versión, secuencia, Input, Output, marca de tiempo de la escritura (time.time())
+    CABECERA = struct.Struct("<4sI")
+    SECUENCIA = struct.Struct("<Q")
+    VALORES = struct.Struct("<IId")
+    OFFSET_SECUENCIA = CABECERA.size
+    OFFSET_VALORES = OFFSET_SECUENCIA + SECUENCIA.size
+    TAMAÑO = OFFSET_VALORES + VALORES.size
+
+    def __init__(self, ruta: str = RUTA, escritor: bool = False):
+        """Abrir la memoria compartida; como lector debe existir ya (si no, FileNotFoundError).
+
+        El escritor la crea si no existe o no es válida y, si lo es, continúa su secuencia,
+        de modo que los lectores que ya la tienen mapeada siguen viendo los cambios
+        aunque la pasarela se reinicie.
+        """
+        self.ruta = ruta
+        self.escritor = escritor
+        if escritor:
+            Path(ruta).touch()
+            self._fichero = open(ruta, "r+b")
+            if not self._es_valido(self._fichero.read(self.TAMAÑO)):
+                self._fichero.truncate(0)
+                self._fichero.write(bytes(self.TAMAÑO))
+                self._fichero.seek(0)
+                self._fichero.write(self.CABECERA.pack(self.MAGIA, self.VERSION))
+                self._fichero.flush()
+            self._mapa = mmap.mmap(self._fichero.fileno(), self.TAMAÑO, access=mmap.ACCESS_WRITE)
+            secuencia, = self.SECUENCIA.unpack_from(self._mapa, self.OFFSET_SECUENCIA)
+            if secuencia & 1:
+                # El escritor anterior terminó a mitad de una escritura
+                self.SECUENCIA.pack_into(self._mapa, self.OFFSET_SECUENCIA, secuencia + 1)
+        else:
+            self._fichero = open(ruta, "rb")
+            try:
+                self._mapa = mmap.mmap(self._fichero.fileno(), self.TAMAÑO, access=mmap.ACCESS_READ)
+            except ValueError:
+                self._fichero.close()
+                raise ValueError(f"{ruta} no es una memoria compartida de I/O válida")
+            if not self._es_valido(self._mapa[:self.TAMAÑO]):
+                self.close()
+                raise ValueError(f"{ruta} no es una memoria compartida de I/O válida")
+
+    def _es_valido(self, cabecera: bytes) -> bool:
+        return (len(cabecera) == self.TAMAÑO
+                and self.CABECERA.unpack_from(cabecera) == (self.MAGIA, self.VERSION))
+
+    def read_stamped(self) -> Tuple[int, int, int, float]:
+        """(secuencia, Input, Output, marca de tiempo de la escritura) de una escritura completa"""
+        limite = None
+        while True:
+            antes, = self.SECUENCIA.unpack_from(self._mapa, self.OFFSET_SECUENCIA)
+            if antes & 1 == 0:
+                input_value, output_value, marca = self.VALORES.unpack_from(self._mapa, self.OFFSET_VALORES)
+                despues, = self.SECUENCIA.unpack_from(self._mapa, self.OFFSET_SECUENCIA)
+                if antes == despues:
+                    return antes // 2, input_value, output_value, marca
+            # El escritor puede haber perdido la CPU a mitad de una escritura: cederla y reintentar
+            if limite is None:
+                limite = time.monotonic() + self.ESPERA_MAXIMA
+            elif time.monotonic() > limite:
+                raise TimeoutError(f"Escritura a medias en {self.ruta}: ¿se ha detenido la pasarela del PLC?")
+            time.sleep(0)
+
+    def read(self) -> Tuple[int, int, int]:
+        return self.read_stamped()[:3]
+
+    def disponible(self) -> bool:
+        # Secuencia impar: sigue habiendo una escritura a medias
+        secuencia, = self.SECUENCIA.unpack_from(self._mapa, self.OFFSET_SECUENCIA)
+        return secuencia & 1 == 0
+
+    def update_io_data(self, input_value: int = None, output_value: int = None):
+        if not self.escritor:
+            raise PermissionError("La memoria compartida de I/O está abierta solo para lectura")
+        if input_value is None and output_value is None:
+            return
+        secuencia, input_actual, output_actual, _marca = self.read_stamped()
+        input_value = input_actual if input_value is None else input_value
+        output_value = output_actual if output_value is None else output_value
+        self.SECUENCIA.pack_into(self._mapa, self.OFFSET_SECUENCIA, 2 * secuencia + 1)
+        self.VALORES.pack_into(self._mapa, self.OFFSET_VALORES, input_value, output_value, time.time())
+        self.SECUENCIA.pack_into(self._mapa, self.OFFSET_SECUENCIA, 2 * secuencia + 2)
+
+    def close(self):
+        if not self._mapa.closed:
+            self._mapa.close()
+        self._fichero.close()
@@ -1,122 +1,618 @@
 import sqlite3
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+import numpy as np
+
+from Model.ConnectionManager import ConnectionManager
+from Model.DestinationOptimizer import DestinationOptimizer
 
 class OrdenesModel:
-    def __init__(self, db_path: str = "DB/ordenes.db"):
+    # Base de datos en la que vivían las órdenes antes de compartir fichero con los pallets;
+    # los procesos que aún escriben en ella la usan como bandeja de entrada (import_legacy_orders)
+    LEGACY_DB_PATH = "DB/ordenes.db"
+    # Destinos 1..NUM_DESTINOS; posición inicial (m) repartida a lo largo del muelle inferior del mapa
+    NUM_DESTINOS = 11
+    POSICIONES_DESTINOS = [(destino, round(2.25 + (destino - 1) * 4.45, 2), 29.5)
+                           for destino in range(1, NUM_DESTINOS + 1)]
+    # Pallets por consulta al validar una selección múltiple (límite de parámetros de SQLite)
+    TRAMO_VALIDACION = 500
+    # Estado con el que una orden pasa al historial
+    ESTADO_COMPLETADA = "completada"
+    ESTADO_ELIMINADA = "eliminada"
+    # Destino admite NULL: quien inserta sin destino lo recibe del trigger ordenes_asignar_destino
+    ESQUEMA_ORDENES = """
+        CREATE TABLE {existe}{tabla} (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Origen INTEGER NOT NULL,
+            Destino INTEGER,
+            Pallet_ID TEXT,
+            Secuencia INTEGER,
+            Creada REAL,
+            FOREIGN KEY (Pallet_ID) REFERENCES pallets(ID) ON DELETE CASCADE ON UPDATE CASCADE
+        )
+    """
+    
+    def __init__(self, db_path: str = "DB/pallets.db"):
         self.db_path = db_path
+        self._firma_legacy = None  # Estado de ordenes.db en la última importación
         self._create_database()
+        self.import_legacy_orders()
+    
+    def _connection(self):
+        """Conexión persistente del hilo actual a la base de datos de pallets y órdenes"""
+        return ConnectionManager.get_connection(self.db_path)
+    
+    def _transaction(self):
+        """Transacción sobre la base de datos (se integra en una transacción exterior si existe)"""
+        return ConnectionManager.transaction(self.db_path)
     
     def _create_database(self):
-        """Crear la base de datos y la tabla si no existen"""
+        """Crear la tabla si no existe.
+        
+        Las órdenes comparten fichero con los pallets para que la clave foránea se
+        cumpla (al eliminar un pallet se eliminan sus órdenes) y para que una
+        modificación de pallets y órdenes pueda confirmarse en una sola transacción.
+        """
         Path("DB").mkdir(exist_ok=True)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ordenes (
-                    ID INTEGER PRIMARY KEY AUTOINCREMENT,
-                    Origen INTEGER NOT NULL,
-                    Destino INTEGER NOT NULL,
-                    Pallet_ID TEXT,
-                    FOREIGN KEY (Pallet_ID) REFERENCES pallets(ID)
+        with self._transaction() as conn:
+            conn.execute(self.ESQUEMA_ORDENES.format(existe="IF NOT EXISTS ", tabla="ordenes"))
+            # Clave de servicio de cada orden según el planificador (ORDER BY Secuencia, ID
+            # da el orden de la cola); las bases de datos anteriores no tienen la columna
+            columnas = {row[1] for row in conn.execute("PRAGMA table_info(ordenes)")}
+            if "Secuencia" not in columnas:
+                conn.execute("ALTER TABLE ordenes ADD COLUMN Secuencia INTEGER")
+            # Momento de creación (segundos desde epoch); las órdenes anteriores toman el actual
+            if "Creada" not in columnas:
+                conn.execute("ALTER TABLE ordenes ADD COLUMN Creada REAL")
+                conn.execute("UPDATE ordenes SET Creada = ?", (time.time(),))
+            self._allow_null_destination(conn)
+            self._create_pallet_index(conn)
+            conn.execute("CREATE INDEX IF NOT EXISTS ordenes_secuencia ON ordenes (Secuencia)")
+            # Orden de la tabla de la interfaz (Destino, ID): permite paginar por clave
+            conn.execute("CREATE INDEX IF NOT EXISTS ordenes_destino ON ordenes (Destino)")
+            # Coordenadas de cada destino, para asignarlos según la distancia a los pallets
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS destinos (
+                    ID INTEGER PRIMARY KEY,
+                    X REAL NOT NULL,
+                    Y REAL NOT NULL
+                )
+            """)
+            conn.executemany("INSERT OR IGNORE INTO destinos (ID, X, Y) VALUES (?, ?, ?)",
+                             self.POSICIONES_DESTINOS)
+            # Contador de destinos asignados: el destino de la asignación n es n % NUM_DESTINOS + 1.
+            # Lo incrementa el trigger ordenes_asignar_destino en el mismo INSERT que crea la orden, así
+            # que dos procesos que insertan a la vez (también uno externo que escriba directamente
+            # en la tabla) no repiten ni se saltan destinos. Al crearlo continúa el ciclo a partir
+            # de la última orden.
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS secuencias (
+                    Nombre TEXT PRIMARY KEY,
+                    Valor INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                INSERT OR IGNORE INTO secuencias (Nombre, Valor)
+                VALUES ('destino', COALESCE((SELECT Destino FROM ordenes ORDER BY ID DESC LIMIT 1), 0))
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS ordenes_asignar_destino AFTER INSERT ON ordenes
+                WHEN NEW.Destino IS NULL
+                BEGIN
+                    UPDATE secuencias SET Valor = Valor + 1 WHERE Nombre = 'destino';
+                    UPDATE ordenes
+                    SET Destino = (SELECT (Valor - 1) % {self.NUM_DESTINOS} + 1 FROM secuencias WHERE Nombre = 'destino')
+                    WHERE ID = NEW.ID;
+                END
+            """)
+            self._create_history(conn)
+    
+    def _allow_null_destination(self, conn):
+        """Quitar el NOT NULL de Destino de las bases de datos anteriores reconstruyendo la tabla.
+        
+        SQLite comprueba NOT NULL antes de los triggers AFTER, así que un INSERT sin
+        destino fallaría antes de que ordenes_asignar_destino se lo asignara. Al borrar la tabla
+        antigua se borran sus índices y triggers, que se vuelven a crear a continuación.
+        """
+        columnas = conn.execute("PRAGMA table_info(ordenes)").fetchall()
+        if not any(columna["name"] == "Destino" and columna["notnull"] for columna in columnas):
+            return
+        nombres = ", ".join(columna["name"] for columna in columnas)
+        ultimo = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'ordenes'").fetchone()
+        conn.execute(self.ESQUEMA_ORDENES.format(existe="", tabla="ordenes_nueva"))
+        conn.execute(f"INSERT INTO ordenes_nueva ({nombres}) SELECT {nombres} FROM ordenes")
+        conn.execute("DROP TABLE ordenes")
+        conn.execute("ALTER TABLE ordenes_nueva RENAME TO ordenes")
+        if ultimo:
+            # Los IDs no se reutilizan: el historial usa el mismo ID que la orden
+            conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'ordenes'", (ultimo[0],))
+    
+    def _create_pallet_index(self, conn):
+        """Índice único sobre Pallet_ID: un pallet tiene como mucho una orden.
+        
+        Sirve también al borrado en cascada y a `get_order_by_pallet`. Las bases de
+        datos anteriores tenían un índice no único y podían tener órdenes repetidas
+        del mismo pallet: se conserva la más antigua.
+        """
+        existe = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ordenes_pallet_unico'"
+        ).fetchone()
+        if existe:
+            return
+        repetidas = conn.execute("""
+            DELETE FROM ordenes
+            WHERE Pallet_ID IS NOT NULL
+              AND ID NOT IN (SELECT MIN(ID) FROM ordenes WHERE Pallet_ID IS NOT NULL GROUP BY Pallet_ID)
+        """).rowcount
+        if repetidas:
+            print(f"Eliminadas {repetidas} órdenes repetidas del mismo pallet")
+        conn.execute("CREATE UNIQUE INDEX ordenes_pallet_unico ON ordenes (Pallet_ID)")
+        conn.execute("DROP INDEX IF EXISTS ordenes_pallet")
+    
+    def _create_history(self, conn):
+        """Crear el historial de órdenes, sus resúmenes y los triggers que los alimentan.
+        
+        Las órdenes terminadas salen de `ordenes` (que solo guarda la cola activa) y se
+        añaden a `ordenes_historial`, que no admite modificaciones ni borrados. Cualquier
+        borrado de una orden (de la aplicación, en cascada al eliminar su pallet o de un
+        proceso externo) la archiva como eliminada, salvo que ya se haya archivado como
+        completada. Cada orden archivada se acumula en el mismo momento en los resúmenes
+        por hora y por destino, de modo que las estadísticas no recorren el historial.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ordenes_historial (
+                ID INTEGER PRIMARY KEY,
+                Origen INTEGER NOT NULL,
+                Destino INTEGER NOT NULL,
+                Pallet_ID TEXT,
+                Creada REAL,
+                Cerrada REAL NOT NULL,
+                Estado TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ordenes_historial_cerrada ON ordenes_historial (Cerrada)")
+        # Hora: inicio de la hora (segundos desde epoch, UTC). Espera: segundos entre la
+        # creación y el cierre de las órdenes completadas (la media es Espera / Completadas)
+        for tabla, clave in (("ordenes_por_hora", "Hora"), ("ordenes_por_destino", "Destino")):
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {tabla} (
+                    {clave} INTEGER PRIMARY KEY,
+                    Completadas INTEGER NOT NULL DEFAULT 0,
+                    Eliminadas INTEGER NOT NULL DEFAULT 0,
+                    Espera REAL NOT NULL DEFAULT 0
                 )
             """)
-            conn.commit()
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS ordenes_archivar AFTER DELETE ON ordenes
+            WHEN NOT EXISTS (SELECT 1 FROM ordenes_historial WHERE ID = OLD.ID)
+            BEGIN
+                INSERT INTO ordenes_historial (ID, Origen, Destino, Pallet_ID, Creada, Cerrada, Estado)
+                VALUES (OLD.ID, OLD.Origen, OLD.Destino, OLD.Pallet_ID, OLD.Creada,
+                        (julianday('now') - 2440587.5) * 86400.0, '{self.ESTADO_ELIMINADA}');
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS ordenes_historial_resumen AFTER INSERT ON ordenes_historial
+            BEGIN
+                INSERT INTO ordenes_por_hora (Hora, Completadas, Eliminadas, Espera)
+                VALUES (CAST(NEW.Cerrada / 3600 AS INTEGER) * 3600,
+                        NEW.Estado = '{self.ESTADO_COMPLETADA}', NEW.Estado != '{self.ESTADO_COMPLETADA}',
+                        IIF(NEW.Estado = '{self.ESTADO_COMPLETADA}', COALESCE(NEW.Cerrada - NEW.Creada, 0), 0))
+                ON CONFLICT (Hora) DO UPDATE SET
+                    Completadas = Completadas + excluded.Completadas,
+                    Eliminadas = Eliminadas + excluded.Eliminadas,
+                    Espera = Espera + excluded.Espera;
+                INSERT INTO ordenes_por_destino (Destino, Completadas, Eliminadas, Espera)
+                VALUES (NEW.Destino,
+                        NEW.Estado = '{self.ESTADO_COMPLETADA}', NEW.Estado != '{self.ESTADO_COMPLETADA}',
+                        IIF(NEW.Estado = '{self.ESTADO_COMPLETADA}', COALESCE(NEW.Cerrada - NEW.Creada, 0), 0))
+                ON CONFLICT (Destino) DO UPDATE SET
+                    Completadas = Completadas + excluded.Completadas,
+                    Eliminadas = Eliminadas + excluded.Eliminadas,
+                    Espera = Espera + excluded.Espera;
+            END
+        """)
+        for operacion in ("UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS ordenes_historial_no_{operacion.lower()} BEFORE {operacion} ON ordenes_historial
+                BEGIN
+                    SELECT RAISE(ABORT, 'El historial de órdenes solo admite añadir filas');
+                END
+            """)
+    
+    def import_legacy_orders(self) -> List[Dict[str, Any]]:
+        """Importar las órdenes que otros procesos escriben en ordenes.db (si existe).
+        
+        El fichero no se toca: quien todavía escriba en él (p. ej. la pasarela del WMS)
+        puede seguir haciéndolo. Si pallets.db aún no ha tenido órdenes, la primera vez se
+        copian todas conservando el ID y el destino; si no, y en adelante, se importan las de
+        ID mayor que la última importada (fila `ordenes_externas` de `secuencias`) con ID
+        nuevo y el destino que les asigne el contador. Solo se
+        importan las órdenes cuyo pallet existe y no tiene ya una orden; los borrados en
+        ordenes.db no se propagan. Retorna las órdenes creadas (con la Prioridad de su pallet).
+        """
+        legacy = Path(self.LEGACY_DB_PATH)
+        if not legacy.exists() or legacy.resolve() == Path(self.db_path).resolve():
+            return []
+        # Sin cambios en el fichero (ni en su WAL) desde la última vez no hay nada que leer
+        firma = tuple((f.stat().st_mtime_ns, f.stat().st_size) if f.exists() else None
+                      for f in (legacy, Path(f"{legacy}-wal")))
+        if firma == self._firma_legacy:
+            return []
+        
+        conn = self._connection()
+        try:
+            conn.execute("ATTACH DATABASE ? AS legacy", (str(legacy),))
+        except sqlite3.Error as e:
+            print(f"Error al abrir {legacy}: {e}")
+            return []
+        try:
+            with self._transaction():
+                if not conn.execute(
+                    "SELECT 1 FROM legacy.sqlite_master WHERE type = 'table' AND name = 'ordenes'"
+                ).fetchone():
+                    self._firma_legacy = firma
+                    return []
+                ultima = conn.execute(
+                    "SELECT Valor FROM secuencias WHERE Nombre = 'ordenes_externas'"
+                ).fetchone()
+                primera = ultima is None
+                desde = 0 if primera else ultima[0]
+                maximo = conn.execute("SELECT COALESCE(MAX(ID), 0) FROM legacy.ordenes").fetchone()[0]
+                # Los IDs de ordenes.db solo se conservan si no pueden chocar con órdenes ya creadas
+                usadas = conn.execute(
+                    "SELECT 1 FROM sqlite_sequence WHERE name = 'ordenes' AND seq > 0"
+                ).fetchone()
+                if primera and not usadas:
+                    creadas = self._copy_legacy_orders(conn)
+                else:
+                    creadas = conn.execute("""
+                        INSERT OR IGNORE INTO ordenes (Origen, Pallet_ID, Creada)
+                        SELECT Origen, Pallet_ID, ? FROM legacy.ordenes
+                        WHERE ID > ? AND (Pallet_ID IS NULL OR Pallet_ID IN (SELECT ID FROM pallets))
+                        ORDER BY ID
+                        RETURNING ID
+                    """, (time.time(), desde)).fetchall()
+                conn.execute("INSERT OR REPLACE INTO secuencias (Nombre, Valor) VALUES ('ordenes_externas', ?)",
+                             (max(maximo, desde),))
+                if creadas:
+                    # RETURNING da el ID antes de que el trigger asigne el destino: leerlas después
+                    marcas = ",".join("?" * len(creadas))
+                    creadas = [dict(row) for row in conn.execute(f"""
+                        SELECT o.ID, o.Origen, o.Destino, o.Pallet_ID, p.Prioridad
+                        FROM ordenes o LEFT JOIN pallets p ON p.ID = o.Pallet_ID
+                        WHERE o.ID IN ({marcas}) ORDER BY o.ID
+                    """, [row[0] for row in creadas])]
+        except sqlite3.Error as e:
+            print(f"Error al importar las órdenes de {legacy}: {e}")
+            return []
+        finally:
+            conn.execute("DETACH DATABASE legacy")
+        
+        self._firma_legacy = firma
+        if primera:
+            print(f"Migradas {len(creadas)} órdenes de {legacy} a {self.db_path}")
+        return creadas
+    
+    def _copy_legacy_orders(self, conn) -> tuple:
+        """Copia inicial de ordenes.db conservando los IDs; retorna los IDs copiados"""
+        copiadas = conn.execute("""
+            INSERT OR IGNORE INTO ordenes (ID, Origen, Destino, Pallet_ID, Creada)
+            SELECT ID, Origen, Destino, Pallet_ID, ? FROM legacy.ordenes
+            WHERE Pallet_ID IS NULL OR Pallet_ID IN (SELECT ID FROM pallets)
+            ORDER BY ID
+            RETURNING ID
+        """, (time.time(),)).fetchall()
+        if copiadas:
+            # El contador se creó antes de copiar: continuar el ciclo desde la última orden
+            conn.execute("""
+                UPDATE secuencias
+                SET Valor = (SELECT Destino FROM ordenes ORDER BY ID DESC LIMIT 1)
+                WHERE Nombre = 'destino'
+            """)
+        return copiadas
     
     def get_all_orders(self) -> List[Dict[str, Any]]:
         """Obtener todas las órdenes de la base de datos"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM ordenes ORDER BY Destino, ID")
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+        rows = self._connection().execute("SELECT * FROM ordenes ORDER BY Destino, ID").fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_orders_page(self, despues: Optional[tuple] = None, limite: int = 256) -> List[Dict[str, Any]]:
+        """Órdenes en el orden de la tabla (Destino, ID) a partir de la clave `despues` (sin incluirla).
+        
+        Paginación por clave: cada página cuesta lo mismo sea cual sea su posición en la cola.
+        """
+        if despues is None:
+            rows = self._connection().execute(
+                "SELECT * FROM ordenes ORDER BY Destino, ID LIMIT ?", (limite,)
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT * FROM ordenes WHERE (Destino, ID) > (?, ?) ORDER BY Destino, ID LIMIT ?",
+                (despues[0], despues[1], limite)
+            ).fetchall()
+        return [dict(row) for row in rows]
     
     def get_next_destination(self) -> int:
-        """Obtener el próximo destino (1-11 cíclico puro)."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM ordenes")
-            total_ordenes = cursor.fetchone()[0]
-            if total_ordenes == 0:
-                return 1
-            cursor.execute("SELECT Destino FROM ordenes ORDER BY ID DESC LIMIT 1")
-            ultimo_destino = cursor.fetchone()[0]
-            siguiente_destino = ultimo_destino + 1
-            if siguiente_destino > 11:
-                siguiente_destino = 1
-            return siguiente_destino
+        """Obtener el próximo destino (1-11 cíclico puro), sin reservarlo."""
+        row = self._connection().execute(
+            "SELECT Valor % ? + 1 FROM secuencias WHERE Nombre = 'destino'", (self.NUM_DESTINOS,)
+        ).fetchone()
+        return row[0]
+    
+    def reserve_destinations(self, cantidad: int = 1) -> List[int]:
+        """Reservar los próximos `cantidad` destinos del ciclo (para insertar con destino explícito).
+        
+        Las órdenes insertadas sin destino no lo necesitan: se lo asigna el trigger
+        ordenes_asignar_destino. Dentro de la transacción que inserta las órdenes, el contador
+        queda bloqueado (BEGIN IMMEDIATE) hasta el commit y, si la inserción falla, el
+        rollback devuelve los destinos.
+        """
+        with self._transaction() as conn:
+            conn.execute("UPDATE secuencias SET Valor = Valor + ? WHERE Nombre = 'destino'", (cantidad,))
+            ultimo = conn.execute("SELECT Valor FROM secuencias WHERE Nombre = 'destino'").fetchone()[0]
+        return [valor % self.NUM_DESTINOS + 1 for valor in range(ultimo - cantidad, ultimo)]
     
     def insert_order(self, origen: int, pallet_id: str = None) -> int:
         """Insertar una nueva orden y retornar su ID"""
-        destino = self.get_next_destination()
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO ordenes (Origen, Destino, Pallet_ID) VALUES (?, ?, ?)",
-                (origen, destino, pallet_id)
-            )
-            conn.commit()
-            return cursor.lastrowid
+        return self._insert_orders([(origen, pallet_id)])[0][0]
+    
+    def insert_orders(self, ordenes: List[tuple]) -> List[int]:
+        """Insertar varias órdenes (origen, pallet_id) en una transacción y retornar sus IDs.
+        
+        Los destinos son consecutivos en el ciclo.
+        """
+        return [order_id for order_id, _destino in self._insert_orders(list(ordenes))]
+    
+    def _insert_orders(self, ordenes: List[tuple]) -> List[Tuple[int, int]]:
+        """Insertar (origen, pallet_id) sin destino; retorna (ID, destino) de cada una.
+        
+        El trigger ordenes_asignar_destino asigna los destinos en orden a partir del contador,
+        que nadie más puede modificar hasta el commit (BEGIN IMMEDIATE): se deducen
+        del valor leído al empezar sin volver a consultar las filas.
+        """
+        if not ordenes:
+            return []
+        creada = time.time()
+        with self._transaction() as conn:
+            valor = conn.execute("SELECT Valor FROM secuencias WHERE Nombre = 'destino'").fetchone()[0]
+            ids = [
+                conn.execute(
+                    "INSERT INTO ordenes (Origen, Pallet_ID, Creada) VALUES (?, ?, ?)",
+                    (origen, pallet_id, creada)
+                ).lastrowid
+                for origen, pallet_id in ordenes
+            ]
+        return [(order_id, (valor + i) % self.NUM_DESTINOS + 1) for i, order_id in enumerate(ids)]
+    
+    def insert_orders_for_pallets(self, pallet_ids: Iterable[str]) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """Crear en una transacción las órdenes de varios pallets (p. ej. la carga de un camión).
+        
+        Los pallets se validan en bloque (deben existir, estar ocupados, tener calidad
+        distinta de 0 y no tener ya una orden) dentro de la misma transacción que
+        los INSERT, de modo que otro proceso no puede crear entretanto la orden de uno de
+        ellos. Retorna las órdenes creadas (con la Prioridad de su pallet) y los pallets
+        rechazados con el motivo.
+        """
+        pallet_ids = list(dict.fromkeys(pallet_ids))  # Sin repetidos, en el orden recibido
+        if not pallet_ids:
+            return [], {}
+        with self._transaction() as conn:
+            encontrados = {}
+            # Por tramos: una selección por rectángulo puede superar el límite de parámetros de SQLite
+            for inicio in range(0, len(pallet_ids), self.TRAMO_VALIDACION):
+                tramo = pallet_ids[inicio:inicio + self.TRAMO_VALIDACION]
+                marcas = ", ".join("?" for _ in tramo)
+                for row in conn.execute(f"""
+                    SELECT p.ID, p.Posicion, p.Calidad, p.Ocupado, p.Prioridad, o.ID AS Orden
+                    FROM pallets p LEFT JOIN ordenes o ON o.Pallet_ID = p.ID
+                    WHERE p.ID IN ({marcas})
+                """, tramo):
+                    encontrados[row["ID"]] = row
+            validos = []
+            rechazados = {}
+            for pallet_id in pallet_ids:
+                pallet = encontrados.get(pallet_id)
+                if pallet is None:
+                    rechazados[pallet_id] = "no existe"
+                elif pallet["Orden"] is not None:
+                    rechazados[pallet_id] = "ya está en la lista de órdenes"
+                elif not pallet["Ocupado"]:
+                    rechazados[pallet_id] = "no está ocupado"
+                elif pallet["Calidad"] == 0:
+                    rechazados[pallet_id] = "tiene calidad 0"
+                else:
+                    validos.append(pallet)
+            insertadas = self._insert_orders([(pallet["Posicion"], pallet["ID"]) for pallet in validos])
+        creadas = [
+            {"ID": order_id, "Origen": pallet["Posicion"], "Destino": destino, "Pallet_ID": pallet["ID"],
+             "Secuencia": None, "Prioridad": pallet["Prioridad"]}
+            for pallet, (order_id, destino) in zip(validos, insertadas)
+        ]
+        return creadas, rechazados
+    
+    def complete_orders(self, order_ids: Iterable[int], cerrada: Optional[float] = None) -> int:
+        """Pasar al historial como completadas varias órdenes en una transacción; retorna cuántas.
+        
+        Se copian al historial (el trigger acumula los resúmenes) y después se borran de
+        la cola; como ya están archivadas, el borrado no las vuelve a archivar como eliminadas.
+        """
+        order_ids = list(order_ids)
+        cerrada = time.time() if cerrada is None else cerrada
+        completadas = 0
+        with self._transaction() as conn:
+            for inicio in range(0, len(order_ids), self.TRAMO_VALIDACION):
+                tramo = order_ids[inicio:inicio + self.TRAMO_VALIDACION]
+                marcas = ", ".join("?" for _ in tramo)
+                completadas += conn.execute(f"""
+                    INSERT INTO ordenes_historial (ID, Origen, Destino, Pallet_ID, Creada, Cerrada, Estado)
+                    SELECT ID, Origen, Destino, Pallet_ID, Creada, ?, ? FROM ordenes WHERE ID IN ({marcas})
+                """, (cerrada, self.ESTADO_COMPLETADA, *tramo)).rowcount
+                conn.execute(f"DELETE FROM ordenes WHERE ID IN ({marcas})", tramo)
+        return completadas
+    
+    def complete_orders_by_pallets(self, pallet_ids: Iterable[str]) -> int:
+        """Completar las órdenes de varios pallets (p. ej. al desocuparse); retorna cuántas"""
+        pallet_ids = list(pallet_ids)
+        order_ids = []
+        with self._transaction() as conn:
+            for inicio in range(0, len(pallet_ids), self.TRAMO_VALIDACION):
+                tramo = pallet_ids[inicio:inicio + self.TRAMO_VALIDACION]
+                marcas = ", ".join("?" for _ in tramo)
+                order_ids += [row[0] for row in conn.execute(
+                    f"SELECT ID FROM ordenes WHERE Pallet_ID IN ({marcas})", tramo
+                )]
+            return self.complete_orders(order_ids)
     
     def delete_order(self, order_id: int):
-        """Eliminar una orden por su ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM ordenes WHERE ID = ?", (order_id,))
-            conn.commit()
+        """Eliminar una orden por su ID (queda en el historial como eliminada)"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM ordenes WHERE ID = ?", (order_id,))
     
     def update_destination(self, order_id: int, destino: int):
         """Actualizar el destino de una orden"""
-        if destino < 1 or destino > 11:
-            raise ValueError(f"Destino {destino} fuera de rango. Debe estar entre 1 y 11.")
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
+        if destino < 1 or destino > self.NUM_DESTINOS:
+            raise ValueError(f"Destino {destino} fuera de rango. Debe estar entre 1 y {self.NUM_DESTINOS}.")
+        with self._transaction() as conn:
+            conn.execute(
                 "UPDATE ordenes SET Destino = ? WHERE ID = ?",
                 (destino, order_id)
             )
-            conn.commit()
     
     def swap_destinations(self, order_id1: int, order_id2: int):
         """Intercambiar destinos entre dos órdenes"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT Destino FROM ordenes WHERE ID = ?", (order_id1,))
-            dest1 = cursor.fetchone()[0]
-            cursor.execute("SELECT Destino FROM ordenes WHERE ID = ?", (order_id2,))
-            dest2 = cursor.fetchone()[0]
-            cursor.execute("UPDATE ordenes SET Destino = ? WHERE ID = ?", (dest2, order_id1))
-            cursor.execute("UPDATE ordenes SET Destino = ? WHERE ID = ?", (dest1, order_id2))
-            conn.commit()
+        with self._transaction() as conn:
+            dest1 = conn.execute("SELECT Destino FROM ordenes WHERE ID = ?", (order_id1,)).fetchone()[0]
+            dest2 = conn.execute("SELECT Destino FROM ordenes WHERE ID = ?", (order_id2,)).fetchone()[0]
+            conn.execute("UPDATE ordenes SET Destino = ? WHERE ID = ?", (dest2, order_id1))
+            conn.execute("UPDATE ordenes SET Destino = ? WHERE ID = ?", (dest1, order_id2))
     
     def get_destination_sequence(self) -> List[int]:
         """Obtener la secuencia completa de destinos según se han asignado."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT Destino FROM ordenes ORDER BY ID")
-            return [row[0] for row in cursor.fetchall()]
+        rows = self._connection().execute("SELECT Destino FROM ordenes ORDER BY ID").fetchall()
+        return [row[0] for row in rows]
     
     def reset_destinations(self):
-        """Reiniciar todos los destinos para que sigan una secuencia cíclica pura."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT ID FROM ordenes ORDER BY ID")
-            orders = cursor.fetchall()
-            for index, (order_id,) in enumerate(orders):
-                destino = (index % 11) + 1
-                cursor.execute(
-                    "UPDATE ordenes SET Destino = ? WHERE ID = ?",
-                    (destino, order_id)
-                )
-            conn.commit()
+        """Reiniciar todos los destinos para que sigan una secuencia cíclica pura.
+        
+        Una sola sentencia numera las órdenes por ID (función de ventana) y solo
+        reescribe las filas cuyo destino cambia.
+        """
+        with self._transaction() as conn:
+            conn.execute("""
+                UPDATE ordenes SET Destino = numeradas.Indice % :destinos + 1
+                FROM (SELECT ID, ROW_NUMBER() OVER (ORDER BY ID) - 1 AS Indice FROM ordenes) AS numeradas
+                WHERE ordenes.ID = numeradas.ID AND ordenes.Destino != numeradas.Indice % :destinos + 1
+            """, {"destinos": self.NUM_DESTINOS})
+            # La siguiente orden continúa el ciclo recién reiniciado
+            conn.execute("UPDATE secuencias SET Valor = (SELECT COUNT(*) FROM ordenes) WHERE Nombre = 'destino'")
 
     def get_order_by_pallet(self, pallet_id: str) -> Optional[Dict[str, Any]]:
         """Retorna la orden asociada a un pallet, si existe."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM ordenes WHERE Pallet_ID = ?", (pallet_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
\ No newline at end of file
+        row = self._connection().execute("SELECT * FROM ordenes WHERE Pallet_ID = ?", (pallet_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def get_scheduling_data(self) -> List[tuple]:
+        """(ID, Destino, Prioridad del pallet, Pallet_ID, Secuencia guardada) de cada orden, para el planificador"""
+        return [tuple(row) for row in self._connection().execute("""
+            SELECT o.ID, o.Destino, p.Prioridad, o.Pallet_ID, o.Secuencia
+            FROM ordenes o LEFT JOIN pallets p ON p.ID = o.Pallet_ID
+        """)]
+    
+    def save_sequence(self, claves: Dict[int, int]):
+        """Guardar la clave de servicio (ID -> clave del planificador) de las órdenes indicadas.
+        
+        `ORDER BY Secuencia, ID` da el orden de la cola; solo se escriben las filas cuya clave cambia.
+        """
+        if not claves:
+            return
+        with self._transaction() as conn:
+            conn.executemany("UPDATE ordenes SET Secuencia = ? WHERE ID = ? AND Secuencia IS NOT ?",
+                             [(clave, order_id, clave) for order_id, clave in claves.items()])
+    
+    def get_history(self, desde: Optional[float] = None, hasta: Optional[float] = None,
+                    limite: int = 1000) -> List[Dict[str, Any]]:
+        """Órdenes archivadas con cierre en [desde, hasta), de la más reciente a la más antigua"""
+        condicion, params = self._intervalo("Cerrada", desde, hasta)
+        rows = self._connection().execute(
+            f"SELECT * FROM ordenes_historial{condicion} ORDER BY Cerrada DESC, ID DESC LIMIT ?",
+            params + [limite]
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_orders_per_hour(self, desde: Optional[float] = None, hasta: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Órdenes completadas y eliminadas por hora de cierre (resumen precalculado)"""
+        condicion, params = self._intervalo("Hora", desde, hasta)
+        rows = self._connection().execute(
+            f"SELECT * FROM ordenes_por_hora{condicion} ORDER BY Hora", params
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    @staticmethod
+    def _intervalo(columna: str, desde: Optional[float], hasta: Optional[float]) -> Tuple[str, list]:
+        """Cláusula WHERE de un intervalo [desde, hasta) con extremos opcionales"""
+        condiciones, params = [], []
+        if desde is not None:
+            condiciones.append(f"{columna} >= ?")
+            params.append(desde)
+        if hasta is not None:
+            condiciones.append(f"{columna} < ?")
+            params.append(hasta)
+        return (" WHERE " + " AND ".join(condiciones) if condiciones else ""), params
+    
+    def get_orders_per_destination(self) -> List[Dict[str, Any]]:
+        """Órdenes completadas y eliminadas por destino (resumen precalculado)"""
+        rows = self._connection().execute("SELECT * FROM ordenes_por_destino ORDER BY Destino").fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_destinations(self) -> Dict[int, tuple]:
+        """Coordenadas (X, Y) en metros de cada destino"""
+        rows = self._connection().execute("SELECT ID, X, Y FROM destinos ORDER BY ID").fetchall()
+        return {row[0]: (row[1], row[2]) for row in rows}
+    
+    def set_destination_position(self, destino: int, x: float, y: float):
+        """Cambiar las coordenadas de un destino"""
+        if destino < 1 or destino > self.NUM_DESTINOS:
+            raise ValueError(f"Destino {destino} fuera de rango. Debe estar entre 1 y {self.NUM_DESTINOS}.")
+        with self._transaction() as conn:
+            conn.execute("UPDATE destinos SET X = ?, Y = ? WHERE ID = ?", (x, y, destino))
+    
+    def optimize_destinations(self) -> tuple:
+        """Reasignar los destinos de la cola minimizando la distancia de los pallets a su destino.
+        
+        Como en `reset_destinations`, cada ronda de 11 órdenes (por ID) usa cada destino
+        una vez, pero dentro de la ronda se elige la asignación de menor distancia total.
+        La última ronda, si está incompleta, solo usa los destinos que el contador repartió
+        por última vez, así las órdenes nuevas reciben justo los que le faltan.
+        Las órdenes sin pallet conservan la ronda pero no influyen en el coste.
+        Retorna la distancia total (m) antes y después.
+        """
+        with self._transaction() as conn:
+            rows = conn.execute("""
+                SELECT o.ID, o.Destino, p.X, p.Y
+                FROM ordenes o LEFT JOIN pallets p ON p.ID = o.Pallet_ID
+                ORDER BY o.ID
+            """).fetchall()
+            if not rows:
+                return 0.0, 0.0
+            order_ids = [row[0] for row in rows]
+            anteriores = [row[1] for row in rows]
+            x = np.array([row[2] for row in rows], dtype=np.float64)  # None -> NaN
+            y = np.array([row[3] for row in rows], dtype=np.float64)
+            
+            # Los próximos destinos del contador son valor % 11 + 1, (valor + 1) % 11 + 1, ...
+            valor = conn.execute("SELECT Valor FROM secuencias WHERE Nombre = 'destino'").fetchone()[0]
+            pendientes = len(rows) % self.NUM_DESTINOS
+            ultima = [(valor - pendientes + i) % self.NUM_DESTINOS + 1 for i in range(pendientes)]
+            
+            optimizador = DestinationOptimizer(self.get_destinations())
+            destinos = optimizador.asignar(x, y, ultima)
+            conn.executemany(
+                "UPDATE ordenes SET Destino = ? WHERE ID = ?",
+                [(destino, order_id) for order_id, destino, anterior in zip(order_ids, destinos, anteriores)
+                 if destino != anterior]
+            )
+            return optimizador.distancia(x, y, anteriores), optimizador.distancia(x, y, destinos)
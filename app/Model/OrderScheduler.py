@@ -0,0 +1,265 @@
+import bisect
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class OrderScheduler:
+    """Cola de prioridad de las órdenes pendientes (montículo binario con borrado perezoso).
+
+    El orden de servicio es, de más a menos urgente:
+      1. órdenes cuyo destino está disponible,
+      2. mayor Prioridad del pallet,
+      3. orden más antigua (menor ID).
+
+    Cambiar la prioridad de un pallet, el destino de una orden o la disponibilidad
+    de un destino no reordena el montículo: se invalida la entrada anterior y se
+    inserta una nueva (O(log n)); las entradas obsoletas se descartan al llegar a
+    la cima y, si llegan a ser más que las válidas, el montículo se reconstruye.
+
+    Lo que se guarda en la base de datos es la clave de cada orden (`clave()`), no
+    su turno: un entero con la disponibilidad del destino y la Prioridad, de modo
+    que `ORDER BY Secuencia, ID` da el orden de servicio y un cambio solo reescribe
+    la fila de la orden afectada. El turno (1 = la siguiente) se calcula al pedirlo
+    con `turno()` a partir de los IDs de cada grupo (destino no disponible, prioridad).
+    """
+
+    # La prioridad se satura al rango de un entero de 32 bits para caber en la clave
+    PRIORIDAD_MINIMA = -2 ** 31
+    PRIORIDAD_MAXIMA = 2 ** 31 - 1
+
+    def __init__(self):
+        # Entradas [destino no disponible, -Prioridad, ID, válida]; el ID es único,
+        # así que la comparación nunca llega al indicador de validez
+        self._heap: List[list] = []
+        self._entradas: Dict[int, list] = {}
+        self._ordenes: Dict[int, Tuple[int, int, Optional[str]]] = {}  # ID -> (destino, prioridad, pallet)
+        self._por_pallet: Dict[str, Set[int]] = {}
+        self._por_destino: Dict[int, Set[int]] = {}
+        self._obsoletas = 0
+        self.no_disponibles: Set[int] = set()
+        # (destino no disponible, -Prioridad) -> IDs ordenados; None si hay que reconstruirlo
+        self._grupos: Optional[Dict[tuple, List[int]]] = {}
+        # Órdenes cuya clave ha cambiado desde la última llamada a claves_modificadas()
+        self._modificadas: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._entradas
+
+    def load(self, ordenes: Iterable[tuple]):
+        """Reconstruir la cola a partir de (ID, destino, prioridad, pallet[, clave guardada]) en O(n).
+
+        Solo se marcan como modificadas las órdenes sin clave guardada o cuya clave
+        guardada no coincide con la calculada.
+        """
+        self._heap = []
+        self._entradas = {}
+        self._ordenes = {}
+        self._por_pallet = {}
+        self._por_destino = {}
+        self._obsoletas = 0
+        self._modificadas = set()
+        for order_id, destino, prioridad, pallet_id, *guardada in ordenes:
+            self._registrar(order_id, destino, prioridad, pallet_id)
+            entrada = self._entrada(order_id)
+            self._entradas[order_id] = entrada
+            self._heap.append(entrada)
+            if not guardada or guardada[0] != self.clave(order_id):
+                self._modificadas.add(order_id)
+        heapq.heapify(self._heap)
+        self._grupos = None
+
+    def add(self, order_id: int, destino: int, prioridad: Optional[int], pallet_id: Optional[str] = None):
+        """Añadir (o reemplazar) una orden pendiente"""
+        self.remove(order_id)
+        self._registrar(order_id, destino, prioridad, pallet_id)
+        self._empujar(order_id)
+
+    def remove(self, order_id: int) -> bool:
+        """Quitar una orden de la cola; retorna si estaba"""
+        entrada = self._entradas.pop(order_id, None)
+        if entrada is None:
+            return False
+        self._invalidar(entrada)
+        self._desagrupar(entrada)
+        self._olvidar(order_id)
+        self._compactar()
+        return True
+
+    def remove_pallet(self, pallet_id: str) -> List[int]:
+        """Quitar las órdenes de un pallet; retorna sus IDs"""
+        order_ids = list(self._por_pallet.get(pallet_id, ()))
+        for order_id in order_ids:
+            self.remove(order_id)
+        return order_ids
+
+    def set_prioridad(self, pallet_id: str, prioridad: Optional[int]) -> bool:
+        """Aplicar la nueva prioridad de un pallet a sus órdenes; retorna si alguna cambió"""
+        cambiadas = False
+        for order_id in self._por_pallet.get(pallet_id, ()):
+            destino, anterior, _pallet = self._ordenes[order_id]
+            if anterior != self._saturar(prioridad):
+                self._ordenes[order_id] = (destino, self._saturar(prioridad), pallet_id)
+                self._empujar(order_id)
+                cambiadas = True
+        return cambiadas
+
+    def set_destino(self, order_id: int, destino: int) -> bool:
+        """Actualizar el destino de una orden (p. ej. tras intercambiar destinos); retorna si cambia su turno"""
+        anterior, prioridad, pallet_id = self._ordenes[order_id]
+        if anterior == destino:
+            return False
+        self._desindexar(self._por_destino, anterior, order_id)
+        self._ordenes[order_id] = (destino, prioridad, pallet_id)
+        self._por_destino.setdefault(destino, set()).add(order_id)
+        if (anterior in self.no_disponibles) == (destino in self.no_disponibles):
+            return False
+        self._empujar(order_id)
+        return True
+
+    def set_destino_disponible(self, destino: int, disponible: bool):
+        """Marcar un destino como disponible u ocupado; sus órdenes pasan detrás de las demás mientras no lo esté"""
+        if disponible == (destino not in self.no_disponibles):
+            return
+        if disponible:
+            self.no_disponibles.discard(destino)
+        else:
+            self.no_disponibles.add(destino)
+        ordenes = self._por_destino.get(destino, ())
+        if len(ordenes) > 1:
+            # Muchas órdenes cambian de grupo: más barato reconstruir los grupos al pedir un turno
+            self._grupos = None
+        for order_id in ordenes:
+            self._empujar(order_id)
+
+    def next_order(self) -> Optional[int]:
+        """Sacar de la cola la orden más urgente; None si no quedan"""
+        self._limpiar_cima()
+        if not self._heap:
+            return None
+        entrada = heapq.heappop(self._heap)
+        order_id = entrada[2]
+        del self._entradas[order_id]
+        self._desagrupar(entrada)
+        self._olvidar(order_id)
+        return order_id
+
+    def peek(self, n: int = 1) -> List[int]:
+        """Las n órdenes más urgentes, sin sacarlas de la cola (O(n log N))"""
+        vistas = []
+        while self._heap and len(vistas) < n:
+            entrada = heapq.heappop(self._heap)
+            if entrada[3]:
+                vistas.append(entrada)
+            else:
+                self._obsoletas -= 1
+        for entrada in vistas:
+            heapq.heappush(self._heap, entrada)
+        return [entrada[2] for entrada in vistas]
+
+    def ordenados(self) -> List[int]:
+        """IDs de todas las órdenes pendientes en orden de servicio (O(n log n))"""
+        return [entrada[2] for entrada in sorted(self._entradas.values())]
+
+    def clave(self, order_id: int) -> int:
+        """Clave de servicio de una orden: ordenar por (clave, ID) da el orden de la cola"""
+        no_disponible, prioridad_negada, _id, _valida = self._entradas[order_id]
+        return (no_disponible << 32) | (prioridad_negada + self.PRIORIDAD_MAXIMA)
+
+    def claves_modificadas(self) -> Dict[int, int]:
+        """Claves (ID -> clave) de las órdenes que han cambiado desde la llamada anterior"""
+        modificadas, self._modificadas = self._modificadas, set()
+        return {order_id: self.clave(order_id) for order_id in modificadas if order_id in self._entradas}
+
+    def turno(self, order_id: int) -> Optional[int]:
+        """Posición de una orden en la cola (1 = la siguiente); None si no está.
+
+        Cuesta O(g + log n), con g el número de grupos (prioridades distintas por dos).
+        """
+        entrada = self._entradas.get(order_id)
+        if entrada is None:
+            return None
+        grupos = self._indice_grupos()
+        grupo = (entrada[0], entrada[1])
+        delante = sum(len(ids) for clave, ids in grupos.items() if clave < grupo)
+        return delante + bisect.bisect_left(grupos[grupo], order_id) + 1
+
+    # ----------------- Internos -----------------
+    def _registrar(self, order_id: int, destino: int, prioridad: Optional[int], pallet_id: Optional[str]):
+        self._ordenes[order_id] = (destino, self._saturar(prioridad), pallet_id)
+        self._por_destino.setdefault(destino, set()).add(order_id)
+        if pallet_id is not None:
+            self._por_pallet.setdefault(pallet_id, set()).add(order_id)
+
+    def _olvidar(self, order_id: int):
+        destino, _prioridad, pallet_id = self._ordenes.pop(order_id)
+        self._desindexar(self._por_destino, destino, order_id)
+        if pallet_id is not None:
+            self._desindexar(self._por_pallet, pallet_id, order_id)
+
+    def _entrada(self, order_id: int) -> list:
+        destino, prioridad, _pallet = self._ordenes[order_id]
+        return [destino in self.no_disponibles, -prioridad, order_id, True]
+
+    def _empujar(self, order_id: int):
+        anterior = self._entradas.get(order_id)
+        if anterior is not None:
+            self._invalidar(anterior)
+            self._desagrupar(anterior)
+        entrada = self._entrada(order_id)
+        self._entradas[order_id] = entrada
+        heapq.heappush(self._heap, entrada)
+        if self._grupos is not None:
+            bisect.insort(self._grupos.setdefault((entrada[0], entrada[1]), []), order_id)
+        self._modificadas.add(order_id)
+        self._compactar()
+
+    def _desagrupar(self, entrada: list):
+        self._modificadas.discard(entrada[2])
+        if self._grupos is None:
+            return
+        grupo = (entrada[0], entrada[1])
+        ids = self._grupos[grupo]
+        del ids[bisect.bisect_left(ids, entrada[2])]
+        if not ids:
+            del self._grupos[grupo]
+
+    def _indice_grupos(self) -> Dict[tuple, List[int]]:
+        if self._grupos is None:
+            grupos: Dict[tuple, List[int]] = {}
+            for no_disponible, prioridad_negada, order_id, _valida in self._entradas.values():
+                grupos.setdefault((no_disponible, prioridad_negada), []).append(order_id)
+            for ids in grupos.values():
+                ids.sort()
+            self._grupos = grupos
+        return self._grupos
+
+    def _invalidar(self, entrada: list):
+        entrada[3] = False
+        self._obsoletas += 1
+
+    def _compactar(self):
+        """Reconstruir el montículo solo con las entradas válidas si las obsoletas son mayoría"""
+        if self._obsoletas > len(self._entradas):
+            self._heap = list(self._entradas.values())
+            heapq.heapify(self._heap)
+            self._obsoletas = 0
+
+    def _limpiar_cima(self):
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+            self._obsoletas -= 1
+
+    @classmethod
+    def _saturar(cls, prioridad: Optional[int]) -> int:
+        return min(max(int(prioridad or 0), cls.PRIORIDAD_MINIMA), cls.PRIORIDAD_MAXIMA)
+
+    @staticmethod
+    def _desindexar(indice: Dict, clave, order_id: int):
+        ids = indice.get(clave)
+        if ids is not None:
+            ids.discard(order_id)
+            if not ids:
+                del indice[clave]
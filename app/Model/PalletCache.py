@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Iterable
+
+
+class PalletCache:
+    """Caché LRU acotada de pallets por ID, con contadores de aciertos y fallos.
+
+    `revision` guarda la revisión del registro de cambios con la que son
+    coherentes las entradas; DataProvider la compara antes de cada consulta
+    para descartar los pallets modificados desde entonces.
+    """
+
+    def __init__(self, capacidad: int = 1024):
+        self.capacidad = capacidad
+        self.revision: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self._entradas: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def get(self, pallet_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            pallet = self._entradas.get(pallet_id)
+            if pallet is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(pallet_id)
+            self.hits += 1
+            return pallet
+
+    def put(self, pallet_id: str, pallet: Dict[str, Any]):
+        with self._lock:
+            self._entradas[pallet_id] = pallet
+            self._entradas.move_to_end(pallet_id)
+            if len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+
+    def invalidate(self, pallet_ids: Iterable[str]):
+        """Descartar los pallets indicados (p. ej. tras una escritura local)"""
+        with self._lock:
+            for pallet_id in pallet_ids:
+                self._entradas.pop(pallet_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self.revision = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._entradas), "capacity": self.capacidad}
@@ -0,0 +1,103 @@
+import math
+from typing import Callable, Dict, Iterable, Any, Tuple
+
+import numpy as np
+
+
+class ClusterLevel:
+    """Agregados de pallets en una rejilla regular (número y ocupados por celda)."""
+
+    def __init__(self, tam_celda: float, ancho: float, alto: float):
+        self.tam_celda = tam_celda
+        self.nx = max(1, math.ceil(ancho / tam_celda))
+        self.ny = max(1, math.ceil(alto / tam_celda))
+        self.totales = np.zeros(self.nx * self.ny, dtype=np.int32)
+        self.ocupados = np.zeros(self.nx * self.ny, dtype=np.int32)
+
+    def indices(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Índice de celda de cada coordenada (los puntos fuera del mapa van a la celda del borde)"""
+        ix = np.clip((x / self.tam_celda).astype(np.int64), 0, self.nx - 1)
+        iy = np.clip((y / self.tam_celda).astype(np.int64), 0, self.ny - 1)
+        return iy * self.nx + ix
+
+    def construir(self, x: np.ndarray, y: np.ndarray, ocupado: np.ndarray):
+        celdas = self.indices(x, y)
+        n = self.nx * self.ny
+        self.totales = np.bincount(celdas, minlength=n).astype(np.int32)
+        self.ocupados = np.bincount(celdas, weights=ocupado, minlength=n).astype(np.int32)
+
+    def acumular(self, x: np.ndarray, y: np.ndarray, ocupado: np.ndarray, signo: int):
+        """Sumar (signo=1) o restar (signo=-1) pallets a sus celdas"""
+        if len(x) == 0:
+            return
+        celdas = self.indices(x, y)
+        np.add.at(self.totales, celdas, signo)
+        np.add.at(self.ocupados, celdas, signo * ocupado.astype(np.int32))
+
+    def contar_en_rect(self, x0: float, y0: float, x1: float, y1: float) -> int:
+        """Número (aproximado por exceso) de pallets en las celdas que tocan el rectángulo"""
+        ix0, ix1 = (int(np.clip(v / self.tam_celda, 0, self.nx - 1)) for v in (x0, x1))
+        iy0, iy1 = (int(np.clip(v / self.tam_celda, 0, self.ny - 1)) for v in (y0, y1))
+        rejilla = self.totales.reshape(self.ny, self.nx)
+        return int(rejilla[iy0:iy1 + 1, ix0:ix1 + 1].sum())
+
+    def celdas(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Celdas no vacías: centros X/Y (m), número de pallets y proporción de ocupados"""
+        no_vacias = np.flatnonzero(self.totales)
+        iy, ix = np.divmod(no_vacias, self.nx)
+        totales = self.totales[no_vacias]
+        return ((ix + 0.5) * self.tam_celda,
+                (iy + 0.5) * self.tam_celda,
+                totales,
+                self.ocupados[no_vacias] / totales)
+
+
+class PalletClusters:
+    """Caché de agregados por nivel de zoom, actualizada de forma incremental.
+
+    `fuente` devuelve las columnas X, Y y Ocupado de los pallets actuales (p. ej.
+    vistas de un PalletStore) y solo se consulta al construir un nivel que aún no
+    está en caché.
+    """
+
+    def __init__(self, fuente: Callable[[], Tuple[np.ndarray, np.ndarray, np.ndarray]], ancho: float, alto: float):
+        self.fuente = fuente
+        self.ancho = ancho
+        self.alto = alto
+        self.niveles: Dict[int, ClusterLevel] = {}
+
+    def invalidar(self):
+        self.niveles.clear()
+
+    def nivel(self, zoom: int, tam_celda: float) -> ClusterLevel:
+        """Agregados para un nivel de zoom (se reconstruye si cambió el tamaño de celda)"""
+        nivel = self.niveles.get(zoom)
+        if nivel is None or not math.isclose(nivel.tam_celda, tam_celda, rel_tol=0.01):
+            nivel = ClusterLevel(tam_celda, self.ancho, self.alto)
+            nivel.construir(*self.fuente())
+            self.niveles[zoom] = nivel
+        return nivel
+
+    @staticmethod
+    def _columnas(pallets: Iterable[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        pallets = list(pallets)
+        n = len(pallets)
+        # float32 como las columnas de PalletStore: un pallet siempre cae en la misma celda al sumarlo y al restarlo
+        x = np.fromiter((p["X"] for p in pallets), dtype=np.float32, count=n)
+        y = np.fromiter((p["Y"] for p in pallets), dtype=np.float32, count=n)
+        ocupado = np.fromiter((bool(p["Ocupado"]) for p in pallets), dtype=np.int32, count=n)
+        return x, y, ocupado
+
+    def aplicar_parche(self, patch):
+        """Mover entre celdas los pallets añadidos, eliminados o modificados de un PalletPatch"""
+        if not self.niveles or patch.is_empty():
+            return
+        anteriores = [patch.previous[pid] for pid in patch.removed]
+        anteriores += [patch.previous[pid] for pid in patch.changed]
+        nuevos = list(patch.added) + [pallet for pallet, _campos in patch.changed.values()]
+
+        columnas_anteriores = self._columnas(anteriores)
+        columnas_nuevas = self._columnas(nuevos)
+        for nivel in self.niveles.values():
+            nivel.acumular(*columnas_anteriores, signo=-1)
+            nivel.acumular(*columnas_nuevas, signo=1)
@@ -0,0 +1,206 @@
+import ast
+import operator
+import re
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from Model.PalletStore import COLUMNAS, PalletStore
+
+# Nombre de columna en minúsculas -> nombre real (las columnas se aceptan sin distinguir mayúsculas)
+_NOMBRES = {nombre.lower(): nombre for nombre in COLUMNAS}
+
+# Las columnas decimales son float32: 1.2 se guarda como 1.2000000476... Las igualdades
+# con decimales se comparan con esa precisión (unos pocos ulp de float32), así que
+# "Largo = 1.2", "Largo in (1.2, 0.8)" o "Largo * Ancho = 1.44" encuentran lo esperado.
+_TOLERANCIA = 4 * float(np.finfo(np.float32).eps)
+
+
+def _iguales(a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    if a.dtype.kind == "f" or b.dtype.kind == "f":
+        return np.isclose(a, b, rtol=_TOLERANCIA, atol=0)
+    return a == b
+
+
+def _distintos(a, b):
+    return np.logical_not(_iguales(a, b))
+
+
+_COMPARACIONES = {
+    ast.Eq: _iguales,
+    ast.NotEq: _distintos,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+_ARITMETICA = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+# "Prioridad = 5" se interpreta como "Prioridad == 5"
+_IGUAL_SIMPLE = re.compile(r"(?<![<>=!])=(?!=)")
+
+# Función que recibe una columna por nombre y devuelve un array (o un escalar)
+Evaluador = Callable[[Callable[[str], np.ndarray]], object]
+
+
+class PalletFilter:
+    """Predicado sobre las columnas de los pallets, evaluado de forma vectorizada.
+
+    La expresión usa la sintaxis de Python restringida a nombres de columna,
+    números, True/False, comparaciones (también encadenadas), `in`/`not in`
+    con una lista de constantes, + - * / y `and`/`or`/`not`. Por ejemplo:
+
+        Peso > 800 and Prioridad = 5
+        Ocupado and 1 <= Calidad <= 3
+        Posicion in (10, 20, 30) or Largo * Ancho > 2
+
+    Una expresión no válida lanza ValueError al construir el filtro.
+    """
+
+    def __init__(self, expresion: str):
+        self.expresion = expresion.strip()
+        if not self.expresion:
+            raise ValueError("El filtro está vacío")
+        try:
+            self._fuente = _IGUAL_SIMPLE.sub("==", self.expresion)
+            arbol = ast.parse(self._fuente, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Expresión no válida: {e.msg}") from None
+        self.columnas = set()
+        self._evaluar = self._compilar(arbol.body)
+
+    def __repr__(self) -> str:
+        return f"PalletFilter({self.expresion!r})"
+
+    def evaluar(self, store: PalletStore, filas: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Máscara booleana de coincidencias para todas las filas del almacén o solo las indicadas"""
+        if filas is None:
+            n = len(store)
+            columna = store.column
+        else:
+            filas = np.asarray(filas, dtype=np.int64)
+            n = len(filas)
+            cache: Dict[str, np.ndarray] = {}
+
+            def columna(nombre: str) -> np.ndarray:
+                if nombre not in cache:
+                    cache[nombre] = store.column(nombre)[filas]
+                return cache[nombre]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            resultado = self._evaluar(columna)
+        return np.broadcast_to(self._booleano(resultado), (n,))
+
+    def coincidentes(self, store: PalletStore) -> set:
+        """IDs de los pallets del almacén que cumplen el filtro"""
+        ids = store.ids
+        return {ids[fila] for fila in np.flatnonzero(self.evaluar(store)).tolist()}
+
+    @staticmethod
+    def _booleano(valor) -> np.ndarray:
+        valor = np.asarray(valor)
+        return valor if valor.dtype == np.bool_ else valor != 0
+
+    def _compilar(self, nodo: ast.AST) -> Evaluador:
+        if isinstance(nodo, ast.BoolOp):
+            partes = [self._compilar(v) for v in nodo.values]
+            combinar = np.logical_and if isinstance(nodo.op, ast.And) else np.logical_or
+
+            def evaluar_logico(columna):
+                resultado = self._booleano(partes[0](columna))
+                for parte in partes[1:]:
+                    resultado = combinar(resultado, self._booleano(parte(columna)))
+                return resultado
+            return evaluar_logico
+
+        if isinstance(nodo, ast.UnaryOp):
+            operando = self._compilar(nodo.operand)
+            if isinstance(nodo.op, ast.Not):
+                return lambda columna: np.logical_not(self._booleano(operando(columna)))
+            if isinstance(nodo.op, ast.USub):
+                return lambda columna: -np.asarray(operando(columna), dtype=np.float64)
+            if isinstance(nodo.op, ast.UAdd):
+                return operando
+
+        if isinstance(nodo, ast.Compare):
+            return self._compilar_comparacion(nodo)
+
+        if isinstance(nodo, ast.BinOp) and type(nodo.op) in _ARITMETICA:
+            funcion = _ARITMETICA[type(nodo.op)]
+            izquierda, derecha = self._compilar(nodo.left), self._compilar(nodo.right)
+            # En float64 para que no haya desbordamientos con las columnas int32/float32
+            return lambda columna: funcion(np.asarray(izquierda(columna), dtype=np.float64),
+                                           np.asarray(derecha(columna), dtype=np.float64))
+
+        if isinstance(nodo, ast.Name) and nodo.id.lower() in ("true", "false"):
+            valor = self._constante(nodo)
+            return lambda columna: valor
+
+        if isinstance(nodo, ast.Name):
+            nombre = _NOMBRES.get(nodo.id.lower())
+            if nombre is None:
+                raise ValueError(f"Columna desconocida: {nodo.id} (disponibles: {', '.join(COLUMNAS)})")
+            self.columnas.add(nombre)
+            return lambda columna: columna(nombre)
+
+        if isinstance(nodo, ast.Constant):
+            valor = self._constante(nodo)
+            return lambda columna: valor
+
+        segmento = ast.get_source_segment(self._fuente, nodo) or type(nodo).__name__
+        raise ValueError(f"Elemento no permitido en el filtro: {segmento}")
+
+    def _compilar_comparacion(self, nodo: ast.Compare) -> Evaluador:
+        if len(nodo.ops) == 1 and isinstance(nodo.ops[0], (ast.In, ast.NotIn)):
+            lista = nodo.comparators[0]
+            if not isinstance(lista, (ast.Tuple, ast.List, ast.Set)):
+                raise ValueError("Tras 'in' debe ir una lista de valores, p. ej. Calidad in (1, 2)")
+            valores = np.array([self._constante(elemento) for elemento in lista.elts], dtype=np.float64)
+            operando = self._compilar(nodo.left)
+            negar = isinstance(nodo.ops[0], ast.NotIn)
+
+            def evaluar_pertenencia(columna):
+                datos = np.asarray(operando(columna))
+                if datos.dtype.kind != "f":
+                    return np.isin(datos, valores, invert=negar)
+                # Con decimales, cada valor con la misma tolerancia que "="
+                resultado = np.zeros(datos.shape, dtype=np.bool_)
+                for valor in valores.tolist():
+                    resultado |= _iguales(datos, valor)
+                return np.logical_not(resultado) if negar else resultado
+            return evaluar_pertenencia
+
+        # a < b <= c equivale a (a < b) and (b <= c)
+        funciones = []
+        for op in nodo.ops:
+            if type(op) not in _COMPARACIONES:
+                raise ValueError("'in' no se puede encadenar con otras comparaciones"
+                                 if isinstance(op, (ast.In, ast.NotIn)) else
+                                 f"Comparación no permitida: {type(op).__name__}")
+            funciones.append(_COMPARACIONES[type(op)])
+        operandos = [self._compilar(nodo.left)] + [self._compilar(c) for c in nodo.comparators]
+
+        def evaluar_comparacion(columna):
+            valores = [operando(columna) for operando in operandos]
+            resultado = funciones[0](valores[0], valores[1])
+            for i, funcion in enumerate(funciones[1:], start=1):
+                resultado = np.logical_and(resultado, funcion(valores[i], valores[i + 1]))
+            return resultado
+        return evaluar_comparacion
+
+    def _constante(self, nodo: ast.AST):
+        if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, ast.USub):
+            return -self._constante(nodo.operand)
+        if isinstance(nodo, ast.Constant) and isinstance(nodo.value, (bool, int, float)):
+            return nodo.value
+        if isinstance(nodo, ast.Name) and nodo.id.lower() in ("true", "false"):
+            return nodo.id.lower() == "true"
+        raise ValueError("Solo se admiten valores numéricos o True/False")
+
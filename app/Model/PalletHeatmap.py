@@ -0,0 +1,117 @@
+import math
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from Model.PalletStore import PalletStore
+
+# Color de las celdas según el peso medio de sus pallets (de ligero a pesado)
+COLOR_LIGERO = (255, 235, 59)   # Amarillo
+COLOR_PESADO = (211, 47, 47)    # Rojo
+
+Columnas = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class PalletHeatmap:
+    """Mapa de calor por celdas del suelo: ocupación y peso medio de los pallets.
+
+    Guarda por celda el número de pallets, de ocupados y la suma de pesos, y una
+    imagen RGBA (una celda = un píxel) donde la opacidad indica la densidad de
+    pallets ocupados y el color el peso medio. Al aplicar cambios solo se
+    recalcula el color de las celdas afectadas; las escalas de opacidad y color
+    se fijan al construir y, si una celda las supera, se repinta la imagen entera.
+    """
+
+    CAMPOS = ("X", "Y", "Ocupado", "Peso")
+    ALFA_MINIMO = 60
+    ALFA_MAXIMO = 190
+
+    def __init__(self, ancho: float, alto: float, tam_celda: float = 1.0):
+        self.tam_celda = tam_celda
+        self.nx = max(1, math.ceil(ancho / tam_celda))
+        self.ny = max(1, math.ceil(alto / tam_celda))
+        n = self.nx * self.ny
+        self.totales = np.zeros(n, dtype=np.int32)
+        self.ocupados = np.zeros(n, dtype=np.int32)
+        self.pesos = np.zeros(n, dtype=np.float64)
+        self.rgba = np.zeros((self.ny, self.nx, 4), dtype=np.uint8)
+        self._max_ocupados = 1
+        self._rango_peso = (0.0, 1.0)  # Pesos medios que corresponden a los colores extremos
+
+    def indices(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Índice de celda de cada coordenada (los puntos fuera del mapa van a la celda del borde)"""
+        ix = np.clip((x / self.tam_celda).astype(np.int64), 0, self.nx - 1)
+        iy = np.clip((y / self.tam_celda).astype(np.int64), 0, self.ny - 1)
+        return iy * self.nx + ix
+
+    @classmethod
+    def columnas(cls, store: PalletStore, pallet_ids: Optional[Iterable[str]] = None) -> Columnas:
+        """Columnas X, Y, Ocupado y Peso de todo el almacén o de los pallets indicados que contiene"""
+        if pallet_ids is None:
+            return tuple(store.column(campo) for campo in cls.CAMPOS)
+        filas = store.rows_of(pallet_ids)
+        filas = filas[filas >= 0]
+        return tuple(store.column(campo)[filas] for campo in cls.CAMPOS)
+
+    def construir(self, x: np.ndarray, y: np.ndarray, ocupado: np.ndarray, peso: np.ndarray):
+        """Histograma 2D completo sobre la rejilla del mapa y repintado de toda la imagen"""
+        celdas = self.indices(x, y)
+        n = self.nx * self.ny
+        self.totales = np.bincount(celdas, minlength=n).astype(np.int32)
+        self.ocupados = np.bincount(celdas, weights=ocupado, minlength=n).astype(np.int32)
+        self.pesos = np.bincount(celdas, weights=peso, minlength=n)
+        self._pintar()
+
+    def actualizar(self, anteriores: Columnas, nuevas: Columnas) -> bool:
+        """Restar los valores anteriores de los pallets modificados o eliminados y sumar los nuevos.
+
+        Devuelve si alguna celda ha cambiado.
+        """
+        tocadas = []
+        for columnas, signo in ((anteriores, -1), (nuevas, 1)):
+            x, y, ocupado, peso = columnas
+            if len(x) == 0:
+                continue
+            celdas = self.indices(x, y)
+            np.add.at(self.totales, celdas, signo)
+            np.add.at(self.ocupados, celdas, signo * ocupado.astype(np.int32))
+            np.add.at(self.pesos, celdas, signo * peso.astype(np.float64))
+            tocadas.append(celdas)
+        if not tocadas:
+            return False
+        self._pintar(np.unique(np.concatenate(tocadas)))
+        return True
+
+    def _pintar(self, celdas: Optional[np.ndarray] = None):
+        """Recalcular el color de las celdas indicadas (todas si es None)"""
+        if celdas is None:
+            celdas = slice(None)
+            peso_medio = self._peso_medio(celdas)
+            con_pallets = peso_medio[self.totales > 0]
+            self._max_ocupados = max(1, int(self.ocupados.max(initial=0)))
+            if len(con_pallets):
+                self._rango_peso = (float(con_pallets.min()), float(con_pallets.max()))
+        else:
+            peso_medio = self._peso_medio(celdas)
+            minimo, maximo = self._rango_peso
+            con_pallets = peso_medio[self.totales[celdas] > 0]
+            if (self.ocupados[celdas].max(initial=0) > self._max_ocupados
+                    or (len(con_pallets) and (con_pallets.min() < minimo or con_pallets.max() > maximo))):
+                self._pintar()
+                return
+
+        ocupados = self.ocupados[celdas]
+        minimo, maximo = self._rango_peso
+        densidad = np.minimum(ocupados / self._max_ocupados, 1.0)
+        proporcion = np.clip((peso_medio - minimo) / max(maximo - minimo, 1e-9), 0.0, 1.0)
+        ligero, pesado = np.array(COLOR_LIGERO), np.array(COLOR_PESADO)
+        colores = ligero + (pesado - ligero) * proporcion[:, None]
+        alfa = np.where(ocupados > 0, self.ALFA_MINIMO + (self.ALFA_MAXIMO - self.ALFA_MINIMO) * densidad, 0)
+
+        pixeles = self.rgba.reshape(-1, 4)
+        pixeles[celdas, :3] = np.round(colores).astype(np.uint8)
+        pixeles[celdas, 3] = np.round(alfa).astype(np.uint8)
+
+    def _peso_medio(self, celdas) -> np.ndarray:
+        totales = self.totales[celdas]
+        return np.divide(self.pesos[celdas], totales, out=np.zeros(len(totales)), where=totales > 0)
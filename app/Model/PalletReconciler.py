@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Iterable, FrozenSet, Tuple, Sequence
+
+import numpy as np
+
+from Model.PalletStore import PalletStore
+
+# Campos que afectan a la representación de un pallet en el mapa
+# (posición, color según ocupación y texto del tooltip)
+CAMPOS_VISUALES = ("X", "Y", "Ocupado", "Calidad")
+
+
+@dataclass
+class PalletPatch:
+    """Cambios mínimos que la vista debe aplicar tras una reconciliación."""
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # ID -> (datos nuevos, campos visuales que cambiaron)
+    changed: Dict[str, Tuple[Dict[str, Any], FrozenSet[str]]] = field(default_factory=dict)
+    # ID -> datos anteriores de los pallets modificados o eliminados
+    previous: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # IDs que pasan a cumplir / dejan de cumplir el filtro activo (los rellena DataWorker)
+    matched: List[str] = field(default_factory=list)
+    unmatched: List[str] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed or self.matched or self.unmatched)
+
+
+class PalletReconciler:
+    """Copia en memoria de los pallets (columnas de un PalletStore) indexada por ID.
+
+    Calcula qué pallets se han añadido, eliminado o modificado respecto al
+    estado conocido, comparando de forma vectorizada todos los campos visuales.
+    """
+
+    def __init__(self, campos_visuales: Iterable[str] = CAMPOS_VISUALES):
+        self.campos_visuales = tuple(campos_visuales)
+        self.store = PalletStore()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __contains__(self, pallet_id: str) -> bool:
+        return pallet_id in self.store
+
+    def get(self, pallet_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(pallet_id)
+
+    def load(self, pallets: Sequence[Dict[str, Any]]) -> PalletPatch:
+        """Reemplazar el estado conocido; todos los pallets se consideran nuevos."""
+        pallets = list(pallets)
+        self.load_columns([p["ID"] for p in pallets], PalletStore.to_columns(pallets))
+        return PalletPatch(added=pallets)
+
+    def load_columns(self, pallet_ids: List[str], columnas: Dict[str, np.ndarray]):
+        """Reemplazar el estado conocido a partir de columnas (p. ej. DataProvider.get_pallet_columns)"""
+        self.store.load(pallet_ids, columnas)
+
+    def reconcile(self, current_pallets: Iterable[Dict[str, Any]]) -> PalletPatch:
+        """Comparar contra una instantánea completa de la tabla."""
+        pallets = list(current_pallets)
+        return self.reconcile_columns([p["ID"] for p in pallets], PalletStore.to_columns(pallets), pallets)
+
+    def reconcile_columns(self, pallet_ids: List[str], columnas: Dict[str, np.ndarray],
+                          pallets: Optional[List[Dict[str, Any]]] = None) -> PalletPatch:
+        """Comparar contra una instantánea completa de la tabla en columnas."""
+        patch = PalletPatch()
+        vistos = set(pallet_ids)
+        eliminados = [pid for pid in self.store.ids if pid not in vistos]
+        self._remove(eliminados, patch)
+        self._merge(pallet_ids, columnas, pallets, patch)
+        return patch
+
+    def apply_changes(self, changed: Iterable[Dict[str, Any]], deleted: Iterable[str] = ()) -> PalletPatch:
+        """Aplicar un conjunto de cambios parciales (p. ej. del registro de cambios)."""
+        patch = PalletPatch()
+        self._remove(deleted, patch)
+        pallets = list(changed)
+        if pallets:
+            self._merge([p["ID"] for p in pallets], PalletStore.to_columns(pallets), pallets, patch)
+        return patch
+
+    def _remove(self, pallet_ids: Iterable[str], patch: PalletPatch):
+        presentes = [pid for pid in pallet_ids if pid in self.store]
+        patch.previous.update(zip(presentes, self.store.rows(self.store.rows_of(presentes))))
+        patch.removed.extend(presentes)
+        self.store.remove(presentes)
+
+    def _merge(self, pallet_ids: List[str], columnas: Dict[str, np.ndarray],
+               pallets: Optional[List[Dict[str, Any]]], patch: PalletPatch):
+        """Incorporar los datos actuales de varios pallets, anotando los cambios en el parche."""
+        filas = self.store.rows_of(pallet_ids)
+        existentes = np.flatnonzero(filas >= 0)
+        nuevos = np.flatnonzero(filas < 0)
+
+        def datos(k: int) -> Dict[str, Any]:
+            if pallets is not None:
+                return pallets[k]
+            pallet = {"ID": pallet_ids[k]}
+            pallet.update((nombre, columna[k].item()) for nombre, columna in columnas.items())
+            return pallet
+
+        if len(existentes):
+            filas_existentes = filas[existentes]
+            diferencias = {campo: self.store.column(campo)[filas_existentes] != columnas[campo][existentes]
+                           for campo in self.campos_visuales}
+            modificados = np.flatnonzero(np.logical_or.reduce(list(diferencias.values())))
+            anteriores = self.store.rows(filas_existentes[modificados], self.campos_visuales)
+            for j, anterior in zip(modificados.tolist(), anteriores):
+                k = int(existentes[j])
+                pallet_id = pallet_ids[k]
+                patch.previous[pallet_id] = anterior
+                patch.changed[pallet_id] = (datos(k), frozenset(c for c in self.campos_visuales if diferencias[c][j]))
+            # Los campos no visuales se actualizan igualmente en la copia en memoria
+            self.store.update_rows(filas_existentes, {n: c[existentes] for n, c in columnas.items()})
+
+        if len(nuevos):
+            self.store.append([pallet_ids[k] for k in nuevos.tolist()], {n: c[nuevos] for n, c in columnas.items()})
+            patch.added.extend(datos(k) for k in nuevos.tolist())
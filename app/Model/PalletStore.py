@@ -0,0 +1,156 @@
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Columnas en memoria y su tipo (el ID se guarda aparte)
+COLUMNAS = {
+    "Largo": np.float32,
+    "Ancho": np.float32,
+    "Posicion": np.int32,
+    "Alto": np.float32,
+    "Calidad": np.int32,
+    "Peso": np.float32,
+    "Prioridad": np.int32,
+    "X": np.float32,
+    "Y": np.float32,
+    "Ocupado": np.bool_,
+}
+
+
+def _numeros(valores: Sequence[Any]) -> np.ndarray:
+    """Valores leídos de SQLite como float64; un valor vacío o no numérico pasa a ser 0"""
+    try:
+        return np.asarray(valores, dtype=np.float64)
+    except (TypeError, ValueError):
+        def numero(valor):
+            try:
+                return float(valor)
+            except (TypeError, ValueError):
+                return 0
+        return np.fromiter((numero(v) for v in valores), dtype=np.float64, count=len(valores))
+
+
+def convertir(valores: Sequence[Any], dtype) -> np.ndarray:
+    """Convertir una columna leída de SQLite al tipo indicado.
+
+    SQLite no impone tipos: un valor vacío o no numérico se guarda como 0, y un
+    entero fuera del rango de la columna se satura a sus límites en lugar de
+    desbordarse (el panel de propiedades admite cualquier número).
+    """
+    if np.issubdtype(dtype, np.integer):
+        limites = np.iinfo(dtype)
+        valores = np.nan_to_num(_numeros(valores), nan=0)
+        return np.clip(valores, limites.min, limites.max).astype(dtype)
+    try:
+        return np.asarray(valores, dtype=dtype)
+    except (TypeError, ValueError, OverflowError):
+        return _numeros(valores).astype(dtype)
+
+
+class PalletStore:
+    """Pallets en memoria como columnas NumPy tipadas, con índice ID -> fila.
+
+    Las filas ocupan siempre el rango [0, len): al eliminar un pallet la última
+    fila pasa a ocupar su hueco, de modo que `column()` devuelve vistas contiguas
+    sin copia, aptas para filtros vectorizados y para el renderizado.
+    """
+
+    CAPACIDAD_INICIAL = 1024
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._columnas = {nombre: np.zeros(self.CAPACIDAD_INICIAL, dtype=dtype)
+                          for nombre, dtype in COLUMNAS.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, pallet_id: str) -> bool:
+        return pallet_id in self.index
+
+    @property
+    def capacidad(self) -> int:
+        return len(self._columnas["X"])
+
+    def column(self, nombre: str) -> np.ndarray:
+        """Vista (sin copia) de una columna; deja de ser válida al añadir o eliminar pallets"""
+        return self._columnas[nombre][:len(self.ids)]
+
+    def nbytes(self) -> int:
+        """Memoria ocupada por las columnas (sin contar IDs ni índice)"""
+        return sum(columna.nbytes for columna in self._columnas.values())
+
+    @staticmethod
+    def to_columns(pallets: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Columnas tipadas a partir de una lista de dicts de pallets"""
+        return {nombre: convertir([p[nombre] for p in pallets], dtype) for nombre, dtype in COLUMNAS.items()}
+
+    def rows_of(self, pallet_ids: Iterable[str]) -> np.ndarray:
+        """Fila de cada ID (-1 si no está)"""
+        index = self.index
+        return np.fromiter((index.get(pid, -1) for pid in pallet_ids), dtype=np.int64)
+
+    def get(self, pallet_id: str) -> Optional[Dict[str, Any]]:
+        fila = self.index.get(pallet_id)
+        return None if fila is None else self.row(fila)
+
+    def row(self, fila: int) -> Dict[str, Any]:
+        """Dict con tipos de Python de una fila"""
+        return self.rows([fila])[0]
+
+    def rows(self, filas: Sequence[int], campos: Sequence[str] = None) -> List[Dict[str, Any]]:
+        """Dicts con tipos de Python de varias filas (con ID salvo que se indiquen `campos`)"""
+        filas = np.asarray(filas, dtype=np.int64)
+        nombres = list(campos) if campos is not None else list(self._columnas)
+        valores = [self._columnas[nombre][filas].tolist() for nombre in nombres]
+        if campos is None:
+            nombres.insert(0, "ID")
+            valores.insert(0, [self.ids[fila] for fila in filas.tolist()])
+        return [dict(zip(nombres, fila)) for fila in zip(*valores)]
+
+    def clear(self):
+        self.__init__()
+
+    def load(self, pallet_ids: List[str], columnas: Dict[str, np.ndarray]):
+        """Reemplazar todo el contenido"""
+        self.clear()
+        self.append(pallet_ids, columnas)
+
+    def append(self, pallet_ids: List[str], columnas: Dict[str, np.ndarray]):
+        """Añadir pallets nuevos (los IDs no deben estar ya en el almacén)"""
+        inicio = len(self.ids)
+        fin = inicio + len(pallet_ids)
+        if fin > self.capacidad:
+            self._crecer(fin)
+        for nombre, columna in self._columnas.items():
+            columna[inicio:fin] = columnas[nombre]
+        self.ids.extend(pallet_ids)
+        self.index.update(zip(pallet_ids, range(inicio, fin)))
+
+    def update_rows(self, filas: np.ndarray, columnas: Dict[str, np.ndarray]):
+        """Sobrescribir en bloque las filas indicadas (solo las columnas presentes)"""
+        for nombre, valores in columnas.items():
+            self._columnas[nombre][filas] = valores
+
+    def remove(self, pallet_ids: Iterable[str]):
+        """Eliminar pallets moviendo la última fila a cada hueco"""
+        for pallet_id in pallet_ids:
+            fila = self.index.pop(pallet_id, None)
+            if fila is None:
+                continue
+            ultima = len(self.ids) - 1
+            if fila != ultima:
+                for columna in self._columnas.values():
+                    columna[fila] = columna[ultima]
+                movido = self.ids[ultima]
+                self.ids[fila] = movido
+                self.index[movido] = fila
+            self.ids.pop()
+
+    def _crecer(self, minimo: int):
+        capacidad = max(minimo, self.capacidad * 2)
+        for nombre, columna in self._columnas.items():
+            nueva = np.zeros(capacidad, dtype=columna.dtype)
+            nueva[:len(self.ids)] = columna[:len(self.ids)]
+            self._columnas[nombre] = nueva
@@ -0,0 +1,145 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Hueco encontrado: (ID del pallet libre, X, Y, distancia en metros)
+Hueco = Tuple[str, float, float, float]
+
+
+class SlotLocator:
+    """Índice espacial de los huecos libres (pallets con Ocupado = 0) en una rejilla hash.
+
+    Cada celda de `tam_celda` metros guarda los huecos que contiene, de modo que
+    añadir o quitar un hueco cuando cambia su ocupación es O(1), y la búsqueda
+    de los k más cercanos recorre anillos de celdas alrededor del punto hasta
+    que ningún hueco sin visitar puede estar más cerca que el k-ésimo encontrado.
+    """
+
+    # Huecos por celda que se buscan al elegir el tamaño de celda en `load`
+    HUECOS_POR_CELDA = 4
+
+    def __init__(self, tam_celda: float = 2.0):
+        self.tam_celda = tam_celda
+        self.posiciones: Dict[str, Tuple[float, float]] = {}
+        self.celdas: Dict[Tuple[int, int], Dict[str, Tuple[float, float]]] = {}
+        self._limites = None  # (ix0, iy0, ix1, iy1): celdas extremas que han tenido huecos
+
+    def __len__(self) -> int:
+        return len(self.posiciones)
+
+    def __contains__(self, pallet_id: str) -> bool:
+        return pallet_id in self.posiciones
+
+    def _celda(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.tam_celda), math.floor(y / self.tam_celda)
+
+    def load(self, pallet_ids: List[str], x: np.ndarray, y: np.ndarray, ocupado: np.ndarray):
+        """Reconstruir el índice a partir de columnas (p. ej. de un PalletStore).
+
+        El tamaño de celda se ajusta a la densidad de huecos para que cada celda
+        tenga en promedio unos HUECOS_POR_CELDA.
+        """
+        libres = np.flatnonzero(~np.asarray(ocupado, dtype=bool))
+        x_libres = np.asarray(x, dtype=np.float64)[libres]
+        y_libres = np.asarray(y, dtype=np.float64)[libres]
+        if len(libres):
+            area = max((np.ptp(x_libres) or 1.0) * (np.ptp(y_libres) or 1.0), 1.0)
+            self.tam_celda = math.sqrt(area * self.HUECOS_POR_CELDA / len(libres))
+
+        self.posiciones = {}
+        self.celdas = {}
+        self._limites = None
+        ix = np.floor(x_libres / self.tam_celda).astype(np.int64).tolist()
+        iy = np.floor(y_libres / self.tam_celda).astype(np.int64).tolist()
+        for fila, cx, cy, px, py in zip(libres.tolist(), ix, iy, x_libres.tolist(), y_libres.tolist()):
+            self._insertar(pallet_ids[fila], (cx, cy), (px, py))
+
+    def add(self, pallet_id: str, x: float, y: float):
+        """Registrar (o mover) un hueco libre"""
+        self.remove(pallet_id)
+        self._insertar(pallet_id, self._celda(x, y), (float(x), float(y)))
+
+    def remove(self, pallet_id: str):
+        posicion = self.posiciones.pop(pallet_id, None)
+        if posicion is None:
+            return
+        celda = self._celda(*posicion)
+        huecos = self.celdas[celda]
+        del huecos[pallet_id]
+        if not huecos:
+            del self.celdas[celda]
+
+    def update(self, pallet: dict):
+        """Aplicar el estado actual de un pallet: libre -> hueco, ocupado -> no"""
+        if pallet["Ocupado"]:
+            self.remove(pallet["ID"])
+        else:
+            self.add(pallet["ID"], pallet["X"], pallet["Y"])
+
+    def aplicar_parche(self, patch):
+        """Aplicar los pallets añadidos, eliminados o modificados de un PalletPatch"""
+        for pallet_id in patch.removed:
+            self.remove(pallet_id)
+        for pallet in patch.added:
+            self.update(pallet)
+        for pallet, campos in patch.changed.values():
+            if {"Ocupado", "X", "Y"} & campos:
+                self.update(pallet)
+
+    def nearest(self, x: float, y: float, k: int = 1, excluir: Iterable[str] = ()) -> List[Hueco]:
+        """Los k huecos libres más cercanos a (x, y), de menor a mayor distancia"""
+        excluir = set(excluir)
+        if k <= 0 or len(self.posiciones) <= len(excluir & self.posiciones.keys()):
+            return []
+        cx, cy = self._celda(x, y)
+        ix0, iy0, ix1, iy1 = self._limites
+        # Los anillos más cercanos que la rejilla ocupada (punto fuera del mapa) están vacíos
+        radio_minimo = max(ix0 - cx, cx - ix1, iy0 - cy, cy - iy1, 0)
+        radio_maximo = max(cx - ix0, ix1 - cx, cy - iy0, iy1 - cy, 0)
+
+        mejores: List[Tuple[float, str, float, float]] = []  # Montículo de máximos (distancia negada)
+        for radio in range(radio_minimo, radio_maximo + 1):
+            for celda in self._anillo(cx, cy, radio):
+                huecos = self.celdas.get(celda)
+                if not huecos:
+                    continue
+                for pallet_id, (px, py) in huecos.items():
+                    if pallet_id in excluir:
+                        continue
+                    distancia = math.hypot(px - x, py - y)
+                    if len(mejores) < k:
+                        heapq.heappush(mejores, (-distancia, pallet_id, px, py))
+                    elif distancia < -mejores[0][0]:
+                        heapq.heapreplace(mejores, (-distancia, pallet_id, px, py))
+            # Cualquier hueco fuera de los anillos recorridos está al menos a radio * tam_celda
+            if len(mejores) == k and -mejores[0][0] <= radio * self.tam_celda:
+                break
+        return [(pallet_id, px, py, -distancia) for distancia, pallet_id, px, py in sorted(mejores, reverse=True)]
+
+    def _insertar(self, pallet_id: str, celda: Tuple[int, int], posicion: Tuple[float, float]):
+        self.posiciones[pallet_id] = posicion
+        huecos = self.celdas.get(celda)
+        if huecos is None:
+            huecos = self.celdas[celda] = {}
+        huecos[pallet_id] = posicion
+        cx, cy = celda
+        if self._limites is None:
+            self._limites = (cx, cy, cx, cy)
+        else:
+            ix0, iy0, ix1, iy1 = self._limites
+            self._limites = (min(ix0, cx), min(iy0, cy), max(ix1, cx), max(iy1, cy))
+
+    @staticmethod
+    def _anillo(cx: int, cy: int, radio: int):
+        """Celdas a distancia de Chebyshev `radio` de (cx, cy)"""
+        if radio == 0:
+            yield cx, cy
+            return
+        for ix in range(cx - radio, cx + radio + 1):
+            yield ix, cy - radio
+            yield ix, cy + radio
+        for iy in range(cy - radio + 1, cy + radio):
+            yield cx - radio, iy
+            yield cx + radio, iy
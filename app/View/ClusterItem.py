@@ -0,0 +1,75 @@
+import math
+
+from PyQt5.QtWidgets import QGraphicsItem
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QBrush, QColor, QPen, QPainter, QFont
+
+# Colores extremos según la proporción de pallets ocupados en la celda
+COLOR_LIBRE = (128, 128, 128)  # Gris
+COLOR_OCUPADO = (0, 51, 102)   # Azul oscuro
+
+# Tamaño mínimo de celda en pantalla (px) para rotular el número de pallets
+CELDA_MIN_TEXTO = 28
+
+
+class ClusterItem(QGraphicsItem):
+    """Elemento único que pinta los agregados por celda cuando el mapa está alejado.
+
+    Cada celda no vacía se dibuja como un círculo cuyo tamaño crece con el número
+    de pallets y cuyo color va del gris (libres) al azul (ocupados).
+    """
+
+    NIVELES_COLOR = 10
+
+    def __init__(self, escala: float, rect: QRectF):
+        super().__init__()
+        self.escala = escala
+        self._rect = rect
+        self._celdas = []  # (centro, radio, pincel, texto)
+        self._tam_celda_px = 0.0
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.setZValue(1)
+
+        self._pen = QPen(QColor(224, 224, 224), 1)
+        self._pen.setCosmetic(True)
+        self._brushes = [QBrush(self._color(i / self.NIVELES_COLOR)) for i in range(self.NIVELES_COLOR + 1)]
+        self._font = QFont()
+        self._font.setPixelSize(11)
+        self._font.setBold(True)
+
+    @staticmethod
+    def _color(proporcion: float) -> QColor:
+        r, g, b = (round(l + (o - l) * proporcion) for l, o in zip(COLOR_LIBRE, COLOR_OCUPADO))
+        return QColor(r, g, b, 200)
+
+    def set_celdas(self, centros_x, centros_y, totales, proporciones, tam_celda: float):
+        """Sustituir las celdas a pintar (coordenadas y tamaño de celda en metros)"""
+        tam_px = tam_celda / self.escala
+        maximo = max(int(totales.max()), 1) if len(totales) else 1
+        celdas = []
+        for x, y, total, proporcion in zip(centros_x.tolist(), centros_y.tolist(),
+                                           totales.tolist(), proporciones.tolist()):
+            radio = tam_px * (0.2 + 0.3 * math.sqrt(total / maximo))
+            brush = self._brushes[round(proporcion * self.NIVELES_COLOR)]
+            celdas.append((QPointF(x / self.escala, y / self.escala), radio, brush, str(total)))
+        self._celdas = celdas
+        self._tam_celda_px = tam_px
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def paint(self, painter, option, widget=None):
+        visible = option.exposedRect
+        rotular = self._tam_celda_px * painter.worldTransform().m11() >= CELDA_MIN_TEXTO
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(self._pen)
+        painter.setFont(self._font)
+        for centro, radio, brush, texto in self._celdas:
+            if not visible.intersects(QRectF(centro.x() - radio, centro.y() - radio, 2 * radio, 2 * radio)):
+                continue
+            painter.setBrush(brush)
+            painter.drawEllipse(centro, radio, radio)
+            if rotular:
+                painter.drawText(QRectF(centro.x() - radio, centro.y() - radio, 2 * radio, 2 * radio),
+                                 Qt.AlignCenter, texto)
@@ -1,16 +1,32 @@
-from PyQt5.QtWidgets import QScrollArea, QFrame, QMainWindow, QGraphicsScene, QGraphicsView, QGraphicsRectItem, QGraphicsPixmapItem, QFileDialog, QTableWidgetItem, QMessageBox, QHeaderView, QPushButton, QSizePolicy, QSplitter
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QPixmap, QBrush, QColor, QPen, QPainter, QWheelEvent, QCursor
+from PyQt5.QtWidgets import QScrollArea, QFrame, QMainWindow, QGraphicsScene, QGraphicsView, QGraphicsPixmapItem, QFileDialog, QTableWidgetItem, QMessageBox, QHeaderView, QPushButton, QSizePolicy, QSplitter, QLineEdit, QLabel, QAction
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QRectF, QPointF
+from PyQt5.QtGui import QPixmap, QPainter, QWheelEvent
 from View.ui_mainwindow import Ui_MainWindow
+from View.PalletItem import PalletItem
+from View.ClusterItem import ClusterItem
+from View.SugerenciaItem import SugerenciaItem
+
+class MapaScene(QGraphicsScene):
+    """Escena del mapa: los PalletItem notifican los clics a través de esta señal"""
+    pallet_clicked = pyqtSignal(str)
 
 class GraphicsView(QGraphicsView):
     """QGraphicsView personalizado para manejar zoom y desplazamiento"""
+    # Emitida al hacer zoom, desplazar o redimensionar la vista
+    viewport_cambiado = pyqtSignal()
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setRenderHint(QPainter.Antialiasing)
         self.setRenderHint(QPainter.SmoothPixmapTransform)
         self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing)
         self._zoom = 0
+    
+    @property
+    def nivel_zoom(self) -> int:
+        """Pasos de rueda respecto al ajuste inicial del mapa (negativo = alejado)"""
+        return self._zoom
         
     def wheelEvent(self, event: QWheelEvent):
         """Manejar zoom con la rueda del ratón"""
@@ -38,6 +54,28 @@ class GraphicsView(QGraphicsView):
         new_pos = self.mapToScene(event.pos())
         delta = new_pos - old_pos
         self.translate(delta.x(), delta.y())
+        self.viewport_cambiado.emit()
+    
+    def mousePressEvent(self, event):
+        # Mayús+arrastrar: selección por rectángulo (Ctrl+Mayús la añade a la actual);
+        # sin Mayús, arrastrar desplaza el mapa
+        if event.button() == Qt.LeftButton and event.modifiers() & Qt.ShiftModifier:
+            self.setDragMode(QGraphicsView.RubberBandDrag)
+        super().mousePressEvent(event)
+    
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        if self.dragMode() == QGraphicsView.RubberBandDrag:
+            self.setDragMode(QGraphicsView.ScrollHandDrag)
+    
+    def scrollContentsBy(self, dx: int, dy: int):
+        """Desplazamiento por arrastre o barras de scroll"""
+        super().scrollContentsBy(dx, dy)
+        self.viewport_cambiado.emit()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.viewport_cambiado.emit()
 
 class MainWindow(QMainWindow):
     # Señales
@@ -46,6 +84,19 @@ class MainWindow(QMainWindow):
     propiedades_actualizadas = pyqtSignal(dict)
     imagen_cargada = pyqtSignal(str)
     add_to_orders_clicked = pyqtSignal()
+    region_solicitada = pyqtSignal(float, float, float, float)  # x0, y0, x1, y1 en metros
+    filtro_cambiado = pyqtSignal(str)  # Expresión del filtro ("" para quitarlo)
+    mapa_calor_cambiado = pyqtSignal(bool)
+    
+    # Fracción del tamaño visible que se carga por cada lado alrededor de la vista
+    MARGEN_REGION = 0.5
+    # Elementos de pallet retirados que se conservan para reutilizar
+    POOL_MAXIMO = 5000
+    # A partir de cuántas retiradas se desactiva el índice BSP (retirar uno a uno con índice es muy lento)
+    RETIRADA_MASIVA = 1000
+    # Tamaño en pantalla (px) de las celdas de agregados en el modo alejado
+    CELDA_CLUSTER_PX = 48
+    TEXTO_AÑADIR_ORDEN = "Añadir a la lista de órdenes"
     
     def __init__(self):
         super().__init__()
@@ -58,18 +109,42 @@ class MainWindow(QMainWindow):
         self.ui.workLayout.replaceWidget(self.ui.marco_trabajo, self.graphics_view)
         self.ui.marco_trabajo.deleteLater()
         
-        self.scene = QGraphicsScene()
+        self.scene = MapaScene()
+        self.scene.pallet_clicked.connect(self.on_pallet_clicked)
         self.graphics_view.setScene(self.scene)
         
+        # La selección por rectángulo cambia en cada movimiento del ratón: se atiende al terminar
+        self._seleccion_timer = QTimer(self)
+        self._seleccion_timer.setSingleShot(True)
+        self._seleccion_timer.setInterval(0)
+        self._seleccion_timer.timeout.connect(self.on_seleccion_cambiada)
+        self.scene.selectionChanged.connect(self._seleccion_timer.start)
+        
         self.background_item = None
+        self.cluster_item = None
+        self.calor_item = None
+        self.sugerencia_item = None
         self.has_image = False
         
         self.ui.actionAbrir.triggered.connect(self.on_abrir)
         self.ui.actionSalir.triggered.connect(self.on_salir)
+        self.setup_menu_ver()
         
         self.setup_propiedades_table()
+        self.setup_filtro()
         
         self.pallet_items = {}
+        self.filtro_ids = None  # IDs que cumplen el filtro activo (None: sin filtro)
+        self.region_cargada = None  # Zona de la escena cuyos pallets tienen elemento creado
+        self._zoom_region = None    # Nivel de zoom con el que se cargó esa zona
+        self._pool_items = []
+        
+        # Las comprobaciones de la zona visible se agrupan mientras dura el zoom/arrastre
+        self._region_timer = QTimer(self)
+        self._region_timer.setSingleShot(True)
+        self._region_timer.setInterval(40)
+        self._region_timer.timeout.connect(self.comprobar_region_visible)
+        self.graphics_view.viewport_cambiado.connect(self._region_timer.start)
         
         self.setup_splitter_layout()
         self.setup_io_display()
@@ -81,6 +156,7 @@ class MainWindow(QMainWindow):
         
         self.current_pallet_id = None
         self.add_to_orders_button = None
+        self._pallet_mostrado = False  # Propiedades de un pallet ocupado en pantalla
         
         self.resizeEvent = self.on_resize
     
@@ -171,6 +247,81 @@ class MainWindow(QMainWindow):
             value_item = QTableWidgetItem()
             self.ui.propiedadesTable.setItem(row, 1, value_item)
     
+    def setup_menu_ver(self):
+        self.menuVer = self.ui.menubar.addMenu("Ver")
+        self.actionMapaCalor = QAction("Mapa de calor", self)
+        self.actionMapaCalor.setCheckable(True)
+        self.actionMapaCalor.setStatusTip("Opacidad: densidad de pallets ocupados; color: peso medio por celda "
+                                          "(amarillo ligero, rojo pesado)")
+        self.actionMapaCalor.toggled.connect(self.mapa_calor_cambiado.emit)
+        self.menuVer.addAction(self.actionMapaCalor)
+    
+    def setup_filtro(self):
+        """Campo de filtro sobre la tabla de propiedades: resalta los pallets que cumplen la expresión"""
+        self.filtro_edit = QLineEdit()
+        self.filtro_edit.setPlaceholderText("Filtro, p. ej.: Peso > 800 and Prioridad = 5")
+        self.filtro_edit.setClearButtonEnabled(True)
+        self.filtro_edit.setStyleSheet("""
+            QLineEdit {
+                background-color: #2b2b2b;
+                color: #e0e0e0;
+                border: 1px solid #444;
+                border-radius: 4px;
+                padding: 4px;
+                font-size: 11px;
+            }
+            QLineEdit:focus {
+                border-color: #1a73e8;
+            }
+        """)
+        self.filtro_edit.returnPressed.connect(lambda: self.filtro_cambiado.emit(self.filtro_edit.text()))
+        self.filtro_edit.textChanged.connect(self.on_filtro_texto)
+        
+        self.filtro_label = QLabel()
+        self.filtro_label.setStyleSheet("color: #e0e0e0; font-size: 10px;")
+        self.filtro_label.setVisible(False)
+        
+        self.ui.propiedadesLayout.insertWidget(0, self.filtro_edit)
+        self.ui.propiedadesLayout.insertWidget(1, self.filtro_label)
+    
+    def on_filtro_texto(self, texto: str):
+        # Al vaciar el campo (botón de borrar incluido) se quita el filtro
+        if not texto.strip():
+            self.filtro_cambiado.emit("")
+    
+    def mostrar_filtro(self, pallet_ids):
+        """Aplicar un filtro nuevo: resaltar los pallets de `pallet_ids` y atenuar el resto (None lo quita)"""
+        self.filtro_ids = set(pallet_ids) if pallet_ids is not None else None
+        for pallet_id, item in self.pallet_items.items():
+            item.set_resaltado(self._resaltado(pallet_id))
+        self._actualizar_filtro_label()
+    
+    def actualizar_filtro(self, entran: list, salen: list):
+        """Aplicar los pallets que entran o salen del filtro activo"""
+        if self.filtro_ids is None:
+            return
+        self.filtro_ids.difference_update(salen)
+        self.filtro_ids.update(entran)
+        for pallet_id in salen:
+            item = self.pallet_items.get(pallet_id)
+            if item is not None:
+                item.set_resaltado(False)
+        for pallet_id in entran:
+            item = self.pallet_items.get(pallet_id)
+            if item is not None:
+                item.set_resaltado(True)
+        self._actualizar_filtro_label()
+    
+    def _resaltado(self, pallet_id: str):
+        return None if self.filtro_ids is None else pallet_id in self.filtro_ids
+    
+    def _actualizar_filtro_label(self):
+        if self.filtro_ids is None:
+            self.filtro_label.setVisible(False)
+            return
+        self.filtro_label.setText(f"{len(self.filtro_ids)} pallets cumplen el filtro")
+        self.filtro_label.setVisible(True)
+    
     def cargar_imagen_fondo(self, image_path: str):
         if self.background_item:
             self.scene.removeItem(self.background_item)
@@ -183,91 +334,163 @@ class MainWindow(QMainWindow):
         self.background_item = QGraphicsPixmapItem(pixmap)
         self.scene.addItem(self.background_item)
         self.scene.setSceneRect(self.background_item.boundingRect())
+        
+        self.cluster_item = ClusterItem(self.escala, self.background_item.boundingRect())
+        self.cluster_item.setVisible(False)
+        self.scene.addItem(self.cluster_item)
+        
+        # Capa del mapa de calor, por encima de pallets y agregados; no recibe clics
+        self.calor_item = QGraphicsPixmapItem()
+        self.calor_item.setTransformationMode(Qt.SmoothTransformation)
+        self.calor_item.setAcceptedMouseButtons(Qt.NoButton)
+        self.calor_item.setZValue(2)
+        self.calor_item.setVisible(False)
+        self.scene.addItem(self.calor_item)
+        
+        self.sugerencia_item = SugerenciaItem(self.escala)
+        self.sugerencia_item.setVisible(False)
+        self.scene.addItem(self.sugerencia_item)
         self.graphics_view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
         self.has_image = True
         return True
     
     def dibujar_pallet(self, pallet_data: dict):
-        if not self.has_image:
+        """Crear el elemento de un pallet si cae dentro de la zona cargada"""
+        if not self.has_image or not self._en_region_cargada(pallet_data):
             return
         
-        pallet_id = pallet_data["ID"]
-        x_metro = pallet_data["X"]
-        y_metro = pallet_data["Y"]
-        x = x_metro / self.escala
-        y = y_metro / self.escala
-        ocupado = bool(pallet_data["Ocupado"])
-        
-        ANCHO_PRINCIPAL = 60
-        ALTO_PRINCIPAL = 30
-        ANCHO_SECUNDARIO = 20
-        ALTO_SECUNDARIO = 40
-        
-        if ocupado:
-            color_principal = QColor(0, 51, 102)    # Azul oscuro
-            color_secundario = QColor(120, 60, 20)  # Marrón claro
+        if self._pool_items:
+            item = self._pool_items.pop()
+            item.reasignar(pallet_data)
         else:
-            color_principal = QColor(128, 128, 128) # Gris
-            color_secundario = QColor(128, 128, 128)
-        
-        pen_negro = QPen(Qt.black, 1)
-        
-        rect_horizontal = QGraphicsRectItem(0, 0, ANCHO_PRINCIPAL, ALTO_PRINCIPAL)
-        rect_horizontal.setPos(x - ANCHO_PRINCIPAL/2, y - ALTO_PRINCIPAL/2)
-        rect_horizontal.setBrush(QBrush(color_principal))
-        rect_horizontal.setPen(pen_negro)
-        rect_horizontal.setData(0, pallet_id)
-        rect_horizontal.setFlag(QGraphicsRectItem.ItemIsSelectable, True)
-        rect_horizontal.setCursor(QCursor(Qt.PointingHandCursor))
-        
-        rect_vertical = QGraphicsRectItem(0, 0, ANCHO_SECUNDARIO, ALTO_SECUNDARIO)
-        rect_vertical.setPos(x - ANCHO_SECUNDARIO/2, y - ALTO_SECUNDARIO/2)
-        rect_vertical.setBrush(QBrush(color_secundario))
-        rect_vertical.setPen(pen_negro)
-        rect_vertical.setData(0, pallet_id)
-        rect_vertical.setFlag(QGraphicsRectItem.ItemIsSelectable, True)
-        rect_vertical.setCursor(QCursor(Qt.PointingHandCursor))
-        
-        tooltip_text = f"Pallet ID: {pallet_id}\nCalidad: {pallet_data.get('Calidad', 'N/A')}\nOcupado: {'Sí' if ocupado else 'No'}"
-        rect_horizontal.setToolTip(tooltip_text)
-        rect_vertical.setToolTip(tooltip_text)
-        
-        self.scene.addItem(rect_horizontal)
-        self.scene.addItem(rect_vertical)
-        
-        self.pallet_items[pallet_id] = [rect_horizontal, rect_vertical]
-        
-        rect_horizontal.mousePressEvent = lambda event, pid=pallet_id: self.on_pallet_clicked(event, pid)
-        rect_vertical.mousePressEvent = lambda event, pid=pallet_id: self.on_pallet_clicked(event, pid)
-        
-        rect_horizontal.hoverEnterEvent = lambda event, pid=pallet_id: self.on_pallet_hover_enter(event, pid)
-        rect_horizontal.hoverLeaveEvent = lambda event, pid=pallet_id: self.on_pallet_hover_leave(event, pid)
-        rect_vertical.hoverEnterEvent = lambda event, pid=pallet_id: self.on_pallet_hover_enter(event, pid)
-        rect_vertical.hoverLeaveEvent = lambda event, pid=pallet_id: self.on_pallet_hover_leave(event, pid)
-        
-        rect_horizontal.setAcceptHoverEvents(True)
-        rect_vertical.setAcceptHoverEvents(True)
+            item = PalletItem(pallet_data, self.escala)
+        item.set_resaltado(self._resaltado(pallet_data["ID"]))
+        self.scene.addItem(item)
+        self.pallet_items[pallet_data["ID"]] = item
+    
+    def _en_region_cargada(self, pallet_data: dict) -> bool:
+        if self.region_cargada is None:
+            return False
+        return self.region_cargada.contains(QPointF(pallet_data["X"] / self.escala, pallet_data["Y"] / self.escala))
     
-    def on_pallet_hover_enter(self, event, pallet_id):
-        event.accept()
+    def region_visible(self) -> QRectF:
+        """Zona de la escena visible actualmente en la vista"""
+        return self.graphics_view.mapToScene(self.graphics_view.viewport().rect()).boundingRect()
     
-    def on_pallet_hover_leave(self, event, pallet_id):
-        event.accept()
+    def extension_mapa(self) -> tuple:
+        """Ancho y alto del mapa en metros"""
+        rect = self.scene.sceneRect()
+        return rect.width() * self.escala, rect.height() * self.escala
     
-    def on_pallet_clicked(self, event, pallet_id):
-        for pid, items in self.pallet_items.items():
-            for item in items:
-                item.setSelected(False)
-                item.setPen(QPen(Qt.black, 1))
+    def tamano_celda_cluster(self) -> float:
+        """Tamaño en metros de las celdas de agregados para el zoom actual"""
+        return self.CELDA_CLUSTER_PX / self.graphics_view.transform().m11() * self.escala
+    
+    @property
+    def modo_clusters(self) -> bool:
+        return self.cluster_item is not None and self.cluster_item.isVisible()
+    
+    def mostrar_clusters(self, centros_x, centros_y, totales, proporciones, tam_celda: float):
+        """Sustituir los pallets individuales por los agregados por celda (en metros)"""
+        if self.cluster_item is None:
+            return
+        self.region_cargada = None
+        self._retirar_pallets(list(self.pallet_items))
+        self.cluster_item.set_celdas(centros_x, centros_y, totales, proporciones, tam_celda)
+        self.cluster_item.setVisible(True)
+    
+    def mostrar_mapa_calor(self, imagen, tam_celda: float):
+        """Sustituir la imagen del mapa de calor (un píxel por celda de `tam_celda` metros); None la oculta"""
+        if self.calor_item is None:
+            return
+        if imagen is None:
+            self.calor_item.setVisible(False)
+            self.calor_item.setPixmap(QPixmap())
+            return
+        self.calor_item.setPixmap(QPixmap.fromImage(imagen))
+        self.calor_item.setScale(tam_celda / self.escala)
+        self.calor_item.setVisible(True)
+    
+    def mostrar_sugerencia(self, pallet_id: str, origen: tuple, huecos: list):
+        """Marcar en el mapa los huecos libres (ID, X, Y, distancia) sugeridos para un pallet"""
+        if self.sugerencia_item is None:
+            return
+        if not huecos:
+            self.ocultar_sugerencia()
+            self.statusBar().showMessage(f"No hay huecos libres para el pallet {pallet_id}", 5000)
+            return
+        self.sugerencia_item.set_sugerencia(origen, huecos)
+        self.sugerencia_item.setVisible(True)
+        hueco_id, _x, _y, distancia = huecos[0]
+        self.statusBar().showMessage(f"Hueco libre más cercano al pallet {pallet_id}: {hueco_id} a {distancia:.2f} m")
+    
+    def ocultar_sugerencia(self):
+        if self.sugerencia_item is not None:
+            self.sugerencia_item.setVisible(False)
+        self.statusBar().clearMessage()
+    
+    def ocultar_clusters(self):
+        if self.cluster_item is not None:
+            self.cluster_item.setVisible(False)
+    
+    def comprobar_region_visible(self):
+        """Solicitar los pallets de la zona visible (más un margen) si no están ya cargados"""
+        if not self.has_image:
+            return
         
-        if pallet_id in self.pallet_items:
-            for item in self.pallet_items[pallet_id]:
-                item.setSelected(True)
-                item.setPen(QPen(Qt.black, 1))
+        visible = self.region_visible()
+        margen_x = visible.width() * self.MARGEN_REGION
+        margen_y = visible.height() * self.MARGEN_REGION
+        deseada = visible.adjusted(-margen_x, -margen_y, margen_x, margen_y)
+        
+        # Un cambio de zoom siempre se notifica para reevaluar el nivel de detalle
+        if (self.region_cargada is not None and self.region_cargada.contains(visible)
+                and self._zoom_region == self.graphics_view.nivel_zoom):
+            # Tras acercar mucho el zoom se libera lo que ha quedado lejos
+            area_cargada = self.region_cargada.width() * self.region_cargada.height()
+            if area_cargada <= 4 * deseada.width() * deseada.height():
+                return
         
+        self._zoom_region = self.graphics_view.nivel_zoom
+        self.region_solicitada.emit(deseada.left() * self.escala, deseada.top() * self.escala,
+                                    deseada.right() * self.escala, deseada.bottom() * self.escala)
+    
+    def sincronizar_region(self, region: tuple, pallets: list):
+        """Ajustar los elementos de la escena a los pallets de una zona (x0, y0, x1, y1 en metros).
+        
+        Los elementos fuera de la zona se retiran al pool y se reutilizan para los nuevos.
+        """
+        x0, y0, x1, y1 = region
+        self.region_cargada = QRectF(QPointF(x0 / self.escala, y0 / self.escala),
+                                     QPointF(x1 / self.escala, y1 / self.escala))
+        
+        en_region = {p["ID"]: p for p in pallets}
+        self._retirar_pallets([pid for pid in self.pallet_items if pid not in en_region])
+        for pallet_id, pallet in en_region.items():
+            if pallet_id not in self.pallet_items:
+                self.dibujar_pallet(pallet)
+    
+    def on_pallet_clicked(self, pallet_id):
         self.pallet_seleccionado.emit(pallet_id)
         self.current_pallet_id = pallet_id
-        event.accept()
+    
+    def pallets_seleccionados(self) -> list:
+        """IDs de los pallets seleccionados en el mapa (clic, Ctrl+clic o Mayús+arrastrar)"""
+        return [item.pallet_id for item in self.scene.selectedItems() if isinstance(item, PalletItem)]
+    
+    def on_seleccion_cambiada(self):
+        self._actualizar_boton_ordenes()
+    
+    def _actualizar_boton_ordenes(self):
+        """Con varios pallets seleccionados el botón los añade todos; con uno, el pallet mostrado"""
+        seleccionados = len(self.pallets_seleccionados())
+        if seleccionados > 1:
+            boton = self._boton_ordenes()
+            boton.setText(f"Añadir {seleccionados} pallets a la lista de órdenes")
+            boton.setEnabled(True)
+        elif self.add_to_orders_button:
+            self.add_to_orders_button.setText(self.TEXTO_AÑADIR_ORDEN)
+            self.add_to_orders_button.setEnabled(self._pallet_mostrado)
     
     def mostrar_propiedades_pallet(self, pallet_data: dict):
         try:
@@ -298,8 +521,15 @@ class MainWindow(QMainWindow):
                     item.setFlags(item.flags() & ~Qt.ItemIsEditable)
                 self.ui.propiedadesTable.setItem(row, 1, item)
         
+        self._pallet_mostrado = True
+        self._boton_ordenes()
+        self._actualizar_boton_ordenes()
+        self.ui.propiedadesTable.itemChanged.connect(self.on_propiedades_changed)
+    
+    def _boton_ordenes(self) -> QPushButton:
+        """Botón de añadir a la lista de órdenes (se crea la primera vez que se necesita)"""
         if not self.add_to_orders_button:
-            self.add_to_orders_button = QPushButton("Añadir a la lista de órdenes")
+            self.add_to_orders_button = QPushButton(self.TEXTO_AÑADIR_ORDEN)
             self.add_to_orders_button.setStyleSheet("""
                 QPushButton {
                     background-color: #2b2b2b;
@@ -328,9 +558,7 @@ class MainWindow(QMainWindow):
             """)
             self.add_to_orders_button.clicked.connect(self.add_to_orders_clicked.emit)
             self.ui.propiedadesLayout.addWidget(self.add_to_orders_button)
-        
-        self.add_to_orders_button.setEnabled(True)
-        self.ui.propiedadesTable.itemChanged.connect(self.on_propiedades_changed)
+        return self.add_to_orders_button
     
     def limpiar_propiedades_pallet(self):
         """Limpia la tabla de propiedades y deshabilita el botón de añadir a órdenes, sin disparar señales."""
@@ -342,8 +570,8 @@ class MainWindow(QMainWindow):
         for row in range(self.ui.propiedadesTable.rowCount()):
             self.ui.propiedadesTable.setItem(row, 1, QTableWidgetItem(""))
         
-        if self.add_to_orders_button:
-            self.add_to_orders_button.setEnabled(False)
+        self._pallet_mostrado = False
+        self._actualizar_boton_ordenes()
     
     def on_propiedades_changed(self, item: QTableWidgetItem):
         if item.column() == 1:
@@ -375,14 +603,20 @@ class MainWindow(QMainWindow):
     def limpiar_escena(self):
         self.scene.clear()
         self.pallet_items.clear()
+        self.region_cargada = None
         self.background_item = None
+        self.cluster_item = None
+        self.calor_item = None
+        self.sugerencia_item = None
         self.has_image = False
         self.current_pallet_id = None
+        self._pallet_mostrado = False
         
         for row in range(self.ui.propiedadesTable.rowCount()):
             self.ui.propiedadesTable.setItem(row, 1, QTableWidgetItem(""))
         
         if self.add_to_orders_button:
+            self.add_to_orders_button.setText(self.TEXTO_AÑADIR_ORDEN)
             self.add_to_orders_button.setEnabled(False)
         
         self.ui.groupOrdenes.setMinimumHeight(150)
@@ -393,15 +627,37 @@ class MainWindow(QMainWindow):
             self.io_controller.stop_monitoring()
             self.io_controller.reset_display()
     
-    def actualizar_pallet_visual(self, pallet_id: str, pallet_data: dict):
-        if pallet_id in self.pallet_items:
-            for item in self.pallet_items[pallet_id]:
-                if item.scene():
-                    self.scene.removeItem(item)
-            del self.pallet_items[pallet_id]
-        
-        if self.has_image:
+    def _retirar_pallets(self, pallet_ids: list):
+        """Retirar varios pallets de la escena"""
+        masiva = len(pallet_ids) > self.RETIRADA_MASIVA
+        if masiva:
+            self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        for pallet_id in pallet_ids:
+            self.eliminar_pallet(pallet_id)
+        if masiva:
+            self.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+    
+    def eliminar_pallet(self, pallet_id: str):
+        """Quitar de la escena el elemento de un pallet y guardarlo para reutilizarlo"""
+        item = self.pallet_items.pop(pallet_id, None)
+        if item is None:
+            return
+        if item.scene():
+            item.setSelected(False)
+            self.scene.removeItem(item)
+        if len(self._pool_items) < self.POOL_MAXIMO:
+            self._pool_items.append(item)
+    
+    def actualizar_pallet_visual(self, pallet_id: str, pallet_data: dict, campos=None):
+        """Actualizar un pallet en el sitio (color, posición, tooltip) o dibujarlo si no existe"""
+        item = self.pallet_items.get(pallet_id)
+        if item is None:
             self.dibujar_pallet(pallet_data)
+        elif not self._en_region_cargada(pallet_data):
+            # Se ha movido fuera de la zona cargada
+            self.eliminar_pallet(pallet_id)
+        else:
+            item.actualizar(pallet_data, campos)
     
     def on_abrir(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -0,0 +1,192 @@
+import bisect
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+COLUMNAS = ("Origen", "Destino", "Turno")
+COLUMNA_TURNO = 2
+
+
+class OrdenesTableModel(QAbstractTableModel):
+    """Órdenes de la tabla de la interfaz, en orden (Destino, ID) y cargadas por páginas.
+
+    Solo se leen de la base de datos las páginas que la vista necesita al
+    desplazarse (canFetchMore/fetchMore, paginación por clave). Los cambios se
+    aplican fila a fila: la posición de una orden se busca por bisección sobre las
+    claves (Destino, ID) cargadas y la vista recibe rowsInserted, rowsRemoved,
+    rowsMoved o dataChanged solo de esa fila, sin recargar la tabla. El turno de
+    cada orden no se guarda en las filas: se pide a `turno` (el planificador) al
+    mostrarlo, así que un cambio en la cola solo repinta las celdas visibles.
+    """
+
+    TAM_PAGINA = 256
+
+    def __init__(self, ordenes_model, turno: Callable[[int], Optional[int]] = None, parent=None):
+        super().__init__(parent)
+        self.ordenes_model = ordenes_model  # OrdenesModel
+        self.turno = turno or (lambda order_id: None)  # ID -> turno en la cola
+        self._claves: List[tuple] = []       # (Destino, ID) de cada fila cargada, ordenadas
+        self._filas: List[list] = []         # [ID, Origen, Destino] de cada fila
+        self._destinos: Dict[int, int] = {}  # ID -> Destino de las órdenes cargadas
+        self._todo_cargado = True
+
+    # ----------------- QAbstractTableModel -----------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNAS)
+
+    def data(self, index, role=Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        fila = self._filas[index.row()]
+        if role == Qt.DisplayRole:
+            valor = self.turno(fila[0]) if index.column() == COLUMNA_TURNO else fila[index.column() + 1]
+            return "" if valor is None else str(valor)
+        if role == Qt.UserRole:
+            return fila[0]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole) -> Any:
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMNAS[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled if index.isValid() else Qt.NoItemFlags
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self._todo_cargado
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        pagina = self.ordenes_model.get_orders_page(self._claves[-1] if self._claves else None, self.TAM_PAGINA)
+        self._todo_cargado = len(pagina) < self.TAM_PAGINA
+        if not pagina:
+            return
+        inicio = len(self._filas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(pagina) - 1)
+        for orden in pagina:
+            self._anexar(orden)
+        self.endInsertRows()
+
+    # ----------------- API pública -----------------
+    def reload(self):
+        """Descartar las filas cargadas y leer la primera página"""
+        self.beginResetModel()
+        self._vaciar()
+        self._todo_cargado = False
+        pagina = self.ordenes_model.get_orders_page(None, self.TAM_PAGINA)
+        self._todo_cargado = len(pagina) < self.TAM_PAGINA
+        for orden in pagina:
+            self._anexar(orden)
+        self.endResetModel()
+
+    def clear(self):
+        """Vaciar la tabla sin volver a consultar la base de datos"""
+        self.beginResetModel()
+        self._vaciar()
+        self._todo_cargado = True
+        self.endResetModel()
+
+    def order_id(self, row: int) -> Optional[int]:
+        return self._filas[row][0] if 0 <= row < len(self._filas) else None
+
+    def order(self, row: int) -> Optional[Dict[str, Any]]:
+        """Datos (ID, Origen, Destino, Turno) de la orden de una fila"""
+        if not 0 <= row < len(self._filas):
+            return None
+        order_id, origen, destino = self._filas[row]
+        return {"ID": order_id, "Origen": origen, "Destino": destino, "Turno": self.turno(order_id)}
+
+    def row_of(self, order_id: int) -> Optional[int]:
+        """Fila de una orden (O(log n)); None si no está cargada"""
+        destino = self._destinos.get(order_id)
+        if destino is None:
+            return None
+        return bisect.bisect_left(self._claves, (destino, order_id))
+
+    def add_order(self, orden: Dict[str, Any]):
+        """Insertar una orden nueva en su fila (si cae más allá de lo cargado, llegará con fetchMore)"""
+        if orden["ID"] in self._destinos:
+            self.update_order(orden)
+            return
+        clave = (orden["Destino"], orden["ID"])
+        if not self._en_rango(clave):
+            return
+        fila = bisect.bisect_left(self._claves, clave)
+        self.beginInsertRows(QModelIndex(), fila, fila)
+        self._insertar(fila, orden)
+        self.endInsertRows()
+
+    def remove_order(self, order_id: int):
+        fila = self.row_of(order_id)
+        if fila is None:
+            return
+        self.beginRemoveRows(QModelIndex(), fila, fila)
+        self._quitar(fila)
+        self.endRemoveRows()
+
+    def update_order(self, orden: Dict[str, Any]):
+        """Aplicar los datos nuevos de una orden; si cambia su destino, se mueve a su nueva fila"""
+        fila = self.row_of(orden["ID"])
+        if fila is None:
+            self.add_order(orden)
+            return
+        clave = (orden["Destino"], orden["ID"])
+        if clave != self._claves[fila]:
+            # Posición y última clave cargada sin contar la propia fila
+            destino = bisect.bisect_left(self._claves, clave)
+            if destino > fila:
+                destino -= 1
+            ultima = self._claves[-1] if fila < len(self._claves) - 1 else self._claves[-2] if fila else None
+            if not self._todo_cargado and (ultima is None or clave > ultima):
+                self.remove_order(orden["ID"])
+                return
+            if destino != fila:
+                self.beginMoveRows(QModelIndex(), fila, fila, QModelIndex(), destino + 1 if destino > fila else destino)
+                self._quitar(fila)
+                self._insertar(destino, orden)
+                self.endMoveRows()
+                fila = destino
+        self._insertar(fila, orden, reemplazar=True)
+        self.dataChanged.emit(self.index(fila, 0), self.index(fila, len(COLUMNAS) - 1))
+
+    def update_sequence(self):
+        """Avisar de que los turnos han cambiado: la vista vuelve a pedir los de las filas visibles"""
+        if self._filas:
+            self.dataChanged.emit(self.index(0, COLUMNA_TURNO), self.index(len(self._filas) - 1, COLUMNA_TURNO))
+
+    # ----------------- Internos -----------------
+    def _vaciar(self):
+        self._claves = []
+        self._filas = []
+        self._destinos = {}
+
+    def _en_rango(self, clave: tuple) -> bool:
+        """Si una clave cae dentro de las páginas ya cargadas"""
+        return self._todo_cargado or (bool(self._claves) and clave < self._claves[-1])
+
+    def _anexar(self, orden: Dict[str, Any]):
+        self._insertar(len(self._filas), orden)
+
+    def _insertar(self, fila: int, orden: Dict[str, Any], reemplazar: bool = False):
+        datos = [orden["ID"], orden["Origen"], orden["Destino"]]
+        clave = (orden["Destino"], orden["ID"])
+        if reemplazar:
+            self._filas[fila] = datos
+            self._claves[fila] = clave
+        else:
+            self._filas.insert(fila, datos)
+            self._claves.insert(fila, clave)
+        self._destinos[orden["ID"]] = orden["Destino"]
+
+    def _quitar(self, fila: int):
+        order_id = self._filas[fila][0]
+        del self._filas[fila]
+        del self._claves[fila]
+        del self._destinos[order_id]
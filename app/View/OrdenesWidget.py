@@ -1,7 +1,6 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                             QTableWidgetItem, QPushButton, QAbstractItemView, 
-                             QHeaderView, QSizePolicy)
-from PyQt5.QtCore import pyqtSignal, Qt
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+                             QPushButton, QAbstractItemView, QHeaderView, QSizePolicy)
+from PyQt5.QtCore import pyqtSignal
 
 
 class OrdenesWidget(QWidget):
@@ -10,6 +9,7 @@ class OrdenesWidget(QWidget):
     delete_order_requested = pyqtSignal(int)
     move_up_requested = pyqtSignal(int)
     move_down_requested = pyqtSignal(int)
+    optimize_requested = pyqtSignal()
     selection_changed = pyqtSignal(int)
     
     def __init__(self):
@@ -22,13 +22,11 @@ class OrdenesWidget(QWidget):
         layout.setContentsMargins(5, 5, 5, 5)
         layout.setSpacing(8)
         
-        # Tabla de órdenes 
-        self.order_table = QTableWidget()
-        self.order_table.setColumnCount(2)  # Solo 2 columnas: Origen y Destino
-        self.order_table.setHorizontalHeaderLabels(["Origen", "Destino"])
+        # Tabla de órdenes (Origen, Destino y turno); el modelo lo asigna el controlador con set_model
+        self.order_table = QTableView()
         self.order_table.setAlternatingRowColors(True)
         self.order_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #1e1e1e;
                 color: #e0e0e0;
                 border: 1px solid #444;
@@ -37,21 +35,17 @@ class OrdenesWidget(QWidget):
                 gridline-color: #333;
                 min-height: 150px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #1a73e8;
                 color: white;
             }
-            QTableWidget QTableWidgetItem:alternate {
+            QTableView::item:alternate {
                 background-color: #2b2b2b;
                 color: #e0e0e0;
             }
-            QTableWidget QTableWidgetItem {
-                background-color: #1e1e1e;
-                color: #e0e0e0;
-            }
         """)
         self.order_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.order_table.setSelectionMode(QAbstractItemView.SingleSelection)
@@ -84,6 +78,8 @@ class OrdenesWidget(QWidget):
         self.up_button = QPushButton("▲ Subir")
         self.down_button = QPushButton("▼ Bajar")
         self.delete_button = QPushButton("✕ Eliminar")
+        self.optimize_button = QPushButton("⇄ Optimizar")
+        self.optimize_button.setToolTip("Reasignar los destinos de la cola minimizando la distancia recorrida")
         
         button_style = """
             QPushButton {
@@ -111,7 +107,7 @@ class OrdenesWidget(QWidget):
             }
         """
         
-        for button in [self.up_button, self.down_button, self.delete_button]:
+        for button in [self.up_button, self.down_button, self.delete_button, self.optimize_button]:
             button.setEnabled(False)
             button.setStyleSheet(button_style)
             button_layout.addWidget(button)
@@ -122,18 +118,25 @@ class OrdenesWidget(QWidget):
         self.delete_button.clicked.connect(self.on_delete_clicked)
         self.up_button.clicked.connect(self.on_up_clicked)
         self.down_button.clicked.connect(self.on_down_clicked)
-        self.order_table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.optimize_button.clicked.connect(self.optimize_requested.emit)
+    
+    def set_model(self, model):
+        """Asignar el modelo de la tabla (OrdenesTableModel)."""
+        self.order_table.setModel(model)
+        self.order_table.selectionModel().currentRowChanged.connect(self.on_selection_changed)
+        model.modelReset.connect(self.on_rows_changed)
+        model.rowsInserted.connect(self.on_rows_changed)
+        model.rowsRemoved.connect(self.on_rows_changed)
+        self.on_rows_changed()
     
     # ----------------- Handlers de botones -----------------
+    def _current_row(self) -> int:
+        index = self.order_table.currentIndex()
+        return index.row() if index.isValid() else -1
+    
     def _get_selected_order_id(self):
-        """Obtener el ID de la orden seleccionada (guardado en UserRole de la columna 0)."""
-        current_row = self.order_table.currentRow()
-        if current_row < 0:
-            return None
-        origen_item = self.order_table.item(current_row, 0)
-        if origen_item:
-            return origen_item.data(Qt.UserRole)
-        return None
+        """Obtener el ID de la orden seleccionada."""
+        return self.order_table.model().order_id(self._current_row())
 
     def on_delete_clicked(self):
         order_id = self._get_selected_order_id()
@@ -151,7 +154,7 @@ class OrdenesWidget(QWidget):
             self.move_down_requested.emit(order_id)
     
     def on_selection_changed(self):
-        has_selection = self.order_table.currentRow() >= 0
+        has_selection = self._current_row() >= 0
         self.up_button.setEnabled(has_selection)
         self.down_button.setEnabled(has_selection)
         self.delete_button.setEnabled(has_selection)
@@ -161,47 +164,12 @@ class OrdenesWidget(QWidget):
             if order_id is not None:
                 self.selection_changed.emit(order_id)
     
+    def on_rows_changed(self):
+        has_selection = self._current_row() >= 0
+        for button in [self.up_button, self.down_button, self.delete_button]:
+            button.setEnabled(has_selection)
+        self.optimize_button.setEnabled(self.order_table.model().rowCount() > 0)
+    
     # ----------------- API pública -----------------
     def clear_orders(self):
-        self.order_table.setRowCount(0)
-    
-    def add_order_item(self, order_id: int, origen: int, destino: int):
-        """Añadir una orden a la tabla (ID solo en UserRole)."""
-        row = self.order_table.rowCount()
-        self.order_table.insertRow(row)
-        
-        # Origen (aquí guardamos el ID en UserRole)
-        origen_item = QTableWidgetItem(str(origen))
-        origen_item.setData(Qt.UserRole, order_id)
-        origen_item.setFlags(origen_item.flags() & ~Qt.ItemIsEditable)
-        self.order_table.setItem(row, 0, origen_item)
-        
-        # Destino
-        destino_item = QTableWidgetItem(str(destino))
-        destino_item.setFlags(destino_item.flags() & ~Qt.ItemIsEditable)
-        self.order_table.setItem(row, 1, destino_item)
-    
-    def remove_order_item(self, order_id: int):
-        """Remover una orden por ID (buscando en UserRole de la columna 0)."""
-        for row in range(self.order_table.rowCount()):
-            origen_item = self.order_table.item(row, 0)
-            if origen_item and origen_item.data(Qt.UserRole) == order_id:
-                self.order_table.removeRow(row)
-                break
-    
-    def update_order_item(self, order_id: int, origen: int, destino: int):
-        """Actualizar una orden existente."""
-        for row in range(self.order_table.rowCount()):
-            origen_item = self.order_table.item(row, 0)
-            if origen_item and origen_item.data(Qt.UserRole) == order_id:
-                # Origen
-                origen_item.setText(str(origen))
-                
-                # Destino
-                destino_item = QTableWidgetItem(str(destino))
-                destino_item.setFlags(destino_item.flags() & ~Qt.ItemIsEditable)
-                self.order_table.setItem(row, 1, destino_item)
-                break
-    
-    def refresh_table(self):
-        self.order_table.viewport().update()
\ No newline at end of file
+        self.order_table.model().clear()
@@ -0,0 +1,181 @@
+from PyQt5.QtWidgets import QGraphicsItem
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QBrush, QColor, QPen, QPainter, QPainterPath
+
+# Geometría de la cruz (en píxeles de escena, centrada en la posición del pallet)
+ANCHO_PRINCIPAL = 60
+ALTO_PRINCIPAL = 30
+ANCHO_SECUNDARIO = 20
+ALTO_SECUNDARIO = 40
+
+RECT_PRINCIPAL = QRectF(-ANCHO_PRINCIPAL / 2, -ALTO_PRINCIPAL / 2, ANCHO_PRINCIPAL, ALTO_PRINCIPAL)
+RECT_SECUNDARIO = QRectF(-ANCHO_SECUNDARIO / 2, -ALTO_SECUNDARIO / 2, ANCHO_SECUNDARIO, ALTO_SECUNDARIO)
+
+# Por debajo de este nivel de detalle la cruz ocupa pocos píxeles y se pinta como un único rectángulo
+LOD_SIMPLIFICADO = 0.2
+
+# Los pallets que no cumplen el filtro activo se pintan con su color mezclado con este gris
+GRIS_ATENUADO = QColor(70, 70, 70)
+PROPORCION_ATENUADO = 0.75
+
+
+class PalletPalette:
+    """Plumas y pinceles compartidos por todos los pallets del mapa."""
+    _brushes = None
+    _pens = None
+
+    @classmethod
+    def brushes(cls, ocupado: bool, atenuado: bool = False):
+        """Pinceles (principal, secundario) según el estado de ocupación y si el filtro lo atenúa"""
+        if cls._brushes is None:
+            colores = {
+                True: (QColor(0, 51, 102),       # Azul oscuro
+                       QColor(120, 60, 20)),     # Marrón claro
+                False: (QColor(128, 128, 128),   # Gris
+                        QColor(128, 128, 128)),
+            }
+            # Colores opacos ya mezclados: la transparencia duplica el coste de pintar miles de pallets
+            cls._brushes = {}
+            for estado, (principal, secundario) in colores.items():
+                cls._brushes[estado, False] = (QBrush(principal), QBrush(secundario))
+                cls._brushes[estado, True] = (QBrush(cls.atenuar(principal)), QBrush(cls.atenuar(secundario)))
+        return cls._brushes[ocupado, atenuado]
+
+    @staticmethod
+    def atenuar(color: QColor) -> QColor:
+        p = PROPORCION_ATENUADO
+        return QColor(round(color.red() * (1 - p) + GRIS_ATENUADO.red() * p),
+                      round(color.green() * (1 - p) + GRIS_ATENUADO.green() * p),
+                      round(color.blue() * (1 - p) + GRIS_ATENUADO.blue() * p))
+
+    @classmethod
+    def pen(cls, seleccionado: bool = False, hover: bool = False, resaltado=None):
+        """Pluma del contorno según el estado de interacción y del filtro"""
+        if cls._pens is None:
+            cls._pens = {
+                "normal": QPen(Qt.black, 1),
+                "hover": QPen(QColor(224, 224, 224), 1),
+                "seleccionado": QPen(QColor(26, 115, 232), 2),
+                "resaltado": QPen(QColor(255, 193, 7), 2),  # Ámbar
+                "atenuado": QPen(GRIS_ATENUADO, 1),
+            }
+        if seleccionado:
+            return cls._pens["seleccionado"]
+        if hover:
+            return cls._pens["hover"]
+        if resaltado is None:
+            return cls._pens["normal"]
+        return cls._pens["resaltado" if resaltado else "atenuado"]
+
+
+class PalletItem(QGraphicsItem):
+    """Elemento gráfico único por pallet que pinta la cruz y gestiona clic y hover.
+
+    La escena debe exponer una señal `pallet_clicked(str)`.
+    """
+
+    _shape = None
+
+    def __init__(self, pallet_data: dict, escala: float):
+        super().__init__()
+        self.pallet_id = pallet_data["ID"]
+        self.escala = escala
+        self.ocupado = bool(pallet_data["Ocupado"])
+        self.resaltado = None  # None: sin filtro; True/False: cumple o no el filtro activo
+        self._hover = False
+
+        self.setPos(pallet_data["X"] / escala, pallet_data["Y"] / escala)
+        self.setFlag(QGraphicsItem.ItemIsSelectable, True)
+        self.setAcceptHoverEvents(True)
+        self.setToolTip(self.tooltip_text(pallet_data))
+
+    def actualizar(self, pallet_data: dict, campos=None):
+        """Aplicar en el sitio los cambios de un pallet.
+
+        `campos` indica qué campos visuales cambiaron (None = comprobar todos).
+        La geometría de la cruz es fija, así que nunca hace falta recrear el elemento.
+        """
+        if campos is None or "X" in campos or "Y" in campos:
+            self.setPos(pallet_data["X"] / self.escala, pallet_data["Y"] / self.escala)
+
+        ocupado = bool(pallet_data["Ocupado"])
+        if ocupado != self.ocupado:
+            self.ocupado = ocupado
+            self.update()
+
+        if campos is None or "Calidad" in campos or "Ocupado" in campos:
+            self.setToolTip(self.tooltip_text(pallet_data))
+
+    def set_resaltado(self, resaltado):
+        """Marcar el pallet como coincidente (True), atenuado (False) o sin filtro (None)"""
+        if resaltado != self.resaltado:
+            self.resaltado = resaltado
+            self.update()
+
+    def reasignar(self, pallet_data: dict):
+        """Reutilizar el elemento para otro pallet (pool de elementos de MainWindow)"""
+        self.pallet_id = pallet_data["ID"]
+        self._hover = False
+        self.actualizar(pallet_data)
+        self.update()
+
+    @staticmethod
+    def tooltip_text(pallet_data: dict) -> str:
+        ocupado = bool(pallet_data["Ocupado"])
+        return f"Pallet ID: {pallet_data['ID']}\nCalidad: {pallet_data.get('Calidad', 'N/A')}\nOcupado: {'Sí' if ocupado else 'No'}"
+
+    def boundingRect(self) -> QRectF:
+        # Margen para la pluma más ancha (selección)
+        return QRectF(-ANCHO_PRINCIPAL / 2 - 1, -ALTO_SECUNDARIO / 2 - 1,
+                      ANCHO_PRINCIPAL + 2, ALTO_SECUNDARIO + 2)
+
+    def shape(self) -> QPainterPath:
+        if PalletItem._shape is None:
+            path = QPainterPath()
+            path.setFillRule(Qt.WindingFill)
+            path.addRect(RECT_PRINCIPAL)
+            path.addRect(RECT_SECUNDARIO)
+            PalletItem._shape = path.simplified()
+        return PalletItem._shape
+
+    def paint(self, painter, option, widget=None):
+        brush_principal, brush_secundario = PalletPalette.brushes(self.ocupado, self.resaltado is False)
+        # La vista solo escala y desplaza, así que m11 es el nivel de detalle
+        if painter.worldTransform().m11() < LOD_SIMPLIFICADO:
+            painter.fillRect(RECT_PRINCIPAL, brush_principal)
+            return
+
+        # Rectángulos alineados a los ejes: el antialiasing solo añade coste
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.setPen(PalletPalette.pen(self.isSelected(), self._hover, self.resaltado))
+        painter.setBrush(brush_principal)
+        painter.drawRect(RECT_PRINCIPAL)
+        painter.setBrush(brush_secundario)
+        painter.drawRect(RECT_SECUNDARIO)
+
+    def mousePressEvent(self, event):
+        scene = self.scene()
+        if event.modifiers() & Qt.ControlModifier:
+            # Ctrl+clic: añadir o quitar el pallet de la selección múltiple
+            self.setSelected(not self.isSelected())
+        elif not self.isSelected() or len(scene.selectedItems()) > 1:
+            scene.clearSelection()
+            self.setSelected(True)
+        scene.pallet_clicked.emit(self.pallet_id)
+        event.accept()
+
+    def mouseReleaseEvent(self, event):
+        # La selección ya se resolvió al pulsar; la implementación base la volvería a invertir con Ctrl
+        event.accept()
+
+    def hoverEnterEvent(self, event):
+        if not self.hasCursor():
+            self.setCursor(Qt.PointingHandCursor)
+        self._hover = True
+        self.update()
+        event.accept()
+
+    def hoverLeaveEvent(self, event):
+        self._hover = False
+        self.update()
+        event.accept()
@@ -0,0 +1,64 @@
+from PyQt5.QtWidgets import QGraphicsItem
+from PyQt5.QtCore import Qt, QRectF, QPointF, QLineF
+from PyQt5.QtGui import QBrush, QColor, QPen, QPainter, QFont
+
+# Radio (px de escena) de la marca de cada hueco sugerido
+RADIO_HUECO = 26
+ANCHO_PLUMA = 5
+COLOR_SUGERENCIA = QColor(46, 204, 113)  # Verde
+
+
+class SugerenciaItem(QGraphicsItem):
+    """Marca en el mapa los huecos libres sugeridos para un pallet.
+
+    Dibuja una línea discontinua desde el pallet hasta el hueco más cercano y un
+    círculo numerado (1 = más cercano) sobre cada hueco sugerido.
+    """
+
+    def __init__(self, escala: float):
+        super().__init__()
+        self.escala = escala
+        self._origen = None
+        self._huecos = []  # (posición en escena, texto)
+        self._rect = QRectF()
+        self.setAcceptedMouseButtons(Qt.NoButton)
+        self.setZValue(3)
+
+        self._pen_linea = QPen(COLOR_SUGERENCIA, ANCHO_PLUMA, Qt.DashLine)
+        self._pen_hueco = QPen(COLOR_SUGERENCIA, ANCHO_PLUMA)
+        relleno = QColor(COLOR_SUGERENCIA)
+        relleno.setAlpha(70)
+        self._brush_hueco = QBrush(relleno)
+        self._font = QFont()
+        self._font.setPixelSize(RADIO_HUECO)
+        self._font.setBold(True)
+
+    def set_sugerencia(self, origen: tuple, huecos: list):
+        """Mostrar los huecos (ID, X, Y, distancia) sugeridos para un pallet en `origen` (X, Y en metros)"""
+        self.prepareGeometryChange()
+        self._origen = QPointF(origen[0] / self.escala, origen[1] / self.escala)
+        self._huecos = [(QPointF(x / self.escala, y / self.escala), str(i))
+                        for i, (_id, x, y, _distancia) in enumerate(huecos, start=1)]
+        puntos = [self._origen] + [posicion for posicion, _texto in self._huecos]
+        xs, ys = [p.x() for p in puntos], [p.y() for p in puntos]
+        margen = RADIO_HUECO + ANCHO_PLUMA
+        self._rect = QRectF(QPointF(min(xs) - margen, min(ys) - margen), QPointF(max(xs) + margen, max(ys) + margen))
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def paint(self, painter, option, widget=None):
+        if self._origen is None or not self._huecos:
+            return
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(self._pen_linea)
+        painter.drawLine(QLineF(self._origen, self._huecos[0][0]))
+
+        painter.setPen(self._pen_hueco)
+        painter.setBrush(self._brush_hueco)
+        painter.setFont(self._font)
+        for posicion, texto in self._huecos:
+            painter.drawEllipse(posicion, RADIO_HUECO, RADIO_HUECO)
+            painter.drawText(QRectF(posicion.x() - RADIO_HUECO, posicion.y() - RADIO_HUECO,
+                                    2 * RADIO_HUECO, 2 * RADIO_HUECO), Qt.AlignCenter, texto)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Asignación de destinos: reparto cíclico frente a DestinationOptimizer (húngaro por rondas).
+
+Comprueba la optimalidad del algoritmo húngaro contra la fuerza bruta en matrices
+pequeñas y mide OrdenesModel.optimize_destinations() con colas de miles de órdenes,
+comprobando que las órdenes que llegan después completan la última ronda sin repetir destinos.
+Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_destinos.py
+"""
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.ConnectionManager import ConnectionManager
+from Model.DestinationOptimizer import hungaro
+from Model.OrdenesModel import OrdenesModel
+from comun import preparar
+
+COLAS = (1_000, 5_000, 10_000)
+
+
+def comprobar_hungaro(pruebas: int = 500) -> bool:
+    rng = random.Random(1)
+    for _ in range(pruebas):
+        n = rng.randint(1, 6)
+        m = rng.randint(n, 7)
+        costes = [[rng.uniform(0, 50) for _ in range(m)] for _ in range(n)]
+        asignacion = hungaro(costes)
+        coste = sum(costes[i][j] for i, j in enumerate(asignacion))
+        optimo = min(sum(costes[i][j] for i, j in enumerate(p)) for p in itertools.permutations(range(m), n))
+        if len(set(asignacion)) != n or abs(coste - optimo) > 1e-9:
+            return False
+    return True
+
+
+def main():
+    correcto = comprobar_hungaro()
+    print(f"húngaro = fuerza bruta: {'sí' if correcto else 'NO  <-- FALLO'}")
+
+    _db, pallets = preparar(max(COLAS))
+    ordenes = OrdenesModel("DB/pallets.db")
+
+    print(f"\n{'órdenes':>8}{'cíclico (m)':>14}{'optimizado (m)':>16}{'ahorro':>9}{'tiempo (ms)':>13}")
+    for cantidad in COLAS:
+        with ordenes._transaction() as conn:
+            conn.execute("DELETE FROM ordenes")
+            conn.executemany("INSERT INTO ordenes (Origen, Destino, Pallet_ID) VALUES (?, ?, ?)",
+                             [(p["Posicion"], i % OrdenesModel.NUM_DESTINOS + 1, p["ID"])
+                              for i, p in enumerate(pallets[:cantidad])])
+            # Como si el contador hubiera repartido esos destinos
+            conn.execute("UPDATE secuencias SET Valor = ? WHERE Nombre = 'destino'", (cantidad,))
+        inicio = time.perf_counter()
+        antes, despues = ordenes.optimize_destinations()
+        duracion = (time.perf_counter() - inicio) * 1000
+
+        # Cada ronda de NUM_DESTINOS órdenes debe seguir usando cada destino una vez
+        secuencia = ordenes.get_destination_sequence()
+        rondas_validas = all(
+            sorted(secuencia[i:i + OrdenesModel.NUM_DESTINOS]) == list(range(1, OrdenesModel.NUM_DESTINOS + 1))
+            for i in range(0, len(secuencia) - OrdenesModel.NUM_DESTINOS + 1, OrdenesModel.NUM_DESTINOS)
+        )
+        # Las órdenes nuevas deben completar la última ronda con los destinos que le faltan
+        faltan = -cantidad % OrdenesModel.NUM_DESTINOS
+        ordenes.insert_orders([(0, None)] * faltan)
+        ultima = ordenes.get_destination_sequence()[cantidad - cantidad % OrdenesModel.NUM_DESTINOS:]
+        rondas_validas &= sorted(ultima) == list(range(1, OrdenesModel.NUM_DESTINOS + 1))
+        correcto &= rondas_validas and despues <= antes
+        estado = "" if rondas_validas and despues <= antes else "  <-- FALLO"
+        print(f"{cantidad:>8}{antes:>14.0f}{despues:>16.0f}{(1 - despues / antes):>9.0%}{duracion:>13.0f}{estado}")
+
+    ConnectionManager.close_all()
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Benchmark sin pantalla (plataforma offscreen) de construcción y pintado de la escena del mapa.
+
+Compara un PalletItem por pallet con los dos QGraphicsRectItem anteriores.
+Cada caso se ejecuta en un subproceso para medir la memoria de forma aislada.
+
+Uso (desde app/):  python benchmarks/bench_escena.py [10000 50000 ...]
+"""
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+TAMANOS = (10_000, 50_000, 100_000)
+ESCALA = 0.05
+
+
+def rss_mb() -> float:
+    """Memoria residente actual del proceso en MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def pallets(cantidad):
+    rng = random.Random(7)
+    return [{"ID": f"{i:08x}", "X": rng.uniform(0, 48.95), "Y": rng.uniform(0, 29.95),
+             "Ocupado": rng.randint(0, 1), "Calidad": rng.randint(0, 5)} for i in range(cantidad)]
+
+
+def construir_original(scene, datos):
+    """Construcción anterior de MainWindow.dibujar_pallet: dos rectángulos y lambdas por pallet"""
+    from PyQt5.QtWidgets import QGraphicsRectItem
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QBrush, QColor, QPen, QCursor
+
+    items = {}
+    for p in datos:
+        x, y = p["X"] / ESCALA, p["Y"] / ESCALA
+        color = QColor(0, 51, 102) if p["Ocupado"] else QColor(128, 128, 128)
+        pen = QPen(Qt.black, 1)
+        rects = []
+        for ancho, alto in ((60, 30), (20, 40)):
+            rect = QGraphicsRectItem(0, 0, ancho, alto)
+            rect.setPos(x - ancho / 2, y - alto / 2)
+            rect.setBrush(QBrush(color))
+            rect.setPen(pen)
+            rect.setData(0, p["ID"])
+            rect.setFlag(QGraphicsRectItem.ItemIsSelectable, True)
+            rect.setCursor(QCursor(Qt.PointingHandCursor))
+            rect.setToolTip(f"Pallet ID: {p['ID']}\nCalidad: {p['Calidad']}")
+            scene.addItem(rect)
+            rect.mousePressEvent = lambda event, pid=p["ID"]: None
+            rect.hoverEnterEvent = lambda event, pid=p["ID"]: None
+            rect.hoverLeaveEvent = lambda event, pid=p["ID"]: None
+            rect.setAcceptHoverEvents(True)
+            rects.append(rect)
+        items[p["ID"]] = rects
+    return items
+
+
+def construir_pallet_item(scene, datos):
+    from View.PalletItem import PalletItem
+
+    items = {}
+    for p in datos:
+        item = PalletItem(p, ESCALA)
+        scene.addItem(item)
+        items[p["ID"]] = item
+    return items
+
+
+def caso(modo: str, cantidad: int):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QRectF
+    from View.MainWindow import GraphicsView, MapaScene
+
+    app = QApplication(sys.argv)
+    datos = pallets(cantidad)
+    scene = MapaScene()
+    scene.setSceneRect(QRectF(0, 0, 979, 599))
+    view = GraphicsView()
+    view.setScene(scene)
+    view.resize(1280, 800)
+
+    base = rss_mb()
+    inicio = time.perf_counter()
+    construir = construir_original if modo == "original" else construir_pallet_item
+    items = construir(scene, datos)
+    scene.itemsBoundingRect()  # Fuerza la construcción del índice BSP
+    t_construir = time.perf_counter() - inicio
+    memoria = rss_mb() - base
+
+    view.fitInView(scene.sceneRect())
+    inicio = time.perf_counter()
+    view.viewport().grab()
+    t_alejado = time.perf_counter() - inicio
+
+    view.scale(8, 8)
+    view.centerOn(490, 300)
+    inicio = time.perf_counter()
+    for _ in range(10):
+        view.translate(5, 5)
+        view.viewport().grab()
+    t_pan = (time.perf_counter() - inicio) / 10
+
+    print(f"{modo:>12} | {cantidad:>7} | {t_construir:7.2f}s | {memoria:8.1f}MB | "
+          f"{t_alejado * 1000:8.1f}ms | {t_pan * 1000:8.1f}ms")
+    del items
+    app.quit()
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--caso":
+        caso(sys.argv[2], int(sys.argv[3]))
+        return
+
+    tamanos = [int(a) for a in sys.argv[1:]] or TAMANOS
+    print(f"{'modo':>12} | {'pallets':>7} | {'escena':>8} | {'memoria':>10} | {'alejado':>10} | {'pan x8':>10}")
+    for cantidad in tamanos:
+        for modo in ("original", "pallet_item"):
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--caso", modo, str(cantidad)],
+                           stderr=subprocess.DEVNULL, check=False)
+
+
+if __name__ == "__main__":
+    main()
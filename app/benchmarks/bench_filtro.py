@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Tiempo de evaluación de PalletFilter sobre todo el almacén y sobre las filas modificadas.
+
+Comprueba además que el resultado coincide con el mismo filtro aplicado en Python
+a la lista de dicts. Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_filtro.py
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from Model.PalletFilter import PalletFilter
+from Model.PalletStore import PalletStore
+from comun import medir
+from generate_pallets import generar_lote
+
+TAMANOS = (10_000, 100_000)
+REPETICIONES = 20
+# Fracción de pallets modificados en cada sondeo para la reevaluación incremental
+FRACCION_MODIFICADA = 0.01
+
+# (expresión, filtro equivalente en Python)
+FILTROS = [
+    ("Peso > 800 and Prioridad = 5", lambda p: p["Peso"] > 800 and p["Prioridad"] == 5),
+    ("Ocupado and 1 <= Calidad <= 3", lambda p: p["Ocupado"] and 1 <= p["Calidad"] <= 3),
+    ("Posicion in (10, 20, 30) or Largo * Ancho > 2",
+     lambda p: p["Posicion"] in (10, 20, 30) or p["Largo"] * p["Ancho"] > 2),
+    ("not Ocupado", lambda p: not p["Ocupado"]),
+    # Decimales en float32: se comparan con los valores tal como se introdujeron
+    ("Largo in (1.2, 0.8) or Peso in (500.3,)",
+     lambda p: round(p["Largo"], 2) in (1.2, 0.8) or round(p["Peso"], 1) == 500.3),
+    ("Largo * Ancho = 1.2 and Largo != 1.2",
+     lambda p: round(round(p["Largo"], 2) * round(p["Ancho"], 2), 4) == 1.2 and round(p["Largo"], 2) != 1.2),
+]
+
+
+def main():
+    correcto = True
+    for cantidad in TAMANOS:
+        pallets = generar_lote((0, cantidad, 1))
+        for i, pallet in enumerate(pallets):
+            pallet["Calidad"] = i % 6
+        # Los dicts con los mismos valores (float32) que el almacén, para comparar sin redondeos
+        store = PalletStore()
+        store.load([p["ID"] for p in pallets], PalletStore.to_columns(pallets))
+        pallets = store.rows(range(len(store)))
+        filas = np.array(sorted(random.Random(1).sample(range(cantidad), int(cantidad * FRACCION_MODIFICADA))))
+
+        print(f"\n{cantidad} pallets")
+        print(f"  {'filtro':<48}{'cumplen':>9}{'máscara (ms)':>14}{'IDs (ms)':>10}"
+              f"{f'{FRACCION_MODIFICADA:.0%} filas (ms)':>16}{'Python (ms)':>13}")
+        for expresion, en_python in FILTROS:
+            filtro = PalletFilter(expresion)
+            _mascara, ms_mascara = medir(filtro.evaluar, store, repeticiones=REPETICIONES)
+            ids, ms_ids = medir(filtro.coincidentes, store, repeticiones=REPETICIONES)
+            _parcial, ms_filas = medir(filtro.evaluar, store, filas, repeticiones=REPETICIONES)
+            esperados, ms_python = medir(lambda: {p["ID"] for p in pallets if en_python(p)}, repeticiones=REPETICIONES)
+            coincide = ids == esperados
+            correcto &= coincide
+            print(f"  {expresion:<48}{len(ids):>9}{ms_mascara:>14.2f}{ms_ids:>10.2f}{ms_filas:>16.3f}"
+                  f"{ms_python:>13.1f}{'' if coincide else '  <-- resultado distinto'}")
+
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
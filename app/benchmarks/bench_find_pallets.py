@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Comprueba que find_pallets usa los índices de atributos y lo compara con filtrar get_all_pallets().
+
+Para cada consulta verifica con EXPLAIN QUERY PLAN que se usa el índice esperado
+(o que se recorre la tabla cuando ningún índice compensa), que el resultado coincide
+con el filtro en Python y mide ambos tiempos. Cada índice de
+DataProvider.ATTRIBUTE_INDEXES debe aparecer en algún plan.
+Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_find_pallets.py [cantidad]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.ConnectionManager import ConnectionManager
+from Model.DataProvider import DataProvider
+from comun import medir, preparar
+
+REPETICIONES = 5
+
+# (descripción, argumentos de find_pallets, filtro equivalente en Python, índice esperado;
+# None = recorrer la tabla)
+CONSULTAS = [
+    ("ocupados, Calidad != 0, Prioridad >= 4",
+     dict(Ocupado=1, Calidad__ne=0, Prioridad__ge=4),
+     lambda p: p["Ocupado"] == 1 and p["Calidad"] != 0 and p["Prioridad"] >= 4,
+     "pallets_ocupado"),
+    ("Prioridad = 5 libres",
+     dict(Prioridad=5, Ocupado=0),
+     lambda p: p["Prioridad"] == 5 and p["Ocupado"] == 0,
+     "pallets_ocupado"),
+    # Una sexta parte de la tabla: un índice solo sobre Calidad no mejoraría el recorrido
+    ("Calidad = 3",
+     dict(Calidad=3),
+     lambda p: p["Calidad"] == 3,
+     None),
+    ("Posicion en (10, 20, 30)",
+     dict(Posicion__in=(10, 20, 30)),
+     lambda p: p["Posicion"] in (10, 20, 30),
+     "pallets_posicion"),
+    ("Posicion entre 100 y 110, ocupados",
+     dict(Posicion__ge=100, Posicion__le=110, Ocupado=1),
+     lambda p: 100 <= p["Posicion"] <= 110 and p["Ocupado"] == 1,
+     "pallets_posicion"),
+]
+
+
+def main(cantidad):
+    # Calidad variada: el generador deja todos los pallets con Calidad 0
+    def variar_calidad(pallets):
+        for i, pallet in enumerate(pallets):
+            pallet["Calidad"] = i % 6
+    db, _pallets = preparar(cantidad, variar_calidad)
+    # Como al reiniciar la aplicación: al abrir una tabla con datos y sin estadísticas se ejecuta ANALYZE
+    ConnectionManager.close_all()
+    db = DataProvider(db.db_path)
+    print(f"{cantidad} pallets\n")
+
+    correcto = True
+    usados = set()
+    print(f"{'consulta':<42}{'filas':>8}{'índice (ms)':>13}{'Python (ms)':>13}  plan")
+    for descripcion, argumentos, filtro, indice in CONSULTAS:
+        plan = db.explain_find_pallets(**argumentos)
+        if indice is None:
+            usa_indice = all("INDEX" not in paso for paso in plan)
+        else:
+            usa_indice = any(f"INDEX {indice} " in f"{paso} " for paso in plan)
+            usados.add(indice)
+
+        encontrados, t_indice = medir(lambda: db.find_pallets(**argumentos), repeticiones=REPETICIONES)
+        esperados, t_python = medir(lambda: [p for p in db.get_all_pallets() if filtro(p)], repeticiones=REPETICIONES)
+        coincide = sorted(p["ID"] for p in encontrados) == sorted(p["ID"] for p in esperados)
+
+        correcto &= usa_indice and coincide
+        estado = "" if usa_indice and coincide else "  <-- FALLO" + ("" if coincide else " (resultado distinto)")
+        print(f"{descripcion:<42}{len(encontrados):>8}{t_indice:>13.1f}{t_python:>13.1f}  {' / '.join(plan)}{estado}")
+
+    # El orden y el límite se resuelven con el índice, sin ordenar la tabla completa
+    plan = db.explain_find_pallets(Ocupado=1, Prioridad__ge=4, order_by="-Prioridad", limit=20)
+    sin_ordenar = not any("TEMP B-TREE" in paso for paso in plan)
+    correcto &= sin_ordenar
+    print(f"\nocupados, order_by='-Prioridad', limit=20: {' / '.join(plan)}{'' if sin_ordenar else '  <-- FALLO'}")
+
+    # Ningún índice sin una consulta que lo use
+    sobrantes = set(DataProvider.ATTRIBUTE_INDEXES) - usados
+    correcto &= not sobrantes
+    print(f"índices sin consulta: {', '.join(sorted(sobrantes)) or 'ninguno'}{'  <-- FALLO' if sobrantes else ''}")
+
+    ConnectionManager.close_all()
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
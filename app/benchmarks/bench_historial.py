@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Historial de órdenes: la cola activa pequeña y los resúmenes precalculados.
+
+Simula 100k órdenes cumplidas a lo largo de 30 días (completadas en lotes de 30,
+como una carga de camión, y algunas eliminadas) con una cola activa de 200 órdenes.
+Mide lo que cuesta archivar cada lote, leer la cola activa frente a leer todas las
+órdenes (lo que costaría si las cumplidas se quedaran en `ordenes`) y leer los
+resúmenes por hora y por destino frente a agregarlos sobre el historial. Comprueba
+que los resúmenes coinciden con el historial, que el borrado en cascada archiva la
+orden y que el historial no admite modificaciones. Termina con código 1 si alguna
+comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_historial.py
+"""
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.ConnectionManager import ConnectionManager
+from Model.OrdenesModel import OrdenesModel
+from comun import medir, ocupar, preparar
+
+HISTORIAL = 100_000
+ACTIVAS = 200
+LOTE = 30
+DIAS = 30
+REPETICIONES = 20
+
+
+def agregar_historial(conn, columna):
+    """Agregado equivalente al resumen, calculado sobre todo el historial"""
+    return [tuple(row) for row in conn.execute(f"""
+        SELECT {columna} AS Clave, SUM(Estado = 'completada'), SUM(Estado != 'completada'),
+               SUM(IIF(Estado = 'completada', COALESCE(Cerrada - Creada, 0), 0))
+        FROM (SELECT *, CAST(Cerrada / 3600 AS INTEGER) * 3600 AS Hora FROM ordenes_historial)
+        GROUP BY Clave ORDER BY Clave
+    """)]
+
+
+def coinciden(resumen, agregado) -> bool:
+    return len(resumen) == len(agregado) and all(
+        r[0] == a[0] and r[1] == a[1] and r[2] == a[2] and abs(r[3] - a[3]) < 1e-3 * max(1.0, a[3])
+        for r, a in zip(resumen, agregado)
+    )
+
+
+def main():
+    correcto = True
+    rng = random.Random(1)
+    db, pallets = preparar(HISTORIAL + ACTIVAS, ocupar)
+    ordenes = OrdenesModel("DB/pallets.db")
+    conn = ordenes._connection()
+
+    # Historial: lotes cerrados a lo largo de DIAS días
+    ids = ordenes.insert_orders([(p["Posicion"], p["ID"]) for p in pallets[:HISTORIAL]])
+    ahora = time.time()
+    inicio_simulado = ahora - DIAS * 86400
+    tiempos = []
+    for inicio in range(0, HISTORIAL, LOTE):
+        lote = ids[inicio:inicio + LOTE]
+        cerrada = inicio_simulado + DIAS * 86400 * inicio / HISTORIAL
+        if rng.random() < 0.1:
+            for order_id in lote[:3]:
+                ordenes.delete_order(order_id)
+            lote = lote[3:]
+        t0 = time.perf_counter()
+        ordenes.complete_orders(lote, cerrada=cerrada)
+        tiempos.append(time.perf_counter() - t0)
+    ordenes.insert_orders([(p["Posicion"], p["ID"]) for p in pallets[HISTORIAL:]])
+
+    activas = len(ordenes.get_all_orders())
+    archivadas = conn.execute("SELECT COUNT(*) FROM ordenes_historial").fetchone()[0]
+    print(f"{archivadas} órdenes en el historial, {activas} en la cola activa")
+    print(f"  completar un lote de {LOTE}:          {sum(tiempos) / len(tiempos) * 1e3:>8.2f} ms")
+    if activas != ACTIVAS or archivadas != HISTORIAL:
+        print("  la cola activa o el historial no tienen las órdenes esperadas  <-- FALLO")
+        correcto = False
+
+    _, t_cola = medir(ordenes.get_all_orders, repeticiones=REPETICIONES)
+    _, t_todas = medir(lambda: conn.execute(
+        "SELECT * FROM ordenes_historial ORDER BY Destino, ID").fetchall(), repeticiones=3)
+    print(f"  leer la cola activa:                {t_cola:>8.2f} ms")
+    print(f"  leer la cola sin archivar (100k):   {t_todas:>8.2f} ms")
+
+    for nombre, columna, lectura in (("hora", "Hora", ordenes.get_orders_per_hour),
+                                     ("destino", "Destino", ordenes.get_orders_per_destination)):
+        resumen, t_resumen = medir(lectura, repeticiones=REPETICIONES)
+        agregado, t_agregado = medir(lambda: agregar_historial(conn, columna), repeticiones=3)
+        print(f"  por {nombre + ':':<8} resumen {t_resumen:>7.2f} ms, "
+              f"agregando el historial {t_agregado:>7.1f} ms ({len(resumen)} filas)")
+        if not coinciden([tuple(fila.values()) for fila in resumen], agregado):
+            print(f"  el resumen por {nombre} no coincide con el historial  <-- FALLO")
+            correcto = False
+
+    ultimo_dia, t_dia = medir(lambda: ordenes.get_history(desde=ahora - 86400, limite=HISTORIAL),
+                              repeticiones=REPETICIONES)
+    print(f"  historial del último día:           {t_dia:>8.2f} ms ({len(ultimo_dia)} órdenes)")
+
+    # Borrado en cascada al eliminar un pallet de la cola activa
+    pallet_id = pallets[-1]["ID"]
+    orden = ordenes.get_order_by_pallet(pallet_id)
+    db.delete_pallet(pallet_id)
+    archivada = conn.execute("SELECT Estado FROM ordenes_historial WHERE ID = ?", (orden["ID"],)).fetchone()
+    if archivada is None or archivada[0] != OrdenesModel.ESTADO_ELIMINADA:
+        print("  la orden borrada en cascada no está en el historial  <-- FALLO")
+        correcto = False
+
+    try:
+        with ordenes._transaction() as c:
+            c.execute("UPDATE ordenes_historial SET Destino = 1")
+        print("  el historial admite modificaciones  <-- FALLO")
+        correcto = False
+    except sqlite3.DatabaseError:
+        pass
+
+    ConnectionManager.close_all()
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
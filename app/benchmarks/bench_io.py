@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Señales I/O: memoria compartida vigilada por un IOWatcher frente al respaldo IO.db.
+
+Un proceso aparte (io_simulator.simular, modo contador) escribe 200 estados cada
+20 ms, y un IOWatcher los entrega a un bucle de eventos de Qt como en la interfaz.
+Para cada origen mide cuántos cambios llegan y, en memoria compartida, la latencia
+desde la escritura hasta que la señal llega al hilo principal. Mide también el
+coste de una lectura y comprueba, con el escritor a máxima velocidad, que el
+seqlock nunca devuelve una lectura a medio escribir. Necesita PyQt5. Termina con
+código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_io.py
+"""
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication, QTimer
+
+from Controller.IOWatcher import IOWatcher
+from Model.ConnectionManager import ConnectionManager
+from Model.IOProvider import IOProvider
+from Model.IOSource import SharedMemoryIOSource
+from comun import directorio_temporal
+from io_simulator import simular, BITS
+
+CAMBIOS = 200
+PERIODO = 0.02
+LECTURAS = 20_000
+LATENCIA_MAXIMA_MS = 10
+
+
+def vigilar(app, fuente, escritor: multiprocessing.Process, lector: SharedMemoryIOSource = None):
+    """Recibir los cambios de `fuente` mientras escribe `escritor`; retorna (recibidos, latencias, perdidas)"""
+    recibidos = []
+    latencias = []
+
+    def on_io_leido(input_value, output_value):
+        recibidos.append(output_value)
+        if lector is not None:
+            _secuencia, _input, output_actual, marca = lector.read_stamped()
+            if output_actual == output_value:  # Aún no ha llegado la escritura siguiente
+                latencias.append(time.time() - marca)
+
+    watcher = IOWatcher(fuente)
+    watcher.io_leido.connect(on_io_leido)
+    watcher.start()
+    escritor.start()
+
+    def comprobar():
+        if not escritor.is_alive():
+            QTimer.singleShot(int(IOProvider.INTERVALO * 1000) + 100, app.quit)
+            temporizador.stop()
+
+    temporizador = QTimer()
+    temporizador.timeout.connect(comprobar)
+    temporizador.start(10)
+    app.exec_()
+    watcher.stop()
+    escritor.join()
+    return recibidos, latencias, watcher.perdidas
+
+
+def coste_lectura(fuente) -> float:
+    inicio = time.perf_counter()
+    for _ in range(LECTURAS):
+        fuente.read()
+    return (time.perf_counter() - inicio) / LECTURAS
+
+
+def main():
+    app = QCoreApplication(sys.argv)
+    contexto = multiprocessing.get_context("spawn")
+    correcto = True
+    directorio_temporal()
+    directorio = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    ruta = tempfile.mktemp(prefix="bench_io_", dir=directorio)
+    SharedMemoryIOSource(ruta, escritor=True).close()
+
+    # Memoria compartida
+    fuente = SharedMemoryIOSource(ruta)
+    lector = SharedMemoryIOSource(ruta)
+    escritor = contexto.Process(target=simular, kwargs=dict(
+        periodo=PERIODO, cambios=CAMBIOS, modo="contador", ruta=ruta, silencioso=True))
+    recibidos, latencias, perdidas = vigilar(app, fuente, escritor, lector)
+    vistos = len(set(recibidos) & set(range(1, CAMBIOS + 1)))
+    mediana = statistics.median(latencias) * 1e3 if latencias else float("inf")
+    p99 = sorted(latencias)[int(len(latencias) * 0.99)] * 1e3 if latencias else float("inf")
+    print(f"{CAMBIOS} cambios cada {PERIODO * 1e3:g} ms")
+    print(f"  memoria compartida: {vistos:>4} recibidos, {perdidas} perdidos, "
+          f"latencia mediana {mediana:.2f} ms, p99 {p99:.2f} ms")
+    if vistos != CAMBIOS or perdidas:
+        print("  no han llegado todos los cambios  <-- FALLO")
+        correcto = False
+    if mediana > LATENCIA_MAXIMA_MS:
+        print(f"  latencia mediana por encima de {LATENCIA_MAXIMA_MS} ms  <-- FALLO")
+        correcto = False
+    t_memoria = coste_lectura(fuente)
+
+    # Respaldo IO.db
+    provider = IOProvider()
+    escritor = contexto.Process(target=simular, kwargs=dict(
+        periodo=PERIODO, cambios=CAMBIOS, modo="contador", sqlite=True, silencioso=True))
+    recibidos, _latencias, perdidas = vigilar(app, provider, escritor)
+    vistos = len(set(recibidos) & set(range(1, CAMBIOS + 1)))
+    print(f"  IO.db (respaldo):   {vistos:>4} recibidos (sondeo cada {IOProvider.INTERVALO * 1e3:g} ms)")
+    t_sqlite = coste_lectura(provider)
+    print(f"  lectura: memoria compartida {t_memoria * 1e6:.2f} µs, IO.db {t_sqlite * 1e6:.1f} µs")
+
+    # Lecturas con el escritor escribiendo sin pausa: Input debe corresponder siempre a Output
+    escritor = contexto.Process(target=simular, kwargs=dict(
+        periodo=0, cambios=500_000, modo="contador", ruta=ruta, silencioso=True))
+    escritor.start()
+    inconsistentes = lecturas = 0
+    while escritor.is_alive():
+        _secuencia, input_value, output_value = fuente.read()
+        lecturas += 1
+        inconsistentes += input_value != output_value % (1 << BITS)
+    escritor.join()
+    print(f"  escritor sin pausa: {lecturas} lecturas, {inconsistentes} inconsistentes")
+    if inconsistentes:
+        print("  el seqlock ha devuelto lecturas a medio escribir  <-- FALLO")
+        correcto = False
+
+    fuente.close()
+    lector.close()
+    os.remove(ruta)
+    ConnectionManager.close_all()
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Mapa de calor: construcción completa frente a actualización incremental de las celdas afectadas.
+
+Comprueba que los conteos coinciden con numpy.histogram2d y que, tras varias
+actualizaciones incrementales, el resultado es el mismo que reconstruirlo.
+Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_mapa_calor.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from Model.PalletHeatmap import PalletHeatmap
+from Model.PalletStore import PalletStore
+from comun import medir
+from generate_pallets import MAP_WIDTH_M, MAP_HEIGHT_M, generar_lote
+
+TAMANOS = (10_000, 100_000)
+TAM_CELDA = 1.0
+REPETICIONES = 10
+FRACCIONES = (0.0001, 0.001, 0.01)
+
+
+def modificar(store: PalletStore, filas: np.ndarray, rng: np.random.Generator):
+    """Mover, ocupar/liberar y cambiar el peso de las filas indicadas"""
+    store.update_rows(filas, {
+        "X": rng.uniform(0, MAP_WIDTH_M, len(filas)).astype(np.float32),
+        "Y": rng.uniform(0, MAP_HEIGHT_M, len(filas)).astype(np.float32),
+        "Ocupado": rng.integers(0, 2, len(filas)).astype(np.bool_),
+        "Peso": rng.uniform(50, 1200, len(filas)).astype(np.float32),
+    })
+
+
+def main():
+    correcto = True
+    rng = np.random.default_rng(1)
+    for cantidad in TAMANOS:
+        pallets = generar_lote((0, cantidad, 1))
+        store = PalletStore()
+        store.load([p["ID"] for p in pallets], PalletStore.to_columns(pallets))
+        calor = PalletHeatmap(MAP_WIDTH_M, MAP_HEIGHT_M, TAM_CELDA)
+
+        _totales, t_completo = medir(lambda: calor.construir(*PalletHeatmap.columnas(store)), repeticiones=REPETICIONES)
+        x, y = store.column("X"), store.column("Y")
+        histograma, _, _ = np.histogram2d(y, x, bins=(calor.ny, calor.nx),
+                                          range=((0, calor.ny * TAM_CELDA), (0, calor.nx * TAM_CELDA)))
+        coincide = np.array_equal(histograma.ravel().astype(np.int32), calor.totales)
+        correcto &= coincide
+
+        print(f"\n{cantidad} pallets, rejilla {calor.nx}x{calor.ny} celdas de {TAM_CELDA} m")
+        print(f"  construcción completa: {t_completo:.2f} ms{'' if coincide else '  <-- distinto de histogram2d'}")
+        for fraccion in FRACCIONES:
+            ids = random.Random(int(fraccion * 1e6)).sample(store.ids, max(1, int(cantidad * fraccion)))
+            tiempos = []
+            for _ in range(REPETICIONES):
+                anteriores = PalletHeatmap.columnas(store, ids)
+                modificar(store, store.rows_of(ids), rng)
+                inicio = time.perf_counter()
+                calor.actualizar(anteriores, PalletHeatmap.columnas(store, ids))
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            print(f"  actualizar {len(ids):>6} pallets: {np.median(tiempos):.3f} ms (mediana)")
+
+        referencia = PalletHeatmap(MAP_WIDTH_M, MAP_HEIGHT_M, TAM_CELDA)
+        referencia.construir(*PalletHeatmap.columnas(store))
+        igual = (np.array_equal(referencia.totales, calor.totales) and np.array_equal(referencia.ocupados, calor.ocupados)
+                 and np.allclose(referencia.pesos, calor.pesos))
+        correcto &= igual
+        print(f"  incremental = reconstruido: {'sí' if igual else 'NO  <-- FALLO'}")
+
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
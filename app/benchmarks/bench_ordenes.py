@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Mantenimiento de la cola de órdenes con colas grandes.
+
+Mide reset_destinations (una sentencia con función de ventana frente al bucle de
+un UPDATE por orden), get_order_by_pallet, insert_order y delete_order
+con 1k, 10k y 100k órdenes, y comprueba que el resultado del reinicio coincide con
+el del bucle. Las operaciones por pallet deben mantenerse planas al crecer la cola.
+Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_ordenes.py
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.ConnectionManager import ConnectionManager
+from Model.OrdenesModel import OrdenesModel
+from comun import medir, preparar
+
+COLAS = (1_000, 10_000, 100_000)
+CONSULTAS = 500
+
+
+def reset_por_filas(ordenes: OrdenesModel):
+    """Implementación anterior: un UPDATE por orden"""
+    with ordenes._transaction() as conn:
+        orders = conn.execute("SELECT ID FROM ordenes ORDER BY ID").fetchall()
+        for index, (order_id,) in enumerate(orders):
+            conn.execute("UPDATE ordenes SET Destino = ? WHERE ID = ?",
+                         ((index % OrdenesModel.NUM_DESTINOS) + 1, order_id))
+
+
+def desordenar(ordenes: OrdenesModel):
+    with ordenes._transaction() as conn:
+        conn.execute("UPDATE ordenes SET Destino = abs(random()) % ? + 1", (OrdenesModel.NUM_DESTINOS,))
+
+
+def main():
+    correcto = True
+    rng = random.Random(1)
+    _db, pallets = preparar(max(COLAS) + CONSULTAS)
+    ordenes = OrdenesModel("DB/pallets.db")
+    libres = [p["ID"] for p in pallets[max(COLAS):]]
+
+    print(f"{'órdenes':>8}{'reset (ms)':>12}{'reset por filas (ms)':>22}{'por pallet (µs)':>17}"
+          f"{'borrar (µs)':>13}{'insertar (µs)':>15}")
+    for cantidad in COLAS:
+        ids_pallets = [p["ID"] for p in pallets[:cantidad]]
+        with ordenes._transaction() as conn:
+            conn.execute("DELETE FROM ordenes")
+            conn.executemany("INSERT INTO ordenes (Origen, Destino, Pallet_ID) VALUES (?, 1, ?)",
+                             [(i, pallet_id) for i, pallet_id in enumerate(ids_pallets)])
+
+        desordenar(ordenes)
+        _, t_filas = medir(reset_por_filas, ordenes)
+        esperado = ordenes.get_destination_sequence()
+        desordenar(ordenes)
+        _, t_reset = medir(ordenes.reset_destinations)
+        iguales = ordenes.get_destination_sequence() == esperado and ordenes.get_next_destination() == \
+            cantidad % OrdenesModel.NUM_DESTINOS + 1
+        correcto &= iguales
+
+        muestra = rng.sample(ids_pallets, CONSULTAS)
+        _, t_consulta = medir(lambda: [ordenes.get_order_by_pallet(p) for p in muestra])
+        insertadas, t_insertar = medir(lambda: [ordenes.insert_order(0, p) for p in libres])
+        _, t_borrar = medir(lambda: [ordenes.delete_order(order_id) for order_id in insertadas])
+
+        estado = "" if iguales else "  <-- FALLO"
+        print(f"{cantidad:>8}{t_reset:>12.1f}{t_filas:>22.1f}{t_consulta * 1e3 / CONSULTAS:>17.1f}"
+              f"{t_borrar * 1e3 / len(libres):>13.1f}{t_insertar * 1e3 / len(libres):>15.1f}{estado}")
+
+    # Un pallet no puede tener dos órdenes
+    try:
+        ordenes.insert_order(0, pallets[0]["ID"])
+        correcto = False
+        print("\nSe ha insertado una segunda orden del mismo pallet  <-- FALLO")
+    except Exception:
+        pass
+
+    ConnectionManager.close_all()
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
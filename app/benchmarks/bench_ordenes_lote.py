@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Órdenes de una selección múltiple: una transacción frente a una orden por pallet.
+
+Crea las órdenes de 30 pallets (una carga de camión) con insert_orders_for_pallets
+y con el camino de una sola orden (get_pallet_by_id + get_order_by_pallet +
+insert_order por pallet), sobre una cola que ya tiene 10k órdenes. Comprueba
+también que los pallets no válidos (inexistentes, desocupados, con calidad 0, ya
+en la cola o repetidos en la selección) se rechazan con su motivo y que una
+selección por rectángulo de 5k pallets no supera el límite de parámetros.
+Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_ordenes_lote.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.ConnectionManager import ConnectionManager
+from Model.DataProvider import DataProvider
+from Model.OrdenesModel import OrdenesModel
+from comun import ocupar, preparar
+
+COLA = 10_000
+SELECCION = 30
+REPETICIONES = 20
+RECTANGULO = 5_000
+
+
+def por_pallet(db: DataProvider, ordenes: OrdenesModel, pallet_ids) -> int:
+    """Camino de una sola orden repetido para cada pallet seleccionado"""
+    creadas = 0
+    for pallet_id in pallet_ids:
+        pallet = db.get_pallet_by_id(pallet_id)
+        if not pallet or pallet.get("Calidad", 0) == 0 or ordenes.get_order_by_pallet(pallet_id):
+            continue
+        ordenes.insert_order(pallet.get("Posicion"), pallet_id)
+        creadas += 1
+    return creadas
+
+
+def main():
+    correcto = True
+    db, pallets = preparar(COLA + 2 * SELECCION * REPETICIONES + RECTANGULO, ocupar)
+    ordenes = OrdenesModel("DB/pallets.db")
+    ordenes.insert_orders([(p["Posicion"], p["ID"]) for p in pallets[:COLA]])
+    libres = [p["ID"] for p in pallets[COLA:]]
+
+    t_lote = t_individual = 0.0
+    for ronda in range(REPETICIONES):
+        inicio = COLA + 2 * SELECCION * ronda
+        lote = [p["ID"] for p in pallets[inicio:inicio + SELECCION]]
+        individual = [p["ID"] for p in pallets[inicio + SELECCION:inicio + 2 * SELECCION]]
+        t0 = time.perf_counter()
+        creadas, rechazados = ordenes.insert_orders_for_pallets(lote)
+        t_lote += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        n = por_pallet(db, ordenes, individual)
+        t_individual += time.perf_counter() - t0
+        correcto &= len(creadas) == SELECCION and not rechazados and n == SELECCION
+    print(f"{SELECCION} pallets sobre una cola de {COLA} órdenes")
+    print(f"  una transacción:   {t_lote / REPETICIONES * 1e3:>7.2f} ms")
+    print(f"  orden a orden:     {t_individual / REPETICIONES * 1e3:>7.2f} ms")
+
+    # Los destinos siguen el reparto cíclico sin huecos ni repeticiones
+    destinos = [row["Destino"] for row in ordenes.get_orders_page(None, 10 ** 9)]
+    esperados = sorted((i % OrdenesModel.NUM_DESTINOS) + 1 for i in range(len(destinos)))
+    if sorted(destinos) != esperados:
+        print("  los destinos no siguen el reparto cíclico  <-- FALLO")
+        correcto = False
+
+    # Rechazos
+    nuevos = libres[-RECTANGULO:]
+    desocupado, calidad_cero = nuevos[0], nuevos[1]
+    db.update_pallet(desocupado, Ocupado=0)
+    db.update_pallet(calidad_cero, Calidad=0)
+    seleccion = [desocupado, calidad_cero, pallets[0]["ID"], "no-existe", nuevos[2], nuevos[2], nuevos[3]]
+    creadas, rechazados = ordenes.insert_orders_for_pallets(seleccion)
+    esperado = {desocupado: "no está ocupado", calidad_cero: "tiene calidad 0",
+                pallets[0]["ID"]: "ya está en la lista de órdenes", "no-existe": "no existe"}
+    if rechazados != esperado or [o["Pallet_ID"] for o in creadas] != [nuevos[2], nuevos[3]]:
+        print(f"  rechazos incorrectos: {rechazados}  <-- FALLO")
+        correcto = False
+
+    # Selección por rectángulo grande
+    t0 = time.perf_counter()
+    creadas, rechazados = ordenes.insert_orders_for_pallets(nuevos[4:])
+    print(f"  {len(nuevos) - 4} pallets de una vez: {(time.perf_counter() - t0) * 1e3:>7.1f} ms")
+    if len(creadas) != len(nuevos) - 4 or rechazados:
+        print("  la selección grande no creó todas las órdenes  <-- FALLO")
+        correcto = False
+    todas = ordenes.get_all_orders()
+    if len({o["Pallet_ID"] for o in todas}) != len(todas):
+        print("  hay pallets con más de una orden  <-- FALLO")
+        correcto = False
+
+    ConnectionManager.close_all()
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
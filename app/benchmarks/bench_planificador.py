@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""OrderScheduler: cola de prioridad de órdenes frente a reordenar la lista completa.
+
+Mide la carga, los cambios de Prioridad (incrementales en el montículo frente a
+ordenar de nuevo toda la cola), peek(n) y next_order(), y comprueba que el orden
+de servicio coincide con el de una ordenación de referencia tras una secuencia
+aleatoria de operaciones, también el de las claves guardadas (Secuencia, ID) y
+el de turno(), y que al recargar solo se marcan las claves que no coinciden con
+las guardadas. Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_planificador.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.OrderScheduler import OrderScheduler
+
+ORDENES = (10_000, 100_000)
+CAMBIOS = 10_000
+NUM_DESTINOS = 11
+
+
+def referencia(ordenes, no_disponibles):
+    """Orden de servicio esperado: (destino disponible, mayor prioridad, más antigua)"""
+    return sorted(ordenes, key=lambda o: (ordenes[o][0] in no_disponibles, -ordenes[o][1], o))
+
+
+def main():
+    correcto = True
+    rng = random.Random(1)
+    for cantidad in ORDENES:
+        # ID -> [destino, prioridad, pallet]
+        ordenes = {i: [i % NUM_DESTINOS + 1, rng.randint(1, 5), f"P{i:06d}"] for i in range(1, cantidad + 1)}
+        scheduler = OrderScheduler()
+        inicio = time.perf_counter()
+        scheduler.load((i, d, p, pallet) for i, (d, p, pallet) in ordenes.items())
+        t_carga = (time.perf_counter() - inicio) * 1000
+
+        cambios = [(rng.randint(1, cantidad), rng.randint(1, 5)) for _ in range(CAMBIOS)]
+        inicio = time.perf_counter()
+        for order_id, prioridad in cambios:
+            scheduler.set_prioridad(ordenes[order_id][2], prioridad)
+            scheduler.peek(1)
+        t_incremental = (time.perf_counter() - inicio) / CAMBIOS * 1e6
+        for order_id, prioridad in cambios:
+            ordenes[order_id][1] = prioridad
+
+        # Alternativa sin montículo: ordenar toda la cola tras cada cambio (se mide sobre 20 cambios)
+        inicio = time.perf_counter()
+        for _ in range(20):
+            referencia(ordenes, set())[0]
+        t_reordenar = (time.perf_counter() - inicio) / 20 * 1e6
+
+        inicio = time.perf_counter()
+        for _ in range(1000):
+            scheduler.peek(10)
+        t_peek = (time.perf_counter() - inicio) / 1000 * 1e6
+
+        correcto_carga = scheduler.ordenados() == referencia(ordenes, set())
+        correcto &= correcto_carga
+        print(f"\n{cantidad} órdenes: carga {t_carga:.0f} ms{'' if correcto_carga else '  <-- FALLO'}")
+        print(f"  cambio de prioridad + peek(1): {t_incremental:>8.1f} µs")
+        print(f"  reordenar la cola completa:    {t_reordenar:>8.1f} µs")
+        print(f"  peek(10):                      {t_peek:>8.1f} µs")
+
+        # Operaciones mezcladas contra la referencia; `guardadas` hace de columna Secuencia
+        guardadas = scheduler.claves_modificadas()
+        no_disponibles = set()
+        siguiente_id = cantidad + 1
+        for paso in range(2000):
+            accion = rng.random()
+            if accion < 0.3:
+                order_id = rng.choice(list(ordenes)) if paso % 50 else rng.randint(1, siguiente_id)
+                if order_id in ordenes:
+                    ordenes[order_id][1] = rng.randint(1, 5)
+                    scheduler.set_prioridad(ordenes[order_id][2], ordenes[order_id][1])
+            elif accion < 0.4:
+                destino = rng.randint(1, NUM_DESTINOS)
+                disponible = rng.random() < 0.6
+                (no_disponibles.discard if disponible else no_disponibles.add)(destino)
+                scheduler.set_destino_disponible(destino, disponible)
+            elif accion < 0.6:
+                ordenes[siguiente_id] = [rng.randint(1, NUM_DESTINOS), rng.randint(1, 5), f"P{siguiente_id:06d}"]
+                scheduler.add(siguiente_id, *ordenes[siguiente_id])
+                siguiente_id += 1
+            elif accion < 0.7:
+                order_id = rng.choice(list(ordenes))
+                del ordenes[order_id]
+                scheduler.remove(order_id)
+                del guardadas[order_id]
+            elif accion < 0.9:
+                esperado = referencia(ordenes, no_disponibles)[:5]
+                if scheduler.peek(5) != esperado:
+                    correcto = False
+            else:
+                esperado = referencia(ordenes, no_disponibles)[0]
+                if scheduler.next_order() != esperado:
+                    correcto = False
+                del ordenes[esperado]
+                guardadas.pop(esperado, None)
+            guardadas.update(scheduler.claves_modificadas())
+
+        # Recargar con las claves guardadas solo debe marcar las que no coinciden
+        alterada = rng.choice(list(ordenes))
+        guardadas_db = {o: (None if o == alterada else clave) for o, clave in guardadas.items()}
+        inicio = time.perf_counter()
+        scheduler.load((i, d, p, pallet, guardadas_db[i]) for i, (d, p, pallet) in ordenes.items())
+        t_recarga = (time.perf_counter() - inicio) * 1000
+        correcto_recarga = scheduler.claves_modificadas() == {alterada: guardadas[alterada]}
+        correcto &= correcto_recarga
+        print(f"  recarga con claves guardadas:  {t_recarga:>8.0f} ms"
+              f"{'' if correcto_recarga else '  <-- marca claves que no han cambiado'}")
+
+        esperado = referencia(ordenes, no_disponibles)
+        muestra = rng.sample(range(len(esperado)), 200)
+        scheduler.turno(esperado[0])  # Tras cambiar la disponibilidad de un destino, los grupos se reconstruyen aquí
+        inicio = time.perf_counter()
+        turnos = [scheduler.turno(esperado[i]) for i in muestra]
+        t_turno = (time.perf_counter() - inicio) / len(muestra) * 1e6
+        correcto_claves = (sorted(guardadas, key=lambda o: (guardadas[o], o)) == esperado
+                           and turnos == [i + 1 for i in muestra])
+        correcto &= correcto_claves
+        print(f"  turno():                       {t_turno:>8.1f} µs"
+              f"{'' if correcto_claves else '  <-- claves o turnos distintos de la referencia'}")
+
+        inicio = time.perf_counter()
+        servidas = []
+        while True:
+            order_id = scheduler.next_order()
+            if order_id is None:
+                break
+            servidas.append(order_id)
+        t_vaciar = (time.perf_counter() - inicio) / max(len(servidas), 1) * 1e6
+        correcto_final = servidas == referencia(ordenes, no_disponibles)
+        correcto &= correcto_final
+        print(f"  next_order():                  {t_vaciar:>8.1f} µs"
+              f"{'' if correcto_final else '  <-- FALLO'}")
+
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
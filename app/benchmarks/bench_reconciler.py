@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Micro-benchmark de la reconciliación de pallets (1k / 10k / 100k pallets).
+
+Uso (desde app/):  python benchmarks/bench_reconciler.py
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.PalletReconciler import PalletReconciler
+from comun import medir
+
+TAMANOS = (1_000, 10_000, 100_000)
+PORCENTAJE_CAMBIOS = 0.01
+
+
+def generar(cantidad, rng):
+    return [{
+        "ID": f"{i:08x}",
+        "Largo": 1.2, "Ancho": 1.0, "Posicion": i % 300, "Alto": 1.5,
+        "Calidad": rng.randint(0, 5), "Peso": 500.0, "Prioridad": rng.randint(1, 5),
+        "X": rng.uniform(0, 48.95), "Y": rng.uniform(0, 29.95), "Ocupado": rng.randint(0, 1),
+    } for i in range(cantidad)]
+
+
+def mutar(pallets, rng):
+    """Copia de la tabla con ~1% de pallets movidos, cambiados, añadidos y eliminados."""
+    actuales = [dict(p) for p in pallets]
+    n = max(1, int(len(actuales) * PORCENTAJE_CAMBIOS))
+    for p in rng.sample(actuales, n):
+        campo = rng.choice(("X", "Y", "Ocupado", "Calidad"))
+        p[campo] = rng.uniform(0, 30) if campo in ("X", "Y") else rng.randint(0, 5)
+    eliminados = set(p["ID"] for p in rng.sample(actuales, n))
+    actuales = [p for p in actuales if p["ID"] not in eliminados]
+    for i, nuevo in enumerate(generar(n, rng)):
+        nuevo["ID"] = f"n{i:07x}"
+        actuales.append(nuevo)
+    return actuales
+
+
+def reconciliacion_original(memoria, current_pallets):
+    """Algoritmo anterior de MainController.update_pallets_display (O(n²) en altas)."""
+    current_dict = {p["ID"]: p for p in current_pallets}
+    for pallet in memoria:
+        current = current_dict.get(pallet["ID"])
+        if current is not None:
+            pallet.update(current)
+    for pallet_id, current in current_dict.items():
+        if not any(p["ID"] == pallet_id for p in memoria):
+            memoria.append(current)
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'pallets':>8} | {'load':>9} | {'sin cambios':>11} | {'1% cambios':>10} | {'delta 1%':>9} | {'original':>10}")
+    for cantidad in TAMANOS:
+        pallets = generar(cantidad, rng)
+        actuales = mutar(pallets, rng)
+
+        reconciler = PalletReconciler()
+        _, t_load = medir(reconciler.load, [dict(p) for p in pallets])
+        _, t_igual = medir(reconciler.reconcile, [dict(p) for p in pallets])
+        patch, t_cambios = medir(reconciler.reconcile, actuales)
+
+        # Misma variación aplicada como delta (como llega desde el registro de cambios)
+        reconciler.load([dict(p) for p in pallets])
+        _, t_delta = medir(reconciler.apply_changes,
+                           [p for p in actuales if p["ID"] in patch.changed or p["ID"].startswith("n")],
+                           patch.removed)
+
+        if cantidad <= 10_000:
+            _, t_original = medir(reconciliacion_original, [dict(p) for p in pallets], actuales)
+            original = f"{t_original:8.1f}ms"
+        else:
+            original = "   (omitido)"
+        print(f"{cantidad:>8} | {t_load:7.1f}ms | {t_igual:9.1f}ms | {t_cambios:8.1f}ms | {t_delta:7.2f}ms | {original}")
+        print(f"{'':>8}   +{len(patch.added)} -{len(patch.removed)} ~{len(patch.changed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""SlotLocator: k huecos libres más cercanos frente a una búsqueda exhaustiva con NumPy.
+
+Mide la construcción del índice, las consultas (mediana y percentil 99) y la
+actualización al cambiar la ocupación, y comprueba que las distancias coinciden
+con las de la búsqueda exhaustiva. Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_slots.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from Model.PalletStore import PalletStore
+from Model.SlotLocator import SlotLocator
+from generate_pallets import MAP_WIDTH_M, MAP_HEIGHT_M, generar_lote
+
+# Número de huecos libres (la mitad de los pallets generados están libres)
+HUECOS = (10_000, 100_000)
+CONSULTAS = 1000
+VALORES_K = (1, 5, 20)
+
+
+def exhaustiva(x_libres, y_libres, x, y, k):
+    distancias = np.hypot(x_libres - x, y_libres - y)
+    return np.sort(distancias[np.argpartition(distancias, k - 1)[:k]] if k < len(distancias) else distancias)
+
+
+def percentiles(tiempos):
+    return np.percentile(tiempos, 50) * 1e3, np.percentile(tiempos, 99) * 1e3
+
+
+def main():
+    correcto = True
+    rng = random.Random(1)
+    for huecos in HUECOS:
+        pallets = generar_lote((0, huecos * 2, 1))
+        store = PalletStore()
+        store.load([p["ID"] for p in pallets], PalletStore.to_columns(pallets))
+        x, y, ocupado = store.column("X"), store.column("Y"), store.column("Ocupado")
+
+        locator = SlotLocator()
+        inicio = time.perf_counter()
+        locator.load(store.ids, x, y, ocupado)
+        t_carga = (time.perf_counter() - inicio) * 1000
+        x_libres = x[~ocupado].astype(np.float64)
+        y_libres = y[~ocupado].astype(np.float64)
+
+        print(f"\n{len(locator)} huecos libres ({len(store)} pallets), celda de {locator.tam_celda:.2f} m, "
+              f"carga {t_carga:.0f} ms")
+        print(f"  {'k':>4}{'índice p50 (ms)':>18}{'índice p99 (ms)':>18}{'exhaustiva p50 (ms)':>22}")
+        for k in VALORES_K:
+            puntos = [(rng.uniform(0, MAP_WIDTH_M), rng.uniform(0, MAP_HEIGHT_M)) for _ in range(CONSULTAS)]
+            t_indice, t_exhaustiva = [], []
+            for px, py in puntos:
+                inicio = time.perf_counter()
+                encontrados = locator.nearest(px, py, k)
+                t_indice.append(time.perf_counter() - inicio)
+                inicio = time.perf_counter()
+                esperadas = exhaustiva(x_libres, y_libres, px, py, k)
+                t_exhaustiva.append(time.perf_counter() - inicio)
+                if not np.allclose([h[3] for h in encontrados], esperadas):
+                    correcto = False
+            p50, p99 = percentiles(t_indice)
+            print(f"  {k:>4}{p50:>18.3f}{p99:>18.3f}{percentiles(t_exhaustiva)[0]:>22.3f}")
+
+        # Ocupar y liberar huecos: actualización incremental del índice
+        ids = rng.sample(store.ids, 1000)
+        pallets_por_id = {pid: store.get(pid) for pid in ids}
+        inicio = time.perf_counter()
+        for pallet in pallets_por_id.values():
+            pallet["Ocupado"] = not pallet["Ocupado"]
+            locator.update(pallet)
+        t_update = (time.perf_counter() - inicio) / len(ids) * 1e6
+        esperados = int(np.count_nonzero(~ocupado)) + sum(1 if not p["Ocupado"] else -1
+                                                           for p in pallets_por_id.values())
+        correcto &= len(locator) == esperados
+        print(f"  cambio de ocupación: {t_update:.1f} µs por pallet")
+
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
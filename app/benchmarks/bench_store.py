@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Memoria y tiempo de recorrido: lista de dicts (get_all_pallets) frente a PalletStore (columnas NumPy).
+
+Uso (desde app/):  python benchmarks/bench_store.py
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from Model.ConnectionManager import ConnectionManager
+from Model.PalletStore import PalletStore
+from comun import crear_base, directorio_temporal, medir
+
+TAMANOS = (10_000, 100_000)
+REPETICIONES = 5
+
+# (descripción, recorrido sobre la lista de dicts, recorrido vectorizado sobre el almacén)
+RECORRIDOS = [
+    ("Peso > 800 y Prioridad = 5",
+     lambda ps: sum(1 for p in ps if p["Peso"] > 800 and p["Prioridad"] == 5),
+     lambda s: int(np.count_nonzero((s.column("Peso") > 800) & (s.column("Prioridad") == 5)))),
+    ("ocupados en 10x10 m",
+     lambda ps: sum(1 for p in ps if p["Ocupado"] and 10 <= p["X"] <= 20 and 5 <= p["Y"] <= 15),
+     lambda s: int(np.count_nonzero(s.column("Ocupado") & (s.column("X") >= 10) & (s.column("X") <= 20)
+                                    & (s.column("Y") >= 5) & (s.column("Y") <= 15)))),
+    ("peso medio de los ocupados",
+     lambda ps: sum(p["Peso"] for p in ps if p["Ocupado"]) / max(1, sum(1 for p in ps if p["Ocupado"])),
+     lambda s: float(s.column("Peso")[s.column("Ocupado")].mean())),
+]
+
+
+def medir_memoria(construir):
+    """Resultado de `construir()`, memoria que retiene y tiempo de construcción (medido sin tracemalloc)"""
+    inicio = time.perf_counter()
+    construir()
+    duracion = time.perf_counter() - inicio
+    gc.collect()
+    tracemalloc.start()
+    resultado = construir()
+    retenida = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, retenida, duracion
+
+
+def cargar_store(db):
+    store = PalletStore()
+    store.load(*db.get_pallet_columns())
+    return store
+
+
+def main():
+    directorio_temporal()
+    for cantidad in TAMANOS:
+        db = crear_base(cantidad, f"pallets_{cantidad}.db")[0]
+
+        dicts, mem_dicts, t_dicts = medir_memoria(db.get_all_pallets)
+        store, mem_store, t_store = medir_memoria(lambda: cargar_store(db))
+
+        print(f"\n{cantidad} pallets")
+        print(f"  {'':<30}{'lista de dicts':>16}{'PalletStore':>14}")
+        print(f"  {'memoria (MB)':<30}{mem_dicts / 2**20:>16.1f}{mem_store / 2**20:>14.1f}"
+              f"   (columnas: {store.nbytes() / 2**20:.1f} MB)")
+        print(f"  {'carga desde SQLite (ms)':<30}{t_dicts * 1000:>16.1f}{t_store * 1000:>14.1f}")
+        for descripcion, con_dicts, con_store in RECORRIDOS:
+            r_dicts, ms_dicts = medir(con_dicts, dicts, repeticiones=REPETICIONES)
+            r_store, ms_store = medir(con_store, store, repeticiones=REPETICIONES)
+            igual = "" if np.isclose(r_dicts, r_store, rtol=1e-4) else f"  <-- distinto ({r_dicts} / {r_store})"
+            print(f"  {descripcion + ' (ms)':<30}{ms_dicts:>16.2f}{ms_store:>14.2f}{igual}")
+        del dicts, store
+    ConnectionManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Tabla de órdenes: OrdenesTableModel paginado frente a rellenar un QTableWidget.
+
+Con una cola de 50k órdenes mide la apertura del panel, subir/bajar, eliminar y
+añadir órdenes, y comprueba tras cada operación que las filas cargadas coinciden
+con las de la base de datos en el mismo orden. Necesita PyQt5 (se ejecuta sin
+pantalla). Termina con código 1 si alguna comprobación falla.
+
+Uso (desde app/):  python benchmarks/bench_tabla_ordenes.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem
+
+from Model.ConnectionManager import ConnectionManager
+from Model.OrdenesModel import OrdenesModel
+from Controller.OrdenesController import OrdenesController
+from comun import ocupar, preparar
+
+ORDENES = 50_000
+OPERACIONES = 200
+
+
+def rellenar_qtablewidget(ordenes: OrdenesModel) -> float:
+    """Implementación anterior de load_orders: todas las filas en un QTableWidget"""
+    inicio = time.perf_counter()
+    tabla = QTableWidget()
+    tabla.setColumnCount(3)
+    for orden in ordenes.get_all_orders():
+        fila = tabla.rowCount()
+        tabla.insertRow(fila)
+        for columna, campo in enumerate(("Origen", "Destino", "Secuencia")):
+            tabla.setItem(fila, columna, QTableWidgetItem(str(orden[campo])))
+    return time.perf_counter() - inicio
+
+
+def coinciden(controlador: OrdenesController) -> bool:
+    """Las filas cargadas son las primeras de la base de datos, en el mismo orden y con los mismos datos,
+    y su turno es su posición en la cola guardada (ORDER BY Secuencia, ID)"""
+    tabla = controlador.table_model
+    esperadas = controlador.ordenes_model.get_orders_page(None, tabla.rowCount())
+    cola = controlador.ordenes_model._connection().execute("SELECT ID FROM ordenes ORDER BY Secuencia, ID")
+    turnos = {order_id: turno for turno, (order_id,) in enumerate(cola, start=1)}
+    return [tabla.order(fila) for fila in range(tabla.rowCount())] == \
+        [dict({c: o[c] for c in ("ID", "Origen", "Destino")}, Turno=turnos[o["ID"]]) for o in esperadas]
+
+
+def main():
+    app = QApplication(sys.argv)
+    correcto = True
+    rng = random.Random(1)
+    db, pallets = preparar(ORDENES + OPERACIONES, ocupar)
+    ordenes = OrdenesModel("DB/pallets.db")
+    ordenes.insert_orders([(p["Posicion"], p["ID"]) for p in pallets[:ORDENES]])
+    # Claves de la cola ya guardadas, como en un arranque normal
+    OrdenesController(db)
+
+    inicio = time.perf_counter()
+    controlador = OrdenesController(db)
+    t_apertura = time.perf_counter() - inicio
+    t_anterior = rellenar_qtablewidget(ordenes)
+    tabla = controlador.table_model
+    print(f"{ORDENES} órdenes")
+    print(f"  abrir el panel:          {t_apertura * 1e3:>8.0f} ms ({tabla.rowCount()} filas cargadas)")
+    print(f"  rellenar QTableWidget:   {t_anterior * 1e3:>8.0f} ms")
+
+    # Desplazarse por la tabla carga páginas nuevas
+    for _ in range(5):
+        tabla.fetchMore()
+    correcto &= coinciden(controlador)
+
+    tiempos = {"subir/bajar": [], "eliminar": [], "añadir": []}
+    for paso in range(OPERACIONES):
+        accion = rng.random()
+        if accion < 0.6:
+            fila = rng.randrange(tabla.rowCount())
+            order_id = tabla.order_id(fila)
+            inicio = time.perf_counter()
+            (controlador.move_up if rng.random() < 0.5 else controlador.move_down)(order_id)
+            tiempos["subir/bajar"].append(time.perf_counter() - inicio)
+        elif accion < 0.8:
+            order_id = tabla.order_id(rng.randrange(tabla.rowCount()))
+            inicio = time.perf_counter()
+            controlador.delete_order(order_id)
+            tiempos["eliminar"].append(time.perf_counter() - inicio)
+        else:
+            controlador.set_current_pallet(pallets[ORDENES + paso]["ID"])
+            inicio = time.perf_counter()
+            controlador.add_order()
+            tiempos["añadir"].append(time.perf_counter() - inicio)
+        if paso % 20 == 0 or paso == OPERACIONES - 1:
+            if not coinciden(controlador):
+                print(f"  las filas no coinciden con la base de datos tras el paso {paso}  <-- FALLO")
+                correcto = False
+                break
+
+    for nombre, valores in tiempos.items():
+        if valores:
+            print(f"  {nombre + ':':<24} {sum(valores) / len(valores) * 1e3:>8.1f} ms de media")
+
+    ConnectionManager.close_all()
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
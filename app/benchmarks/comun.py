@@ -0,0 +1,55 @@
+"""Utilidades comunes de los benchmarks: base de datos temporal con pallets generados y medición de tiempos.
+
+No es un benchmark; lo importan los scripts de este directorio (`from comun import medir, preparar`).
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.DataProvider import DataProvider
+from generate_pallets import generar_lote
+
+
+def medir(funcion: Callable, *args, repeticiones: int = 1) -> tuple:
+    """Ejecutar `funcion(*args)` `repeticiones` veces; retorna (último resultado, ms por ejecución)"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion(*args)
+    return resultado, (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def directorio_temporal() -> str:
+    """Pasar a un directorio temporal nuevo (las bases de datos se crean en su DB/) y retornarlo"""
+    directorio = tempfile.mkdtemp()
+    os.chdir(directorio)
+    return directorio
+
+
+def ocupar(pallets: List[dict]):
+    """Marcar los pallets como ocupados y con Calidad válida, para poder crearles órdenes"""
+    for pallet in pallets:
+        pallet["Ocupado"], pallet["Calidad"] = 1, 1
+
+
+def crear_base(cantidad: int, ruta: str = "DB/pallets.db",
+               ajustar: Optional[Callable[[List[dict]], None]] = None) -> Tuple[DataProvider, List[dict]]:
+    """Crear la base de datos `ruta` con `cantidad` pallets generados; retorna (DataProvider, pallets).
+
+    `ajustar` puede modificar los pallets antes de insertarlos (p. ej. variar su Calidad).
+    """
+    db = DataProvider(ruta)
+    pallets = generar_lote((0, cantidad, 1))
+    if ajustar is not None:
+        ajustar(pallets)
+    db.insert_pallets_many(pallets)
+    return db, pallets
+
+
+def preparar(cantidad: int, ajustar: Optional[Callable[[List[dict]], None]] = None) -> Tuple[DataProvider, List[dict]]:
+    """Directorio temporal con DB/pallets.db y `cantidad` pallets; retorna (DataProvider, pallets)"""
+    directorio_temporal()
+    return crear_base(cantidad, ajustar=ajustar)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Asignación de destinos con varios procesos insertando órdenes a la vez.
+
+Cada proceso abre su propia conexión (como una estación o la pasarela del WMS)
+e inserta órdenes sueltas (insert_order), por lotes (insert_orders) y, como un
+proceso externo que no usa OrdenesModel, con un INSERT sin destino desde una
+conexión sqlite3 propia, borrando algunas de las suyas por el camino. Al final, las asignaciones de todos los
+procesos ordenadas por ID deben seguir exactamente el ciclo 1..11 sin repetir
+ni saltar destinos. Termina con código 1 si no es así.
+
+Uso (desde app/):  python benchmarks/stress_destinos.py [procesos] [operaciones por proceso]
+"""
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Model.ConnectionManager import ConnectionManager
+from Model.DataProvider import DataProvider
+from Model.OrdenesModel import OrdenesModel
+from comun import directorio_temporal
+
+PROCESOS = 8
+OPERACIONES = 400
+MAX_LOTE = 20
+
+
+def trabajador(args):
+    """Insertar órdenes y retornar las asignaciones (ID, destino) que ha obtenido"""
+    directorio, semilla, operaciones = args
+    os.chdir(directorio)
+    rng = random.Random(semilla)
+    ordenes = OrdenesModel("DB/pallets.db")
+    conn = ordenes._connection()
+    # Escritor externo: sin ConnectionManager ni OrdenesModel, cada INSERT en su propia transacción
+    externo = sqlite3.connect("DB/pallets.db", timeout=30, isolation_level=None)
+    asignadas = []
+    for _ in range(operaciones):
+        accion = rng.random()
+        if accion < 0.35:
+            ids = [ordenes.insert_order(rng.randint(1, 1000))]
+        elif accion < 0.7:
+            ids = ordenes.insert_orders([(rng.randint(1, 1000), None) for _ in range(rng.randint(2, MAX_LOTE))])
+        else:
+            ids = [externo.execute("INSERT INTO ordenes (Origen) VALUES (?)", (rng.randint(1, 1000),)).lastrowid]
+        marcas = ",".join("?" * len(ids))
+        asignadas.extend(tuple(row) for row in
+                         conn.execute(f"SELECT ID, Destino FROM ordenes WHERE ID IN ({marcas})", ids))
+        # Borrar órdenes (también la última) no debe hacer que se repita su destino
+        if rng.random() < 0.2:
+            ordenes.delete_order(rng.choice(ids))
+    externo.close()
+    ConnectionManager.close_all()
+    return asignadas
+
+
+def main():
+    procesos = int(sys.argv[1]) if len(sys.argv) > 1 else PROCESOS
+    operaciones = int(sys.argv[2]) if len(sys.argv) > 2 else OPERACIONES
+    directorio = directorio_temporal()
+    DataProvider("DB/pallets.db")
+    ordenes = OrdenesModel("DB/pallets.db")
+    inicial = ordenes._connection().execute("SELECT Valor FROM secuencias WHERE Nombre = 'destino'").fetchone()[0]
+    # Los procesos hijos no deben heredar las conexiones abiertas
+    ConnectionManager.close_all()
+
+    contexto = multiprocessing.get_context("spawn")
+    inicio = time.perf_counter()
+    with contexto.Pool(procesos) as pool:
+        resultados = pool.map(trabajador, [(directorio, semilla, operaciones) for semilla in range(procesos)])
+    duracion = time.perf_counter() - inicio
+
+    asignadas = sorted(a for resultado in resultados for a in resultado)
+    ids = [order_id for order_id, _destino in asignadas]
+    destinos = [destino for _order_id, destino in asignadas]
+    esperados = [(inicial + k) % OrdenesModel.NUM_DESTINOS + 1 for k in range(len(asignadas))]
+    sin_duplicados = len(set(ids)) == len(ids)
+    ciclo_correcto = destinos == esperados
+    contador = OrdenesModel("DB/pallets.db")._connection().execute(
+        "SELECT Valor FROM secuencias WHERE Nombre = 'destino'").fetchone()[0]
+    contador_correcto = contador == inicial + len(asignadas)
+    ConnectionManager.close_all()
+
+    print(f"{procesos} procesos x {operaciones} operaciones: {len(asignadas)} órdenes en {duracion:.1f} s "
+          f"({len(asignadas) / duracion:.0f} órdenes/s)")
+    print(f"  IDs únicos:                 {'sí' if sin_duplicados else 'NO  <-- FALLO'}")
+    print(f"  ciclo sin repetir ni saltar: {'sí' if ciclo_correcto else 'NO  <-- FALLO'}")
+    if not ciclo_correcto:
+        k = next(i for i, (d, e) in enumerate(zip(destinos, esperados)) if d != e)
+        print(f"    primera diferencia en la orden {ids[k]}: destino {destinos[k]}, esperado {esperados[k]}")
+    print(f"  contador = asignaciones:     {'sí' if contador_correcto else 'NO  <-- FALLO'}")
+    correcto = sin_duplicados and ciclo_correcto and contador_correcto
+    print("\nOK" if correcto else "\nHay comprobaciones que fallan")
+    return 0 if correcto else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
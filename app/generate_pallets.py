@@ -1,5 +1,9 @@
+import argparse
 import random
-import uuid
+import sqlite3
+import time
+from multiprocessing import Pool
+
 from Model.DataProvider import DataProvider
 
 # Tamaño del mapa en píxeles
@@ -13,32 +17,86 @@ ESCALA = 0.05
 MAP_WIDTH_M = MAP_WIDTH_PX * ESCALA    # 48.95 m
 MAP_HEIGHT_M = MAP_HEIGHT_PX * ESCALA  # 29.95 m
 
-def generar_pallet():
+# Pallets por lote (unidad de trabajo de cada proceso y de cada transacción)
+LOTE = 10000
+
+# Cada bloque de índices alineado tiene su propio generador aleatorio: los datos de una
+# semilla son los mismos con cualquier número de procesos o tamaño de lote
+BLOQUE = 1000
+
+# Multiplicador impar: i -> (i * MULTIPLICADOR + desplazamiento) mod 2^32 es una biyección,
+# así que los IDs de una misma semilla nunca se repiten (hasta 2^32 pallets)
+MULTIPLICADOR = 0x9E3779B1
+
+
+def generar_id(indice: int, desplazamiento: int) -> str:
+    """ID hexadecimal de 8 caracteres, único para cada índice con el mismo desplazamiento"""
+    return f"{(indice * MULTIPLICADOR + desplazamiento) & 0xFFFFFFFF:08x}"
+
+
+def generar_pallet(rng=random, pallet_id: str = None):
     """Genera un pallet con datos válidos para la DB. Incluye un ID hexadecimal único."""
     return {
-        "ID": uuid.uuid4().hex[:8],                     # ID hexadecimal de 8 caracteres
-        "Largo": round(random.uniform(0.8, 1.4), 2),
-        "Ancho": round(random.uniform(0.8, 1.2), 2),
-        "Posicion": random.randint(1, 300),
-        "Alto": round(random.uniform(0.5, 2.0), 2),
+        "ID": pallet_id or DataProvider.generate_hex_id(),  # ID hexadecimal de 8 caracteres
+        "Largo": round(rng.uniform(0.8, 1.4), 2),
+        "Ancho": round(rng.uniform(0.8, 1.2), 2),
+        "Posicion": rng.randint(1, 300),
+        "Alto": round(rng.uniform(0.5, 2.0), 2),
         "Calidad": 0,                                  # Calidad inicial en 0
-        "Peso": round(random.uniform(50, 1200), 1),
-        "Prioridad": random.randint(1, 5),
-        "X": round(random.uniform(0, MAP_WIDTH_M), 2),
-        "Y": round(random.uniform(0, MAP_HEIGHT_M), 2),
-        "Ocupado": random.choice([0, 1])                 # ← Cambiado a Ocupado
+        "Peso": round(rng.uniform(50, 1200), 1),
+        "Prioridad": rng.randint(1, 5),
+        "X": round(rng.uniform(0, MAP_WIDTH_M), 2),
+        "Y": round(rng.uniform(0, MAP_HEIGHT_M), 2),
+        "Ocupado": rng.choice([0, 1])
     }
 
-def poblar_db(cantidad=50):
-    db = DataProvider("DB/pallets.db")
-    print(f"Insertando {cantidad} pallets en pallets.db...\n")
 
-    for i in range(cantidad):
-        pallet = generar_pallet()
-        new_id = db.insert_pallet(**pallet)
-        print(f"[{i+1}/{cantidad}] Pallet insertado con ID {new_id} (X={pallet['X']} m, Y={pallet['Y']} m)")
+def generar_lote(args):
+    """Pallets de los índices [inicio, fin), con inicio múltiplo de BLOQUE"""
+    inicio, fin, semilla = args
+    desplazamiento = random.Random(semilla).getrandbits(32)
+    pallets = []
+    for bloque in range(inicio, fin, BLOQUE):
+        rng = random.Random(f"{semilla}:{bloque // BLOQUE}")
+        pallets.extend(generar_pallet(rng, generar_id(i, desplazamiento))
+                       for i in range(bloque, min(bloque + BLOQUE, fin)))
+    return pallets
+
+
+def poblar_db(cantidad=50, semilla=None, procesos=1, lote=LOTE, db_path="DB/pallets.db"):
+    if semilla is None:
+        semilla = random.getrandbits(32)
+    db = DataProvider(db_path)
+    print(f"Insertando {cantidad} pallets en {db_path} (semilla {semilla}, {procesos} proceso(s))...")
+
+    lote = max(BLOQUE, lote // BLOQUE * BLOQUE)
+    lotes = [(inicio, min(inicio + lote, cantidad), semilla) for inicio in range(0, cantidad, lote)]
+    inicio_t = time.perf_counter()
+    insertados = 0
+    try:
+        if procesos > 1:
+            # Los procesos solo generan; la escritura se queda en este proceso (SQLite admite un único escritor)
+            with Pool(procesos) as pool:
+                for pallets in pool.imap(generar_lote, lotes):
+                    insertados += db.insert_pallets_many(pallets, batch_size=lote)
+        else:
+            for args in lotes:
+                insertados += db.insert_pallets_many(generar_lote(args), batch_size=lote)
+    except sqlite3.IntegrityError as e:
+        print(f"Error al insertar pallets: {e} (¿semilla ya usada en esta base de datos?)")
+    duracion = time.perf_counter() - inicio_t
+
+    print(f"✔ {insertados} pallets insertados en {duracion:.2f} s "
+          f"({insertados / duracion if duracion else 0:,.0f} filas/s)")
 
-    print("\n✔ Inserción completada.")
 
 if __name__ == "__main__":
-    poblar_db(5)   # Cambia la cantidad de pallets a generar según tus necesidades
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generar pallets de prueba en pallets.db")
+    parser.add_argument("cantidad", type=int, nargs="?", default=5, help="Número de pallets a generar")
+    parser.add_argument("--semilla", type=int, default=None,
+                        help="Semilla de los datos (la misma semilla genera los mismos pallets e IDs; "
+                             "por defecto, una aleatoria)")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos que generan los datos en paralelo")
+    parser.add_argument("--lote", type=int, default=LOTE, help="Pallets por lote y por transacción")
+    args = parser.parse_args()
+    poblar_db(args.cantidad, args.semilla, args.procesos, args.lote)
@@ -0,0 +1,66 @@
+import argparse
+import random
+import time
+
+from Model.IOProvider import IOProvider
+from Model.IOSource import SharedMemoryIOSource
+
+# Bits de cada palabra que muestra el panel de I/O
+BITS = 5
+
+
+def siguiente_estado(modo: str, n: int, input_value: int, output_value: int, rng=random):
+    """Estado tras la escritura n: cambia un bit al azar, cuenta en binario o alterna pulsos"""
+    if modo == "contador":
+        # Output lleva el número de escritura completo: permite comprobar que no se pierde ninguna
+        return n % (1 << BITS), n
+    if modo == "pulsos":
+        return n % 2, output_value
+    bit = 1 << rng.randrange(BITS)
+    if rng.random() < 0.5:
+        return input_value ^ bit, output_value
+    return input_value, output_value ^ bit
+
+
+def simular(periodo=0.2, cambios=None, modo="aleatorio", sqlite=False,
+            ruta=SharedMemoryIOSource.RUTA, semilla=None, silencioso=False):
+    """Hacer de pasarela del PLC: escribir un estado nuevo de las señales cada `periodo` segundos"""
+    rng = random.Random(semilla)
+    fuente = IOProvider() if sqlite else SharedMemoryIOSource(ruta, escritor=True)
+    destino = "DB/IO.db" if sqlite else ruta
+    if not silencioso:
+        print(f"Escribiendo I/O en {destino} cada {periodo * 1000:g} ms (modo {modo}); Ctrl+C para terminar")
+    input_value, output_value = fuente.get_io_data()
+    siguiente = time.perf_counter()
+    n = 0
+    try:
+        while cambios is None or n < cambios:
+            n += 1
+            input_value, output_value = siguiente_estado(modo, n, input_value, output_value, rng)
+            fuente.update_io_data(input_value, output_value)
+            siguiente += periodo
+            espera = siguiente - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fuente.close()
+    if not silencioso:
+        print(f"✔ {n} escrituras")
+    return n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simular la pasarela del PLC escribiendo señales I/O")
+    parser.add_argument("--periodo", type=float, default=0.2, help="Segundos entre escrituras")
+    parser.add_argument("--cambios", type=int, default=None, help="Número de escrituras (por defecto, sin fin)")
+    parser.add_argument("--modo", choices=("aleatorio", "contador", "pulsos"), default="aleatorio",
+                        help="aleatorio: cambia un bit; contador: Input cuenta en binario; "
+                             "pulsos: el bit 0 de Input alterna en cada escritura")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="Escribir en DB/IO.db (respaldo) en lugar de en memoria compartida")
+    parser.add_argument("--ruta", default=SharedMemoryIOSource.RUTA, help="Fichero de memoria compartida")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla del modo aleatorio")
+    args = parser.parse_args()
+    simular(args.periodo, args.cambios, args.modo, args.sqlite, args.ruta, args.semilla)